@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from about.prerender import build
+
+
+class Command(BaseCommand):
+    help = ('Рендерит анонимные версии статических страниц в PRERENDER_DIR; '
+            'страницы с неизменными шаблонами пропускаются')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', default=settings.PRERENDER_DIR,
+                            help='Каталог для готовых страниц')
+        parser.add_argument('--force', action='store_true',
+                            help='Перерисовать все страницы')
+
+    def handle(self, *args, **options):
+        rendered = build(options['output'], settings.PRERENDER_PAGES,
+                         force=options['force'])
+        skipped = len(settings.PRERENDER_PAGES) - len(rendered)
+        self.stdout.write(
+            f'Перерисовано страниц: {len(rendered)}, без изменений: {skipped}'
+        )
@@ -0,0 +1,161 @@
+import hashlib
+import json
+import os
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.messages.storage.cookie import CookieStorage
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import HttpResponse
+from django.template import Context
+from django.template.loader import get_template
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.test import RequestFactory
+from django.urls import resolve, reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import quote_etag
+
+MANIFEST = 'manifest.json'
+
+# Страницы, прочитанные из PRERENDER_DIR, и каталог с mtime манифеста,
+# с которыми они загружены.
+_loaded = {'version': None, 'pages': {}}
+
+
+def template_files(template_name, files=None):
+    """Файлы шаблона и всех шаблонов, которые он расширяет и включает.
+
+    Учитываются только имена-литералы: страницы, собираемые заранее,
+    не выбирают шаблоны по переменным.
+    """
+    files = set() if files is None else files
+    template = get_template(template_name).template
+    if template.origin.name in files:
+        return files
+    files.add(template.origin.name)
+    for node in template.nodelist.get_nodes_by_type((ExtendsNode,
+                                                     IncludeNode)):
+        target = (node.parent_name if isinstance(node, ExtendsNode)
+                  else node.template)
+        name = target.resolve(Context())
+        if isinstance(name, str) and name:
+            template_files(name, files)
+    return files
+
+
+def source_digest(template_name):
+    """Отпечаток входных данных страницы: исходники шаблонов, год
+    из футера и манифест статики, от которого зависят URL файлов."""
+    digest = hashlib.sha256(str(timezone.now().year).encode())
+    read_static_manifest = getattr(staticfiles_storage, 'read_manifest',
+                                   None)
+    if read_static_manifest is not None:
+        digest.update((read_static_manifest() or '').encode())
+    for path in sorted(template_files(template_name)):
+        digest.update(path.encode())
+        with open(path, 'rb') as source:
+            digest.update(source.read())
+    return digest.hexdigest()
+
+
+def anonymous_request(path):
+    request = RequestFactory().get(path)
+    request.resolver_match = resolve(path)
+    request.user = AnonymousUser()
+    # Сборка рендерит шаблон, даже если готовая страница уже есть.
+    request.prerendering = True
+    return request
+
+
+def read_manifest(directory):
+    try:
+        with open(os.path.join(directory, MANIFEST)) as manifest:
+            return json.load(manifest)
+    except (OSError, ValueError):
+        return {}
+
+
+def write_atomic(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = f'{path}.tmp'
+    with open(temporary, 'wb') as output:
+        output.write(data)
+    os.replace(temporary, path)
+
+
+def build(directory, names, force=False):
+    """Рендерит анонимные версии страниц names в directory.
+
+    Страница перерисовывается, только если изменился отпечаток её
+    шаблонов. Возвращает имена перерисованных страниц.
+    """
+    manifest = read_manifest(directory)
+    rendered = []
+    for name in names:
+        path = reverse(name)
+        request = anonymous_request(path)
+        match = request.resolver_match
+        response = match.func(request, *match.args, **match.kwargs)
+        digest = source_digest(response.template_name[0])
+        entry = manifest.get(name)
+        if (not force and entry is not None and entry['digest'] == digest
+                and os.path.exists(os.path.join(directory, entry['file']))):
+            continue
+        body = response.render().content
+        entry = {
+            'path': path,
+            'file': path.strip('/') + '.html',
+            'digest': digest,
+            'etag': quote_etag(hashlib.md5(body).hexdigest()),
+            'content_type': response['Content-Type'],
+        }
+        write_atomic(os.path.join(directory, entry['file']), body)
+        manifest[name] = entry
+        rendered.append(name)
+    if rendered:
+        write_atomic(os.path.join(directory, MANIFEST),
+                     json.dumps(manifest, indent=2).encode())
+    return rendered
+
+
+def load(directory):
+    """Страницы из directory; перечитываются после новой сборки."""
+    try:
+        mtime = os.stat(os.path.join(directory, MANIFEST)).st_mtime_ns
+    except OSError:
+        return {}
+    if _loaded['version'] != (directory, mtime):
+        pages = {}
+        for name, entry in read_manifest(directory).items():
+            try:
+                with open(os.path.join(directory, entry['file']),
+                          'rb') as page:
+                    pages[name] = dict(entry, body=page.read())
+            except OSError:
+                continue
+        _loaded.update(version=(directory, mtime), pages=pages)
+    return _loaded['pages']
+
+
+def prerendered_response(request, view_name):
+    """Готовая анонимная страница или None, если её нужно рендерить.
+
+    Сессия и отложенные сообщения означают персональную страницу:
+    шапка показывает пользователя, а сообщения хранятся в cookie.
+    """
+    if (getattr(request, 'prerendering', False)
+            or settings.SESSION_COOKIE_NAME in request.COOKIES
+            or CookieStorage.cookie_name in request.COOKIES):
+        return None
+    page = load(settings.PRERENDER_DIR).get(view_name)
+    if page is None:
+        return None
+    response = get_conditional_response(request, etag=page['etag'])
+    if response is None:
+        response = HttpResponse(page['body'],
+                                content_type=page['content_type'])
+    response['ETag'] = page['etag']
+    response['Cache-Control'] = f'public, max-age={settings.PRERENDER_MAX_AGE}'
+    patch_vary_headers(response, ('Cookie',))
+    return response
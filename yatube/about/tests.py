@@ -1,6 +1,17 @@
-from django.test import TestCase, Client
-from django.urls import reverse
+import shutil
+import tempfile
 from http import HTTPStatus
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from about.prerender import build
+
+
+User = get_user_model()
 
 
 ABOUT_URLS_DICT = {
@@ -49,3 +60,51 @@ class AboutTests(TestCase):
                 response = self.guest_client.get(reverse(name))
                 self.assertEqual(response.status_code, HTTPStatus.OK)
                 self.assertTemplateUsed(response, template)
+
+
+class PrerenderTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.override = override_settings(PRERENDER_DIR=self.directory)
+        self.override.enable()
+        self.addCleanup(self.override.disable)
+        self.guest_client = Client()
+
+    def test_build_skips_unchanged_templates(self):
+        """Повторная сборка без изменений шаблонов ничего не рендерит."""
+        pages = settings.PRERENDER_PAGES
+        self.assertEqual(build(self.directory, pages), list(pages))
+        self.assertEqual(build(self.directory, pages), [])
+        with mock.patch('about.prerender.source_digest',
+                        return_value='changed'):
+            self.assertEqual(build(self.directory, pages), list(pages))
+
+    def test_anonymous_gets_prerendered_page(self):
+        """Аноним получает готовую страницу со строгим ETag и 304 на
+        повторный запрос."""
+        expected = self.guest_client.get('/about/author/').content
+        build(self.directory, settings.PRERENDER_PAGES)
+        response = self.guest_client.get('/about/author/')
+        self.assertEqual(response.content, expected)
+        self.assertEqual(response.templates, [])
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+        self.assertIn('max-age=', response['Cache-Control'])
+        response = self.guest_client.get('/about/author/',
+                                         HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_session_gets_rendered_page(self):
+        """Запрос с сессией рендерит страницу с шаблона."""
+        build(self.directory, settings.PRERENDER_PAGES)
+        self.guest_client.force_login(self.user)
+        response = self.guest_client.get('/about/tech/')
+        self.assertTemplateUsed(response, 'about/tech.html')
+        self.assertNotIn('ETag', response)
@@ -1,9 +1,23 @@
 from django.views.generic.base import TemplateView
 
+from .prerender import prerendered_response
 
-class AboutAuthorView(TemplateView):
+
+class PrerenderedTemplateView(TemplateView):
+    """TemplateView, отдающая анонимам страницу, собранную командой
+    prerender, если она есть."""
+
+    def get(self, request, *args, **kwargs):
+        response = prerendered_response(request,
+                                        request.resolver_match.view_name)
+        if response is None:
+            return super().get(request, *args, **kwargs)
+        return response
+
+
+class AboutAuthorView(PrerenderedTemplateView):
     template_name = 'about/author.html'
 
 
-class AboutTechView(TemplateView):
+class AboutTechView(PrerenderedTemplateView):
     template_name = 'about/tech.html'
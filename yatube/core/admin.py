@@ -0,0 +1,79 @@
+from django.contrib import admin
+from django.db.models import Avg, Count, Max
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from .models import QueuedEmail, SlowQuery, Task
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = (
+        'created',
+        'duration',
+        'view_name',
+        'fingerprint',
+        'frame',
+    )
+    list_filter = ('view_name', 'created')
+    search_fields = ('fingerprint', 'view_name')
+    readonly_fields = [field.name for field in SlowQuery._meta.fields]
+    change_list_template = 'admin/core/slowquery/change_list.html'
+
+    def has_add_permission(self, request):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                'fingerprints/',
+                self.admin_site.admin_view(self.fingerprints_view),
+                name='core_slowquery_fingerprints',
+            ),
+        ] + super().get_urls()
+
+    def fingerprints_view(self, request):
+        """Медленные запросы, сгруппированные по нормализованному SQL."""
+        groups = list(
+            SlowQuery.objects.values('fingerprint_hash').annotate(
+                count=Count('id'),
+                avg_duration=Avg('duration'),
+                max_duration=Max('duration'),
+                last_seen=Max('created'),
+                last_id=Max('id'),
+            ).order_by('-count')
+        )
+        samples = SlowQuery.objects.in_bulk(
+            [group['last_id'] for group in groups])
+        for group in groups:
+            group['sample'] = samples[group['last_id']]
+        context = dict(
+            self.admin_site.each_context(request),
+            opts=self.model._meta,
+            title='Медленные запросы по отпечаткам',
+            groups=groups,
+        )
+        return TemplateResponse(
+            request, 'admin/core/slowquery/fingerprints.html', context)
+
+
+@admin.register(QueuedEmail)
+class QueuedEmailAdmin(admin.ModelAdmin):
+    list_display = ('created', 'subject', 'recipients', 'attempts',
+                    'next_attempt', 'sent')
+    list_filter = ('sent', 'created')
+    search_fields = ('subject', 'recipients')
+    exclude = ('message',)
+    readonly_fields = ('created', 'subject', 'recipients', 'attempts',
+                       'next_attempt', 'sent', 'last_error')
+
+    def has_add_permission(self, request):
+        return False
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('created', 'name', 'priority', 'status', 'attempts',
+                    'run_at', 'locked_by')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'last_error')
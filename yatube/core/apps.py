@@ -1,5 +1,22 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.core.signals import request_started
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401
+        from .db import configure_sqlite
+        connection_created.connect(configure_sqlite)
+        if settings.REPLICA_ALIAS:
+            from .replica import refresh_replica
+            request_started.connect(refresh_replica)
+        if settings.SERVER_TIMING:
+            from . import instrumentation
+            instrumentation.install()
+        if settings.SLOW_QUERY_MS > 0:
+            from .db import install_slow_query_logger
+            connection_created.connect(install_slow_query_logger)
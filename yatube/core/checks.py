@@ -0,0 +1,23 @@
+from django.conf import settings
+from django.core.checks import Warning, register
+
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register('caches')
+def shared_cache_check(app_configs, **kwargs):
+    """В профиле production кэш по умолчанию должен быть общим."""
+    if (settings.DB_PROFILE != 'production'
+            or settings.CACHES['default']['BACKEND']
+            not in PROCESS_LOCAL_CACHES):
+        return []
+    return [Warning(
+        'Кэш по умолчанию локален для процесса.',
+        hint=('Лимиты частоты, подписки, водяные знаки ленты и кэш '
+              'пользователей расходятся между воркерами; задайте '
+              'CACHE_BACKEND и CACHE_LOCATION общего кэша.'),
+        id='core.W001',
+    )]
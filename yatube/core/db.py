@@ -0,0 +1,160 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import traceback
+
+from django.conf import settings
+from django.db import DatabaseError
+
+from .instrumentation import current_view
+from .queries import fingerprint
+
+logger = logging.getLogger('core.slow_queries')
+
+_local = threading.local()
+
+
+# Служебные модули, через которые проходит любой запрос.
+INFRASTRUCTURE_MODULES = ('db.py', 'instrumentation.py', 'middleware.py')
+
+
+def calling_frame():
+    """Ближайший к запросу кадр стека из кода проекта."""
+    core_dir = os.path.dirname(os.path.abspath(__file__))
+    skipped = {os.path.join(core_dir, name)
+               for name in INFRASTRUCTURE_MODULES}
+    for frame in reversed(traceback.extract_stack()):
+        path = os.path.abspath(frame.filename)
+        if path.startswith(settings.BASE_DIR) and path not in skipped:
+            relative = os.path.relpath(path, settings.BASE_DIR)
+            return f'{relative}:{frame.lineno} in {frame.name}'
+    return ''
+
+
+def explain(connection, sql, params):
+    if connection.vendor != 'sqlite' or not sql.lstrip().upper().startswith(
+            'SELECT'):
+        return ''
+    with connection.cursor() as cursor:
+        cursor.execute('EXPLAIN QUERY PLAN ' + sql, params)
+        return '\n'.join(' '.join(str(value) for value in row)
+                         for row in cursor.fetchall())
+
+
+class SlowQueryLogger:
+    """execute_wrapper, записывающий запросы дольше SLOW_QUERY_MS.
+
+    Вместе с SQL сохраняются параметры, представление, место вызова
+    и план SQLite. В лог запрос пишется сразу, а EXPLAIN и INSERT
+    в SlowQuery внутри запроса SlowQueryMiddleware откладывает до
+    отправки ответа. Запросы самого логгера не логируются.
+    """
+
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __call__(self, execute, sql, params, many, context):
+        if getattr(_local, 'active', False):
+            return execute(sql, params, many, context)
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = (time.perf_counter() - start) * 1000
+            if duration >= settings.SLOW_QUERY_MS:
+                self.record(sql, params, many, duration)
+
+    def record(self, sql, params, many, duration):
+        normalized = fingerprint(sql)
+        view_name = current_view()
+        frame = calling_frame()
+        logger.warning('%.1f мс %s [%s] %s', duration, view_name, frame,
+                       normalized)
+        entry = (self.connection, sql, params, many, duration, normalized,
+                 view_name, frame)
+        pending = getattr(_local, 'pending', None)
+        if pending is not None:
+            pending.append(entry)
+        else:
+            save_slow_queries([entry])
+
+
+def save_slow_queries(entries):
+    from .models import SlowQuery
+
+    _local.active = True
+    try:
+        for (connection, sql, params, many, duration, normalized,
+                view_name, frame) in entries:
+            try:
+                plan = '' if many else explain(connection, sql, params)
+                # Пишем через роутер: в реплику запись запрещена.
+                SlowQuery.objects.create(
+                    fingerprint=normalized,
+                    fingerprint_hash=hashlib.sha1(
+                        normalized.encode()).hexdigest(),
+                    sql=sql,
+                    params=repr(params)[:2000],
+                    duration=duration,
+                    view_name=view_name[:200],
+                    frame=frame[:500],
+                    plan=plan,
+                )
+            except DatabaseError:
+                logger.exception('Не удалось сохранить медленный запрос')
+    finally:
+        _local.active = False
+
+
+def buffer_slow_queries():
+    """Копить медленные запросы текущего потока до flush_slow_queries."""
+    _local.pending = []
+
+
+def flush_slow_queries():
+    """Сохраняет накопленные запросы и выключает накопление."""
+    pending = getattr(_local, 'pending', None)
+    _local.pending = None
+    if pending:
+        save_slow_queries(pending)
+
+
+class SlowQueryFlush:
+    """Закрываемый объект ответа: Django закрывает их после отправки
+    тела и до request_finished, пока соединение с базой ещё открыто."""
+
+    def close(self):
+        flush_slow_queries()
+
+
+def install_slow_query_logger(sender, connection, **kwargs):
+    """Обработчик connection_created: подключает SlowQueryLogger."""
+    if not any(isinstance(wrapper, SlowQueryLogger)
+               for wrapper in connection.execute_wrappers):
+        connection.execute_wrappers.append(SlowQueryLogger(connection))
+
+
+# PRAGMA, которые меняют файл базы и не применяются к реплике.
+WRITER_PRAGMAS = ('journal_mode', 'synchronous')
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """Обработчик connection_created: применяет SQLITE_PRAGMAS.
+
+    Соединение с репликой дополнительно переводится в query_only.
+    """
+    if connection.vendor != 'sqlite':
+        return
+    pragmas = dict(settings.SQLITE_PRAGMAS)
+    if connection.alias == settings.REPLICA_ALIAS:
+        for name in WRITER_PRAGMAS:
+            pragmas.pop(name, None)
+        pragmas['query_only'] = 1
+    cursor = connection.connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name} = {value}')
+    finally:
+        cursor.close()
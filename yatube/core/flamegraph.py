@@ -0,0 +1,79 @@
+from collections import Counter
+from html import escape
+
+FRAME_HEIGHT = 16
+WIDTH = 1200
+FONT_SIZE = 11
+CHAR_WIDTH = 6.5
+
+
+def read_collapsed(paths):
+    """Суммирует файлы collapsed stacks в один счётчик."""
+    stacks = Counter()
+    for path in paths:
+        with open(path) as source:
+            for line in source:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                if stack and count.isdigit():
+                    stacks[stack] += int(count)
+    return stacks
+
+
+def build_tree(stacks):
+    root = {'name': 'all', 'value': 0, 'children': {}}
+    for stack, count in stacks.items():
+        root['value'] += count
+        node = root
+        for name in stack.split(';'):
+            node = node['children'].setdefault(
+                name, {'name': name, 'value': 0, 'children': {}})
+            node['value'] += count
+    return root
+
+
+def frame_color(name):
+    shade = sum(map(ord, name)) % 80
+    return f'rgb(230,{100 + shade},{40 + shade // 2})'
+
+
+def layout(node, x, depth, scale, rects):
+    width = node['value'] * scale
+    if width < 0.5:
+        return
+    rects.append((x, depth, width, node['name'], node['value']))
+    for child in sorted(node['children'].values(),
+                        key=lambda child: child['name']):
+        layout(child, x, depth + 1, scale, rects)
+        x += child['value'] * scale
+
+
+def render_svg(stacks, title):
+    """Flame graph в формате SVG: корень снизу, ширина — доля сэмплов."""
+    root = build_tree(stacks)
+    rects = []
+    if root['value']:
+        layout(root, 0, 0, WIDTH / root['value'], rects)
+    depth = max((rect[1] for rect in rects), default=0) + 1
+    height = (depth + 2) * FRAME_HEIGHT
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{WIDTH}" '
+        f'height="{height}" font-family="monospace" '
+        f'font-size="{FONT_SIZE}">',
+        f'<text x="4" y="{FRAME_HEIGHT - 4}">{escape(title)}</text>',
+    ]
+    total = root['value'] or 1
+    for x, level, width, name, value in rects:
+        y = height - (level + 1) * FRAME_HEIGHT
+        label = name if len(name) * CHAR_WIDTH < width - 4 else ''
+        if not label and width > 4 * CHAR_WIDTH:
+            label = name[:int((width - 4) / CHAR_WIDTH) - 2] + '..'
+        parts.append(
+            f'<g><title>{escape(name)} ({value} сэмплов, '
+            f'{value * 100 / total:.1f}%)</title>'
+            f'<rect x="{x:.1f}" y="{y}" width="{width:.1f}" '
+            f'height="{FRAME_HEIGHT - 1}" fill="{frame_color(name)}"/>'
+            f'<text x="{x + 2:.1f}" y="{y + FRAME_HEIGHT - 4}">'
+            f'{escape(label)}</text></g>'
+        )
+    parts.append('</svg>')
+    return '\n'.join(parts)
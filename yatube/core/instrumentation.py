@@ -0,0 +1,101 @@
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+CACHE_METHODS = ('get', 'get_many', 'set', 'set_many', 'add', 'delete',
+                 'delete_many', 'incr', 'decr', 'has_key')
+
+_local = threading.local()
+
+
+def current_timings():
+    """Счётчик времени по компонентам для текущего запроса или None."""
+    return getattr(_local, 'timings', None)
+
+
+@contextmanager
+def collect_timings():
+    _local.timings = Counter()
+    try:
+        yield _local.timings
+    finally:
+        _local.timings = None
+
+
+@contextmanager
+def timed(component):
+    """Добавляет длительность блока к компоненту текущего запроса.
+
+    Вложенные блоки одного компонента не учитываются повторно.
+    """
+    timings = current_timings()
+    active = getattr(_local, 'active', None)
+    if timings is None or (active is not None and component in active):
+        yield
+        return
+    if active is None:
+        active = _local.active = set()
+    active.add(component)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings[component] += time.perf_counter() - start
+        active.discard(component)
+
+
+def timed_method(component, method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with timed(component):
+            return method(*args, **kwargs)
+    wrapper.instrumented = True
+    return wrapper
+
+
+def patch(owner, name, component):
+    method = getattr(owner, name)
+    if not getattr(method, 'instrumented', False):
+        setattr(owner, name, timed_method(component, method))
+
+
+class DatabaseTimer:
+    """Обёртка connection.execute_wrapper для компонента db."""
+
+    def __call__(self, execute, sql, params, many, context):
+        with timed('db'):
+            return execute(sql, params, many, context)
+
+
+def install():
+    """Подключает замеры шаблонов, кэша и sorl-thumbnail.
+
+    Вызывается из CoreConfig.ready только при включённом SERVER_TIMING,
+    так что без него никакие методы не оборачиваются.
+    """
+    from django.conf import settings
+    from django.core.cache import caches
+    from django.template.backends.django import Template
+    from sorl.thumbnail.base import ThumbnailBackend
+
+    patch(Template, 'render', 'tpl')
+    if settings.JINJA2_ENABLED:
+        from django.template.backends.jinja2 import (
+            Template as Jinja2Template)
+        patch(Jinja2Template, 'render', 'tpl')
+    patch(ThumbnailBackend, 'get_thumbnail', 'thumb')
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        for name in CACHE_METHODS:
+            patch(backend, name, 'cache')
+
+
+def current_view():
+    """Имя представления, обрабатывающего текущий запрос."""
+    return getattr(_local, 'view_name', '')
+
+
+def set_current_view(view_name):
+    _local.view_name = view_name
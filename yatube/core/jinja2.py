@@ -0,0 +1,46 @@
+import logging
+
+from django.conf import settings
+from django.template.defaultfilters import date as date_filter
+from django.templatetags.static import static
+from django.urls import reverse
+from django.utils.timezone import template_localtime
+from jinja2 import Environment
+from sorl.thumbnail import get_thumbnail
+
+from .templatetags.user_filters import addclass
+
+logger = logging.getLogger('core.jinja2')
+
+
+def url(name, *args, **kwargs):
+    return reverse(name, args=args, kwargs=kwargs)
+
+
+def date(value, arg=None):
+    """Фильтр date из DTL: DTL переводит время в локальное сам."""
+    return date_filter(template_localtime(value), arg)
+
+
+def thumbnail(file_, geometry, **options):
+    """Аналог тега {% thumbnail %}: миниатюра или None.
+
+    Как и тег, при выключенном THUMBNAIL_DEBUG ошибки только пишутся
+    в лог, а страница рендерится без картинки.
+    """
+    if not file_:
+        return None
+    try:
+        return get_thumbnail(file_, geometry, **options)
+    except Exception:
+        if settings.THUMBNAIL_DEBUG:
+            raise
+        logger.exception('Не удалось построить миниатюру %s', file_)
+        return None
+
+
+def environment(**options):
+    env = Environment(**options)
+    env.globals.update(static=static, url=url, thumbnail=thumbnail)
+    env.filters.update(addclass=addclass, date=date)
+    return env
@@ -0,0 +1,176 @@
+import io
+import random
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from http.cookies import SimpleCookie
+from importlib import import_module
+from urllib.parse import urlencode, urlsplit
+
+from django.conf import settings
+from django.contrib.auth import login
+from django.core.signals import got_request_exception
+from django.db import OperationalError
+from django.http import HttpRequest
+from django.urls import reverse
+
+from core.ratelimit import ENVIRON_SWITCH
+
+
+class LockErrorCounter:
+    """Считает ошибки «database is locked», пойманные Django в запросах."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.count = 0
+
+    def __call__(self, sender, request=None, **kwargs):
+        error = sys.exc_info()[1]
+        if isinstance(error, OperationalError) and 'locked' in str(error):
+            with self.lock:
+                self.count += 1
+
+    def __enter__(self):
+        got_request_exception.connect(self, weak=False)
+        return self
+
+    def __exit__(self, *exc_info):
+        got_request_exception.disconnect(self)
+
+
+class WSGIClient:
+    """Минимальный HTTP-клиент, вызывающий WSGI-приложение напрямую."""
+
+    def __init__(self, application, ratelimit=True):
+        self.application = application
+        self.ratelimit = ratelimit
+        self.cookies = {}
+
+    def login(self, user):
+        engine = import_module(settings.SESSION_ENGINE)
+        request = HttpRequest()
+        request.session = engine.SessionStore()
+        login(request, user, 'django.contrib.auth.backends.ModelBackend')
+        request.session.save()
+        self.cookies[settings.SESSION_COOKIE_NAME] = (
+            request.session.session_key)
+        # Токен CSRF выдаёт сама форма в cookie, как браузеру.
+        self.get(reverse('posts:post_create'))
+
+    def request(self, method, url, data=None):
+        parts = urlsplit(url)
+        body = b''
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self.cookies.get(
+                settings.CSRF_COOKIE_NAME, ''))
+            body = urlencode(data).encode()
+        environ = {
+            'REQUEST_METHOD': method,
+            'PATH_INFO': parts.path,
+            'QUERY_STRING': parts.query,
+            'SERVER_NAME': 'localhost',
+            'SERVER_PORT': '80',
+            'SERVER_PROTOCOL': 'HTTP/1.1',
+            'HTTP_HOST': 'localhost',
+            'REMOTE_ADDR': '127.0.0.1',
+            'CONTENT_TYPE': 'application/x-www-form-urlencoded',
+            'CONTENT_LENGTH': str(len(body)),
+            'HTTP_COOKIE': '; '.join(
+                f'{name}={value}' for name, value in self.cookies.items()),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': 'http',
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': False,
+            'wsgi.run_once': False,
+            ENVIRON_SWITCH: self.ratelimit,
+        }
+        status = {}
+
+        def start_response(status_line, headers, exc_info=None):
+            status['code'] = int(status_line.split()[0])
+            status['headers'] = headers
+
+        result = self.application(environ, start_response)
+        try:
+            for _ in result:
+                pass
+        finally:
+            if hasattr(result, 'close'):
+                result.close()
+        for name, value in status['headers']:
+            if name.lower() == 'set-cookie':
+                for morsel in SimpleCookie(value).values():
+                    self.cookies[morsel.key] = morsel.value
+        return status['code']
+
+    def get(self, url):
+        return self.request('GET', url)
+
+    def post(self, url, data):
+        return self.request('POST', url, data)
+
+
+class Journey:
+    """Сценарий пользователя: лента, пост, комментарий, подписка, избранное.
+
+    Каждый шаг записывает задержку и код ответа в results.
+    """
+
+    def __init__(self, client, post_ids, usernames, rng):
+        self.client = client
+        self.post_ids = post_ids
+        self.usernames = usernames
+        self.random = rng
+
+    def step(self, results, name, func, *args):
+        start = time.perf_counter()
+        status = func(*args)
+        results['latency'][name].append((time.perf_counter() - start) * 1000)
+        results['status'][status] += 1
+
+    def run(self, results):
+        post_id = self.random.choice(self.post_ids)
+        page = self.random.randint(1, 3)
+        self.step(results, 'index', self.client.get,
+                  f'{reverse("posts:index")}?page={page}')
+        self.step(results, 'post_detail', self.client.get,
+                  reverse('posts:post_detail', args=[post_id]))
+        self.step(results, 'add_comment', self.client.post,
+                  reverse('posts:add_comment', args=[post_id]),
+                  {'text': f'Нагрузочный комментарий {time.time()}'})
+        self.step(results, 'profile_follow', self.client.get,
+                  reverse('posts:profile_follow',
+                          args=[self.random.choice(self.usernames)]))
+        self.step(results, 'follow_index', self.client.get,
+                  reverse('posts:follow_index'))
+
+
+def new_results():
+    return {'latency': defaultdict(list), 'status': Counter()}
+
+
+def run_worker(application, ratelimit, user, post_ids, usernames, deadline,
+               seed):
+    """Прогоняет сценарии одного виртуального пользователя до deadline.
+
+    ratelimit=False выключает ограничение частоты для его запросов.
+    """
+    client = WSGIClient(application, ratelimit)
+    client.login(user)
+    journey = Journey(client, post_ids, usernames, random.Random(seed))
+    results = new_results()
+    while time.monotonic() < deadline:
+        journey.run(results)
+    return results
+
+
+def merge(results_list):
+    merged = new_results()
+    for results in results_list:
+        for name, values in results['latency'].items():
+            merged['latency'][name].extend(values)
+        merged['status'].update(results['status'])
+    return merged
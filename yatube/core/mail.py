@@ -0,0 +1,125 @@
+import datetime
+import logging
+import pickle
+
+from django.conf import settings
+from django.core.mail import get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+from django.db.models import Q
+from django.utils import timezone
+
+from .models import QueuedEmail
+from .taskqueue import claim_rows, exponential_backoff
+
+logger = logging.getLogger('core.mail')
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """EMAIL_BACKEND, который только сохраняет письма в QueuedEmail.
+
+    Запрос не ждёт почтовый сервер: письма отправляет команда
+    send_queued_mail через EMAIL_DELIVERY_BACKEND.
+    """
+
+    def send_messages(self, email_messages):
+        now = timezone.now()
+        rows = []
+        for message in email_messages:
+            # Соединение очереди не нужно при отправке и не должно
+            # попадать в pickle.
+            message.connection = None
+            rows.append(QueuedEmail(
+                message=pickle.dumps(message),
+                recipients=', '.join(message.recipients())[:1000],
+                subject=str(message.subject)[:255],
+                next_attempt=now,
+            ))
+        QueuedEmail.objects.bulk_create(rows)
+        return len(rows)
+
+
+def backoff(attempts):
+    """Задержка перед следующей попыткой: растёт вдвое, не больше часа."""
+    return exponential_backoff(settings.EMAIL_QUEUE_RETRY_DELAY, attempts,
+                               limit=3600)
+
+
+def claim(batch_size):
+    """Забирает до batch_size готовых писем для этого отправителя.
+
+    Разметка та же, что у задач (core.taskqueue.claim_rows), и два
+    отправителя не получат одно письмо. Письма отправителя, упавшего
+    посреди пачки, снова берутся через EMAIL_QUEUE_LOCK_TIMEOUT.
+    """
+    now = timezone.now()
+    free = Q(locked_by='') | Q(locked_at__lt=now - datetime.timedelta(
+        seconds=settings.EMAIL_QUEUE_LOCK_TIMEOUT))
+    ready = QueuedEmail.objects.filter(
+        free,
+        sent__isnull=True,
+        next_attempt__lte=now,
+        attempts__lt=settings.EMAIL_QUEUE_MAX_ATTEMPTS,
+    )
+    return claim_rows(ready, batch_size)
+
+
+def finish(email, error=None):
+    """Записывает попытку отправки и снимает блокировку письма."""
+    email.attempts += 1
+    email.locked_by = ''
+    if error is None:
+        email.sent = timezone.now()
+    else:
+        email.last_error = repr(error)
+        email.next_attempt = timezone.now() + backoff(email.attempts)
+    email.save(update_fields=['attempts', 'last_error', 'next_attempt',
+                              'sent', 'locked_by'])
+
+
+def send_queued(batch_size):
+    """Отправляет пачку готовых к отправке писем через одно соединение.
+
+    Неудачная попытка откладывает письмо с экспоненциальной задержкой;
+    если не открывается само соединение, откладывается весь остаток
+    пачки. После EMAIL_QUEUE_MAX_ATTEMPTS попыток письмо остаётся
+    в таблице с last_error. Возвращает (отправлено, ошибок).
+    """
+    pending = claim(batch_size)
+    sent = failed = 0
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    try:
+        while pending:
+            try:
+                connection.open()
+            except Exception as error:
+                logger.warning('Нет соединения с почтовым сервером: %s',
+                               error)
+                for email in pending:
+                    finish(email, error)
+                failed += len(pending)
+                break
+            while pending:
+                email = pending.pop(0)
+                try:
+                    connection.send_messages([pickle.loads(email.message)])
+                except Exception as error:
+                    logger.warning('Письмо %s не отправлено: %s',
+                                   email.pk, error)
+                    failed += 1
+                    finish(email, error)
+                    # Соединение могло оборваться — остаток пачки
+                    # отправится через новое.
+                    close(connection)
+                    break
+                sent += 1
+                finish(email)
+    finally:
+        close(connection)
+    return sent, failed
+
+
+def close(connection):
+    try:
+        connection.close()
+    except Exception as error:
+        logger.warning('Не удалось закрыть соединение: %s', error)
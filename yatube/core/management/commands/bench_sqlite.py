@@ -0,0 +1,147 @@
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.stats import summarize
+
+SCHEMA = '''
+CREATE TABLE post (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    author_id INTEGER NOT NULL,
+    text TEXT NOT NULL,
+    pub_date REAL NOT NULL
+);
+CREATE INDEX post_author_date ON post (author_id, pub_date);
+'''
+READ_SQL = ('SELECT id, text, pub_date FROM post WHERE author_id = ? '
+            'ORDER BY pub_date DESC LIMIT 10')
+WRITE_SQL = 'INSERT INTO post (author_id, text, pub_date) VALUES (?, ?, ?)'
+AUTHORS = 200
+
+
+def connect(path, pragmas, timeout):
+    connection = sqlite3.connect(path, timeout=timeout,
+                                 check_same_thread=False)
+    for name, value in pragmas.items():
+        connection.execute(f'PRAGMA {name} = {value}')
+    return connection
+
+
+def prepare(path, rows):
+    connection = sqlite3.connect(path)
+    connection.executescript(SCHEMA)
+    connection.executemany(WRITE_SQL, (
+        (i % AUTHORS, 'x' * 200, time.time()) for i in range(rows)
+    ))
+    connection.commit()
+    connection.close()
+
+
+def run_worker(path, pragmas, persistent, timeout, write_ratio, deadline,
+               seed, results, lock):
+    """Смешанная нагрузка одного потока: чтения и вставки до deadline."""
+    rng = random.Random(seed)
+    latencies = {'read': [], 'write': []}
+    errors = 0
+    connection = connect(path, pragmas, timeout) if persistent else None
+    while time.monotonic() < deadline:
+        kind = 'write' if rng.random() < write_ratio else 'read'
+        start = time.perf_counter()
+        conn = connection or connect(path, pragmas, timeout)
+        try:
+            if kind == 'write':
+                with conn:
+                    conn.execute(WRITE_SQL, (rng.randrange(AUTHORS),
+                                             'x' * 200, time.time()))
+            else:
+                conn.execute(READ_SQL, (rng.randrange(AUTHORS),)).fetchall()
+        except sqlite3.OperationalError:
+            errors += 1
+            continue
+        finally:
+            if connection is None:
+                conn.close()
+        latencies[kind].append((time.perf_counter() - start) * 1000)
+    if connection is not None:
+        connection.close()
+    with lock:
+        for kind, values in latencies.items():
+            results[kind].extend(values)
+        results['errors'] += errors
+
+
+class Command(BaseCommand):
+    help = ('Смешанная нагрузка чтение/запись на временной базе SQLite: '
+            'профиль default против production (WAL, PRAGMA, '
+            'постоянные соединения)')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--duration', type=float, default=5,
+                            help='Длительность прогона каждого профиля, с')
+        parser.add_argument('--write-ratio', type=float, default=0.2)
+        parser.add_argument('--rows', type=int, default=20000,
+                            help='Строк в таблице перед прогоном')
+        parser.add_argument('--timeout', type=float, default=5,
+                            help='Ожидание блокировки sqlite3, с')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Файл для результатов JSON')
+
+    def handle(self, *args, **options):
+        profiles = (
+            ('default', {}, False),
+            ('production', settings.SQLITE_PRODUCTION_PRAGMAS, True),
+        )
+        report = []
+        for name, pragmas, persistent in profiles:
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, 'bench.sqlite3')
+                prepare(path, options['rows'])
+                report.append(self.run(name, path, pragmas, persistent,
+                                       options))
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+
+    def run(self, name, path, pragmas, persistent, options):
+        results = {'read': [], 'write': [], 'errors': 0}
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+        start = time.monotonic()
+        threads = [
+            threading.Thread(target=run_worker, args=(
+                path, pragmas, persistent, options['timeout'],
+                options['write_ratio'], deadline, options['seed'] + i,
+                results, lock,
+            ))
+            for i in range(options['threads'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.monotonic() - start
+        total = len(results['read']) + len(results['write'])
+        row = {
+            'profile': name,
+            'threads': options['threads'],
+            'ops': total,
+            'throughput_ops': round(total / elapsed, 2),
+            'lock_errors': results['errors'],
+            'read': summarize(results['read']),
+            'write': summarize(results['write']),
+        }
+        self.stdout.write(
+            f'{name:10} {row["throughput_ops"]:9.1f} оп/с '
+            f'чтение p95={row["read"]["p95_ms"]:7.2f} '
+            f'запись p95={row["write"]["p95_ms"]:7.2f} мс '
+            f'locked={results["errors"]}'
+        )
+        return row
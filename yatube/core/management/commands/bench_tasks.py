@@ -0,0 +1,60 @@
+import json
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from core.models import Task
+from core.tasks import noop
+
+
+class Command(BaseCommand):
+    help = ('Замеряет пропускную способность очереди задач: ставит '
+            '--tasks пустых задач и выполняет их воркером с разным '
+            'числом процессов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tasks', type=int, default=2000)
+        parser.add_argument('--processes', default='1,2,4',
+                            help='Число процессов, через запятую')
+        parser.add_argument('--batch-size', type=int, default=20)
+        parser.add_argument('--output', help='Файл для результатов JSON')
+
+    def handle(self, *args, **options):
+        report = []
+        for processes in map(int, options['processes'].split(',')):
+            start = time.monotonic()
+            self.enqueue(options['tasks'])
+            enqueued = time.monotonic()
+            call_command('worker', processes=processes, burst=True,
+                         batch_size=options['batch_size'], interval=0.05,
+                         stdout=self.stdout if options['verbosity'] > 1
+                         else None)
+            finished = time.monotonic()
+            done = Task.objects.filter(name=noop.task_name,
+                                       status=Task.DONE).count()
+            Task.objects.filter(name=noop.task_name).delete()
+            row = {
+                'processes': processes,
+                'tasks': done,
+                'enqueue_per_s': round(
+                    options['tasks'] / (enqueued - start), 1),
+                'throughput_per_s': round(done / (finished - enqueued), 1),
+            }
+            report.append(row)
+            self.stdout.write(
+                f'processes={processes:2} выполнено={done:6} '
+                f'{row["throughput_per_s"]:8.1f} задач/с '
+                f'(постановка {row["enqueue_per_s"]:.0f} задач/с)'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2)
+
+    def enqueue(self, count):
+        now = timezone.now()
+        Task.objects.bulk_create(
+            Task(name=noop.task_name, run_at=now, max_attempts=1)
+            for _ in range(count)
+        )
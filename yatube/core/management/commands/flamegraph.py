@@ -0,0 +1,59 @@
+import glob
+import os
+import pstats
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.flamegraph import read_collapsed, render_svg
+
+
+class Command(BaseCommand):
+    help = ('Сводит профили из PROFILER_DIR в flame graph (SVG и folded) '
+            'и отчёт cProfile для каждого представления')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--input', default=settings.PROFILER_DIR)
+        parser.add_argument('--output',
+                            help='Каталог для отчётов (по умолчанию input)')
+        parser.add_argument('--top', type=int, default=40,
+                            help='Строк в отчёте cProfile')
+
+    def handle(self, *args, **options):
+        source = options['input']
+        target = options['output'] or source
+        os.makedirs(target, exist_ok=True)
+        if not os.path.isdir(source):
+            self.stdout.write(f'Каталог {source} не найден')
+            return
+        for entry in sorted(os.scandir(source), key=lambda e: e.name):
+            if not entry.is_dir():
+                continue
+            self.collapsed(entry, target)
+            self.cprofile(entry, target, options['top'])
+
+    def collapsed(self, entry, target):
+        paths = glob.glob(os.path.join(entry.path, '*.collapsed'))
+        if not paths:
+            return
+        stacks = read_collapsed(paths)
+        base = os.path.join(target, entry.name)
+        with open(base + '.folded', 'w') as output:
+            for stack, count in stacks.most_common():
+                output.write(f'{stack} {count}\n')
+        with open(base + '.svg', 'w') as output:
+            output.write(render_svg(
+                stacks, f'{entry.name}: {len(paths)} запросов'))
+        self.stdout.write(f'{entry.name}: {len(paths)} профилей -> '
+                          f'{base}.svg')
+
+    def cprofile(self, entry, target, top):
+        paths = glob.glob(os.path.join(entry.path, '*.prof'))
+        if not paths:
+            return
+        report = os.path.join(target, entry.name + '.txt')
+        with open(report, 'w') as output:
+            stats = pstats.Stats(*paths, stream=output)
+            stats.sort_stats('cumulative').print_stats(top)
+        self.stdout.write(f'{entry.name}: {len(paths)} профилей -> '
+                          f'{report}')
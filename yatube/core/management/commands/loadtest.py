@@ -0,0 +1,115 @@
+import json
+import multiprocessing
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.loadtest import LockErrorCounter, merge, run_worker
+from core.stats import summarize
+from posts.models import Post, User
+
+
+def process_worker(args):
+    """Точка входа дочернего процесса в режиме --mode process."""
+    from yatube.wsgi import application
+
+    with LockErrorCounter() as lock_errors:
+        results = run_worker(application, *args)
+    connections.close_all()
+    return results, lock_errors.count
+
+
+class Command(BaseCommand):
+    help = ('Нагрузочный тест: гоняет сценарии пользователей через '
+            'yatube.wsgi.application в пуле потоков или процессов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', default='1,2,4,8',
+                            help='Число параллельных пользователей, '
+                                 'через запятую')
+        parser.add_argument('--duration', type=float, default=10,
+                            help='Длительность каждого прогона, с')
+        parser.add_argument('--mode', choices=('thread', 'process'),
+                            default='thread')
+        parser.add_argument('--seed', type=int, default=1)
+        parser.add_argument('--output', help='Файл для результатов JSON')
+        parser.add_argument(
+            '--ratelimit', action='store_true',
+            help='Не отключать ограничение частоты: сценарий пишет '
+                 'комментарии и подписки быстрее любого лимита',
+        )
+
+    def handle(self, *args, **options):
+        from yatube.wsgi import application
+
+        post_ids = list(Post.objects.values_list('id', flat=True)[:1000])
+        users = list(User.objects.filter(is_active=True)[:64])
+        if not post_ids or len(users) < 2:
+            raise CommandError('Нужны посты и хотя бы два пользователя: '
+                               'выполните seed_bench')
+        usernames = [user.username for user in users]
+        report = []
+        for workers in map(int, options['workers'].split(',')):
+            deadline = time.monotonic() + options['duration']
+            jobs = [
+                (options['ratelimit'], users[i % len(users)], post_ids,
+                 usernames, deadline, options['seed'] + i)
+                for i in range(workers)
+            ]
+            start = time.monotonic()
+            if options['mode'] == 'process':
+                results, lock_errors = self.run_processes(jobs)
+            else:
+                results, lock_errors = self.run_threads(application, jobs)
+            elapsed = time.monotonic() - start
+            report.append(self.summary(workers, elapsed, results,
+                                       lock_errors))
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+
+    def run_threads(self, application, jobs):
+        with LockErrorCounter() as lock_errors, \
+                ThreadPoolExecutor(len(jobs)) as pool:
+            futures = [pool.submit(run_worker, application, *job)
+                       for job in jobs]
+            results = merge(future.result() for future in futures)
+        connections.close_all()
+        return results, lock_errors.count
+
+    def run_processes(self, jobs):
+        connections.close_all()
+        context = multiprocessing.get_context('fork')
+        with context.Pool(len(jobs)) as pool:
+            outcomes = pool.map(process_worker, jobs)
+        return (merge(results for results, _ in outcomes),
+                sum(count for _, count in outcomes))
+
+    def summary(self, workers, elapsed, results, lock_errors):
+        latencies = [value for values in results['latency'].values()
+                     for value in values]
+        total = len(latencies)
+        errors = sum(count for status, count in results['status'].items()
+                     if status >= 500)
+        row = dict(
+            summarize(latencies),
+            workers=workers,
+            requests=total,
+            throughput_rps=round(total / elapsed, 2),
+            errors=errors,
+            throttled=results['status'][429],
+            lock_errors=lock_errors,
+            status={str(key): value
+                    for key, value in results['status'].items()},
+            steps={name: summarize(values)
+                   for name, values in results['latency'].items()},
+        )
+        self.stdout.write(
+            f'workers={workers:3} {row["throughput_rps"]:8.1f} запр/с '
+            f'p50={row["p50_ms"]:7.1f} p95={row["p95_ms"]:7.1f} '
+            f'p99={row["p99_ms"]:7.1f} мс ошибок={errors} '
+            f'429={row["throttled"]} locked={lock_errors}'
+        )
+        return row
@@ -0,0 +1,17 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from core.profiling import make_token
+
+
+class Command(BaseCommand):
+    help = 'Выдаёт подписанное значение заголовка для профилирования запроса'
+
+    def handle(self, *args, **options):
+        header = settings.PROFILER_HEADER
+        if not header:
+            raise CommandError('PROFILER_HEADER не задан')
+        if header.startswith('HTTP_'):
+            header = header[5:]
+        header = header.replace('_', '-').title()
+        self.stdout.write(f'{header}: {make_token()}')
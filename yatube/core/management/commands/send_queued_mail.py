@@ -0,0 +1,43 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+
+from core.mail import logger, send_queued
+
+
+class Command(BaseCommand):
+    help = ('Отправляет письма из очереди QueuedEmail пачками через одно '
+            'соединение EMAIL_DELIVERY_BACKEND; с --loop работает '
+            'постоянно')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.EMAIL_QUEUE_BATCH_SIZE)
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float,
+                            default=settings.EMAIL_QUEUE_INTERVAL,
+                            help='Пауза, когда очередь пуста, с')
+
+    def handle(self, *args, **options):
+        total_sent = total_failed = 0
+        while True:
+            try:
+                sent, failed = send_queued(options['batch_size'])
+            except OperationalError as error:
+                # Запись держит другой процесс дольше таймаута базы.
+                if not options['loop']:
+                    raise
+                logger.warning('Очередь писем недоступна: %s', error)
+                time.sleep(options['interval'])
+                continue
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                continue
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
+        self.stdout.write(
+            f'Отправлено: {total_sent}, неудачных попыток: {total_failed}')
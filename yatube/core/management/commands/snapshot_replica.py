@@ -0,0 +1,32 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.replica import snapshot
+
+
+class Command(BaseCommand):
+    help = ('Снимает копию основной базы в файл реплики; с --loop '
+            'повторяет снимок каждые REPLICA_SNAPSHOT_INTERVAL секунд')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float,
+                            default=settings.REPLICA_SNAPSHOT_INTERVAL)
+
+    def handle(self, *args, **options):
+        alias = settings.REPLICA_ALIAS
+        if not alias:
+            raise CommandError('Реплика выключена: задайте DB_REPLICA=1')
+        source = connections.databases['default']['NAME']
+        target = connections.databases[alias]['NAME']
+        while True:
+            start = time.monotonic()
+            snapshot(source, target)
+            elapsed = time.monotonic() - start
+            self.stdout.write(f'{target}: снимок за {elapsed * 1000:.0f} мс')
+            if not options['loop']:
+                return
+            time.sleep(max(0, options['interval'] - elapsed))
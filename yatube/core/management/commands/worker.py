@@ -0,0 +1,45 @@
+import multiprocessing
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from core.taskqueue import discover, work
+
+
+def process_worker(args):
+    """Точка входа дочернего процесса исполнителя."""
+    try:
+        return work(*args)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = ('Выполняет фоновые задачи из таблицы Task в нескольких '
+            'процессах; с --burst завершается, когда очередь пуста')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--processes', type=int,
+                            default=settings.TASKS_WORKER_PROCESSES)
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.TASKS_BATCH_SIZE)
+        parser.add_argument('--interval', type=float,
+                            default=settings.TASKS_POLL_INTERVAL,
+                            help='Пауза, когда очередь пуста, с')
+        parser.add_argument('--burst', action='store_true')
+
+    def handle(self, *args, **options):
+        discover()
+        job = (options['batch_size'], options['interval'], options['burst'])
+        if options['processes'] <= 1:
+            results = [work(*job)]
+        else:
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with context.Pool(options['processes']) as pool:
+                results = pool.map(process_worker,
+                                   [job] * options['processes'])
+        done = sum(result[0] for result in results)
+        failed = sum(result[1] for result in results)
+        self.stdout.write(f'Выполнено задач: {done}, с ошибкой: {failed}')
@@ -0,0 +1,190 @@
+import bisect
+import glob
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+
+CACHE_KINDS = (
+    ('views.decorators.cache.cache_page.', 'cache_page'),
+    ('views.decorators.cache.cache_header.', 'cache_header'),
+    ('template.cache.', 'fragment'),
+)
+
+
+def label_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+class Registry:
+    """Счётчики и гистограммы с фиксированными корзинами для процесса.
+
+    Значения периодически сбрасываются в файл METRICS_DIR/<pid>.json,
+    а эндпоинт метрик суммирует файлы всех процессов.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.counters = defaultdict(float)
+        self.histograms = {}
+        self.flushed_at = 0.0
+
+    def inc(self, name, labels, value=1):
+        with self.lock:
+            self.counters[(name, label_key(labels))] += value
+
+    def observe(self, name, labels, value):
+        buckets = settings.METRICS_LATENCY_BUCKETS
+        key = (name, label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = {
+                    'buckets': [0] * len(buckets), 'sum': 0.0, 'count': 0,
+                }
+            index = bisect.bisect_left(buckets, value)
+            if index < len(buckets):
+                histogram['buckets'][index] += 1
+            histogram['sum'] += value
+            histogram['count'] += 1
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                'counters': [[name, dict(labels), value] for
+                             (name, labels), value in self.counters.items()],
+                'histograms': [
+                    [name, dict(labels), dict(histogram,
+                                              buckets=histogram['buckets'][:])]
+                    for (name, labels), histogram in self.histograms.items()
+                ],
+            }
+
+    def flush(self, force=False):
+        now = time.monotonic()
+        interval = settings.METRICS_FLUSH_INTERVAL
+        if not force and now - self.flushed_at < interval:
+            return
+        self.flushed_at = now
+        directory = settings.METRICS_DIR
+        os.makedirs(directory, exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        with os.fdopen(handle, 'w') as output:
+            json.dump(self.snapshot(), output)
+        os.replace(temp_path, os.path.join(directory, f'{os.getpid()}.json'))
+
+
+registry = Registry()
+
+
+def aggregate(directory):
+    """Суммирует снимки всех процессов из каталога."""
+    counters = defaultdict(float)
+    histograms = {}
+    for path in glob.glob(os.path.join(directory, '*.json')):
+        try:
+            with open(path) as source:
+                data = json.load(source)
+        except (OSError, ValueError):
+            continue
+        for name, labels, value in data['counters']:
+            counters[(name, label_key(labels))] += value
+        for name, labels, histogram in data['histograms']:
+            key = (name, label_key(labels))
+            total = histograms.setdefault(key, {
+                'buckets': [0] * len(histogram['buckets']),
+                'sum': 0.0, 'count': 0,
+            })
+            for index, count in enumerate(histogram['buckets']):
+                total['buckets'][index] += count
+            total['sum'] += histogram['sum']
+            total['count'] += histogram['count']
+    return counters, histograms
+
+
+def format_labels(labels, extra=()):
+    pairs = list(labels) + list(extra)
+    if not pairs:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"'))
+        for name, value in pairs
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+
+def render_prometheus(counters, histograms):
+    """Текстовый формат экспозиции Prometheus 0.0.4."""
+    lines = []
+    for name in sorted({name for name, _ in counters}):
+        lines.append(f'# TYPE {name} counter')
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f'{name}{format_labels(labels)} {value:g}')
+    bounds = settings.METRICS_LATENCY_BUCKETS
+    for name in sorted({name for name, _ in histograms}):
+        lines.append(f'# TYPE {name} histogram')
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, count in zip(bounds, histogram['buckets']):
+                cumulative += count
+                lines.append(f'{name}_bucket'
+                             f'{format_labels(labels, [("le", bound)])} '
+                             f'{cumulative}')
+            lines.append(f'{name}_bucket'
+                         f'{format_labels(labels, [("le", "+Inf")])} '
+                         f'{histogram["count"]}')
+            lines.append(f'{name}_sum{format_labels(labels)} '
+                         f'{histogram["sum"]:g}')
+            lines.append(f'{name}_count{format_labels(labels)} '
+                         f'{histogram["count"]}')
+    return '\n'.join(lines) + '\n'
+
+
+def cache_kind(key):
+    from sorl.thumbnail.conf import settings as sorl_settings
+    if isinstance(key, str):
+        if key.startswith(sorl_settings.THUMBNAIL_KEY_PREFIX):
+            return 'thumbnail'
+        for prefix, kind in CACHE_KINDS:
+            if key.startswith(prefix):
+                return kind
+    return 'other'
+
+
+def counting_get(method):
+    @wraps(method)
+    def wrapper(self, key, default=None, version=None):
+        value = method(self, key, default, version)
+        kind = cache_kind(key)
+        hit = value is not default
+        if kind == 'cache_header':
+            # cache_page сначала ищет заголовки: их промах — промах
+            # страницы, а при попадании исход решает поиск самой страницы.
+            if hit:
+                return value
+            kind = 'cache_page'
+        registry.inc('yatube_cache_requests_total', {
+            'cache': kind,
+            'result': 'hit' if hit else 'miss',
+        })
+        return value
+    wrapper.counts_hits = True
+    return wrapper
+
+
+def install():
+    """Считает попадания и промахи cache.get по видам кэша."""
+    from django.core.cache import caches
+
+    for alias in settings.CACHES:
+        backend = type(caches[alias])
+        if not getattr(backend.get, 'counts_hits', False):
+            backend.get = counting_get(backend.get)
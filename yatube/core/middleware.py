@@ -0,0 +1,386 @@
+import hashlib
+import logging
+import os
+import threading
+import time
+import zlib
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+from django.middleware import gzip
+from django.utils.cache import patch_vary_headers
+
+from . import db, metrics, profiling, routers, staticfiles
+from .instrumentation import (DatabaseTimer, collect_timings,
+                              set_current_view)
+from .queries import QueryBudgetExceeded, QueryCollector
+
+logger = logging.getLogger('core.queries')
+overload_logger = logging.getLogger('core.overload')
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    if match is not None:
+        return match.view_name
+    return request.path
+
+
+def view_label(request):
+    """Имя представления для метрик и каталогов профилей: пути
+    несуществующих страниц не должны плодить ряды и каталоги."""
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match is not None else 'unresolved'
+
+
+class SlowQueryMiddleware:
+    """Сохраняет медленные запросы после отправки ответа.
+
+    SlowQueryLogger внутри запроса только копит их, а EXPLAIN и запись
+    в SlowQuery выполняются при закрытии ответа и не входят в его время.
+    """
+
+    def __init__(self, get_response):
+        if settings.SLOW_QUERY_MS <= 0:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db.buffer_slow_queries()
+        try:
+            response = self.get_response(request)
+        except Exception:
+            db.flush_slow_queries()
+            raise
+        response._closable_objects.append(db.SlowQueryFlush())
+        return response
+
+
+class QueryCountMiddleware:
+    """Считает SQL-запросы, их время и дубликаты для каждого запроса.
+
+    Бюджет берётся из декоратора query_budget, затем из QUERY_BUDGETS
+    по имени представления, затем из QUERY_BUDGET; запросы с подстроками
+    из QUERY_BUDGET_IGNORE в бюджет не входят. Превышение пишется в лог,
+    а при QUERY_BUDGET_STRICT (включён в тестах) — приводит к исключению.
+    Запросы, выполненные при чтении StreamingHttpResponse, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector(settings.QUERY_BUDGET_IGNORE)
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            try:
+                response = self.get_response(request)
+            finally:
+                set_current_view('')
+        self.check_budget(request, collector)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request.query_budget = getattr(view_func, 'query_budget', None)
+        set_current_view(view_name(request))
+
+    def check_budget(self, request, collector):
+        name = view_name(request)
+        budget = getattr(request, 'query_budget', None)
+        if budget is None:
+            budget = settings.QUERY_BUDGETS.get(name, settings.QUERY_BUDGET)
+        if collector.budget_count <= budget:
+            return
+        message = (
+            f'{name}: {collector.budget_count} SQL-запросов при бюджете '
+            f'{budget} (всего {collector.count}), '
+            f'{collector.duration * 1000:.1f} мс'
+        )
+        logger.warning(message, extra={
+            'view_name': name,
+            'query_count': collector.count,
+            'query_time': collector.duration,
+            'duplicates': collector.duplicates(),
+        })
+        if settings.QUERY_BUDGET_STRICT:
+            duplicates = '\n'.join(
+                f'{count} x {sql}'
+                for sql, count in collector.duplicates().items()
+            )
+            raise QueryBudgetExceeded(f'{message}\n{duplicates}')
+
+
+class ServerTimingMiddleware:
+    """Добавляет заголовок Server-Timing с разбивкой времени ответа.
+
+    Компоненты: db — SQL, tpl — рендеринг шаблонов, cache — обращения
+    к кэшу, thumb — sorl-thumbnail (включая его кэш и базу), total — весь
+    запрос. Без SERVER_TIMING middleware отключается целиком.
+    """
+
+    # Значения заголовков должны быть в ASCII.
+    descriptions = {
+        'db': 'SQL',
+        'tpl': 'Templates',
+        'cache': 'Cache',
+        'thumb': 'Thumbnails',
+    }
+
+    def __init__(self, get_response):
+        if not settings.SERVER_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        start = time.perf_counter()
+        with collect_timings() as timings, ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(DatabaseTimer()))
+            response = self.get_response(request)
+            timings['total'] = time.perf_counter() - start
+            response['Server-Timing'] = self.header(timings)
+        return response
+
+    def header(self, timings):
+        metrics = []
+        for name in (*self.descriptions, 'total'):
+            if name not in timings:
+                continue
+            metric = f'{name};dur={timings[name] * 1000:.2f}'
+            if name in self.descriptions:
+                metric += f';desc="{self.descriptions[name]}"'
+            metrics.append(metric)
+        return ', '.join(metrics)
+
+
+class ProfilerMiddleware:
+    """Профилирует долю PROFILER_SAMPLE_RATE запросов.
+
+    Запрос с подписанным заголовком PROFILER_HEADER профилируется всегда.
+    Профили раскладываются по каталогам представлений в PROFILER_DIR,
+    свести их во flame graph можно командой flamegraph.
+    """
+
+    def __init__(self, get_response):
+        if settings.PROFILER_SAMPLE_RATE <= 0 and not settings.PROFILER_HEADER:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not profiling.should_profile(request):
+            return self.get_response(request)
+        recorder, suffix = profiling.make_recorder()
+        recorder.start()
+        try:
+            response = self.get_response(request)
+        finally:
+            recorder.stop()
+        path = profiling.save(recorder, suffix, view_label(request))
+        if profiling.has_valid_token(request):
+            response['X-Profile-Path'] = os.path.basename(path)
+        return response
+
+
+class MetricsMiddleware:
+    """Собирает задержку, коды ответов и число SQL-запросов по представлениям.
+
+    Значения копятся в core.metrics.registry и периодически сбрасываются
+    в общий каталог METRICS_DIR, откуда их читает эндпоинт /metrics/.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        metrics.install()
+        self.get_response = get_response
+
+    def __call__(self, request):
+        collector = QueryCollector()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(collector))
+            response = self.get_response(request)
+        duration = time.perf_counter() - start
+        labels = {'view': view_label(request)}
+        metrics.registry.observe(
+            'yatube_request_duration_seconds', labels, duration)
+        metrics.registry.inc('yatube_responses_total',
+                             dict(labels, status=response.status_code))
+        metrics.registry.inc('yatube_db_queries_total', labels,
+                             collector.count)
+        metrics.registry.inc('yatube_db_query_seconds_total', labels,
+                             collector.duration)
+        metrics.registry.flush()
+        return response
+
+
+class ReplicaPinMiddleware:
+    """Read-your-writes для реплики.
+
+    После представления с pin_primary браузер получает куку
+    REPLICA_PIN_COOKIE на REPLICA_STICKY_SECONDS; пока она жива, роутер
+    отправляет чтения этого пользователя в основную базу.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REPLICA_ALIAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        routers.set_pinned(settings.REPLICA_PIN_COOKIE in request.COOKIES)
+        try:
+            response = self.get_response(request)
+        finally:
+            routers.set_pinned(False)
+        if getattr(request, 'pin_primary', False):
+            response.set_cookie(settings.REPLICA_PIN_COOKIE, '1',
+                                max_age=settings.REPLICA_STICKY_SECONDS,
+                                httponly=True, samesite='Lax')
+        return response
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную статику из STATIC_ROOT до остальных middleware.
+
+    Включается, когда collectstatic уже собрал STATIC_ROOT; файлы, которых
+    там нет, проходят дальше как обычные запросы.
+    """
+
+    def __init__(self, get_response):
+        if not (settings.STATIC_ROOT and os.path.isdir(settings.STATIC_ROOT)):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.path.startswith(settings.STATIC_URL):
+            response = staticfiles.serve(
+                request, request.path[len(settings.STATIC_URL):])
+            if response is not None:
+                return response
+        return self.get_response(request)
+
+
+class GZipMiddleware(gzip.GZipMiddleware):
+    """GZip для текстовых ответов не короче GZIP_MIN_LENGTH байт.
+
+    Потоковые ответы сжимаются с flush после каждого куска, чтобы
+    long-poll и выгрузки доходили до клиента без задержки. Уже сжатые
+    ответы и типы не из GZIP_CONTENT_TYPES не трогаются.
+    """
+
+    def process_response(self, request, response):
+        content_type = response.get('Content-Type', '')
+        if (response.has_header('Content-Encoding')
+                or not content_type.startswith(settings.GZIP_CONTENT_TYPES)):
+            return response
+        if not response.streaming:
+            if len(response.content) < settings.GZIP_MIN_LENGTH:
+                return response
+            return super().process_response(request, response)
+        length = response.get('Content-Length')
+        if length is not None and int(length) < settings.GZIP_MIN_LENGTH:
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not gzip.re_accepts_gzip.search(
+                request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return response
+        response.streaming_content = compress_flushed(
+            response.streaming_content)
+        del response['Content-Length']
+        response['Content-Encoding'] = 'gzip'
+        return response
+
+
+def compress_flushed(chunks):
+    """Сжимает поток, отдавая каждый кусок сразу (Z_SYNC_FLUSH)."""
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        data += compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
+
+
+class ConcurrencyLimitMiddleware:
+    """Ограничивает число запросов, одновременно обрабатываемых процессом.
+
+    Сверх CONCURRENCY_LIMIT запрос ждёт свободного места не дольше
+    CONCURRENCY_WAIT секунд. Не дождавшийся GET без сессии получает
+    устаревшую копию страницы из кэша, остальные — 503 с Retry-After.
+    Копии успешных анонимных HTML-страниц обновляются не чаще раза
+    в CONCURRENCY_STALE_REFRESH секунд. Слот занимается в process_view,
+    чтобы представления с @concurrency_exempt (long-poll, которые
+    в основном спят) не держали его всё время ожидания.
+    """
+
+    def __init__(self, get_response):
+        if not settings.CONCURRENCY_LIMIT:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slots = threading.BoundedSemaphore(settings.CONCURRENCY_LIMIT)
+
+    def __call__(self, request):
+        try:
+            response = self.get_response(request)
+        finally:
+            if getattr(request, '_concurrency_slot', False):
+                request._concurrency_slot = False
+                self.slots.release()
+        if self.cacheable(request, response):
+            key = self.stale_key(request)
+            if cache.add(f'{key}:fresh', True,
+                         settings.CONCURRENCY_STALE_REFRESH):
+                cache.set(key, (response.content, response['Content-Type']),
+                          settings.CONCURRENCY_STALE_TIMEOUT)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if getattr(view_func, 'concurrency_exempt', False):
+            return None
+        if not self.slots.acquire(timeout=settings.CONCURRENCY_WAIT):
+            return self.overloaded(request)
+        request._concurrency_slot = True
+        return None
+
+    @staticmethod
+    def stale_key(request):
+        path = hashlib.md5(request.get_full_path().encode()).hexdigest()
+        return f'stale:{path}'
+
+    @staticmethod
+    def anonymous_read(request):
+        return (request.method in ('GET', 'HEAD')
+                and settings.SESSION_COOKIE_NAME not in request.COOKIES)
+
+    def cacheable(self, request, response):
+        return (self.anonymous_read(request)
+                and response.status_code == 200
+                and not response.streaming
+                and 'Warning' not in response
+                and response.get('Content-Type', '').startswith('text/html'))
+
+    def overloaded(self, request):
+        overload_logger.warning('Перегрузка: %s %s', request.method,
+                                request.path)
+        if self.anonymous_read(request):
+            stale = cache.get(self.stale_key(request))
+            if stale is not None:
+                content, content_type = stale
+                response = HttpResponse(content, content_type=content_type)
+                response['Warning'] = '110 - "Response is Stale"'
+                response['Cache-Control'] = 'no-cache'
+                return response
+        response = HttpResponse('Сервер перегружен, попробуйте позже.',
+                                status=503,
+                                content_type='text/plain; charset=utf-8')
+        response['Retry-After'] = '1'
+        return response
@@ -0,0 +1,34 @@
+# Generated by Django 2.2.16 on 2026-10-19 08:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Дата создания')),
+                ('fingerprint', models.TextField(verbose_name='Нормализованный SQL')),
+                ('fingerprint_hash', models.CharField(db_index=True, max_length=40, verbose_name='Хэш нормализованного SQL')),
+                ('sql', models.TextField(verbose_name='SQL')),
+                ('params', models.TextField(blank=True, verbose_name='Параметры')),
+                ('duration', models.FloatField(verbose_name='Длительность, мс')),
+                ('view_name', models.CharField(blank=True, max_length=200, verbose_name='Представление')),
+                ('frame', models.CharField(blank=True, max_length=500, verbose_name='Место вызова')),
+                ('plan', models.TextField(blank=True, verbose_name='EXPLAIN QUERY PLAN')),
+            ],
+            options={
+                'verbose_name': 'Медленный запрос',
+                'verbose_name_plural': 'Медленные запросы',
+                'ordering': ['-created'],
+            },
+        ),
+    ]
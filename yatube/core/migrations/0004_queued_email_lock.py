@@ -0,0 +1,23 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:36
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_task'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='queuedemail',
+            name='locked_at',
+            field=models.DateTimeField(blank=True, null=True, verbose_name='Взято'),
+        ),
+        migrations.AddField(
+            model_name='queuedemail',
+            name='locked_by',
+            field=models.CharField(blank=True, db_index=True, max_length=100, verbose_name='Отправитель'),
+        ),
+    ]
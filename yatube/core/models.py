@@ -11,3 +11,100 @@ class CreatedModel(models.Model):
     class Meta:
         # Это абстрактная модель:
         abstract = True
+
+
+class SlowQuery(CreatedModel):
+    """Запрос, выполнявшийся дольше SLOW_QUERY_MS."""
+    fingerprint = models.TextField('Нормализованный SQL')
+    fingerprint_hash = models.CharField(
+        'Хэш нормализованного SQL',
+        max_length=40,
+        db_index=True
+    )
+    sql = models.TextField('SQL')
+    params = models.TextField('Параметры', blank=True)
+    duration = models.FloatField('Длительность, мс')
+    view_name = models.CharField(
+        'Представление',
+        max_length=200,
+        blank=True
+    )
+    frame = models.CharField('Место вызова', max_length=500, blank=True)
+    plan = models.TextField('EXPLAIN QUERY PLAN', blank=True)
+
+    class Meta:
+        ordering = ['-created']
+        verbose_name = 'Медленный запрос'
+        verbose_name_plural = 'Медленные запросы'
+
+    def __str__(self):
+        return self.fingerprint[:50]
+
+    @property
+    def full_scan(self):
+        """План содержит просмотр таблицы без индекса."""
+        return any('SCAN' in line and 'INDEX' not in line
+                   for line in self.plan.splitlines())
+
+
+class QueuedEmail(CreatedModel):
+    """Письмо, ожидающее отправки командой send_queued_mail."""
+    message = models.BinaryField('Письмо (pickle EmailMessage)')
+    recipients = models.TextField('Получатели', blank=True)
+    subject = models.CharField('Тема', max_length=255, blank=True)
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    next_attempt = models.DateTimeField('Следующая попытка', db_index=True)
+    sent = models.DateTimeField('Отправлено', null=True, blank=True)
+    locked_by = models.CharField('Отправитель', max_length=100, blank=True,
+                                 db_index=True)
+    locked_at = models.DateTimeField('Взято', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['next_attempt']
+        verbose_name = 'Письмо в очереди'
+        verbose_name_plural = 'Очередь писем'
+
+    def __str__(self):
+        return self.subject
+
+
+class Task(CreatedModel):
+    """Фоновая задача очереди core.taskqueue."""
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (DONE, 'Выполнена'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField('Задача', max_length=200)
+    arguments = models.TextField('Аргументы (JSON)', default='{}')
+    priority = models.SmallIntegerField('Приоритет', default=0)
+    status = models.CharField('Статус', max_length=10,
+                              choices=STATUS_CHOICES, default=QUEUED)
+    run_at = models.DateTimeField('Запустить не раньше')
+    attempts = models.PositiveSmallIntegerField('Попыток', default=0)
+    max_attempts = models.PositiveSmallIntegerField('Максимум попыток',
+                                                    default=3)
+    locked_by = models.CharField('Исполнитель', max_length=100, blank=True)
+    locked_at = models.DateTimeField('Взята', null=True, blank=True)
+    last_error = models.TextField('Последняя ошибка', blank=True)
+
+    class Meta:
+        ordering = ['-priority', 'run_at', 'id']
+        indexes = [
+            # Выборка следующей пачки: WHERE status ORDER BY priority, run_at.
+            models.Index(fields=['status', '-priority', 'run_at', 'id'],
+                         name='task_claim_idx'),
+            models.Index(fields=['locked_by'], name='task_locked_by_idx'),
+        ]
+        verbose_name = 'Фоновая задача'
+        verbose_name_plural = 'Фоновые задачи'
+
+    def __str__(self):
+        return self.name
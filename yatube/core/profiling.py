@@ -0,0 +1,129 @@
+import cProfile
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+
+from django.conf import settings
+from django.core import signing
+
+TOKEN_SALT = 'core.profiling'
+SAFE_NAME_RE = re.compile(r'[^\w.-]+')
+
+
+def make_token():
+    """Подписанное значение заголовка, включающего профилирование."""
+    return signing.dumps('profile', salt=TOKEN_SALT)
+
+
+def has_valid_token(request):
+    token = request.META.get(settings.PROFILER_HEADER)
+    if not token:
+        return False
+    try:
+        signing.loads(token, salt=TOKEN_SALT,
+                      max_age=settings.PROFILER_TOKEN_MAX_AGE)
+    except signing.BadSignature:
+        return False
+    return True
+
+
+def should_profile(request):
+    rate = settings.PROFILER_SAMPLE_RATE
+    return (rate > 0 and random.random() < rate) or has_valid_token(request)
+
+
+def frame_name(frame):
+    code = frame.f_code
+    module = frame.f_globals.get('__name__', '?')
+    return f'{module}:{code.co_name}:{frame.f_lineno}'
+
+
+class StackSampler:
+    """Периодически снимает стек потока и считает одинаковые стеки.
+
+    Результат — строки в формате collapsed stacks («корень;...;лист N»),
+    который понимают flamegraph.pl и speedscope.
+    """
+
+    def __init__(self, thread_id, interval):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self.run, daemon=True)
+
+    def run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            names = []
+            while frame is not None:
+                names.append(frame_name(frame))
+                frame = frame.f_back
+            if names:
+                self.stacks[';'.join(reversed(names))] += 1
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def dump(self, path):
+        with open(path, 'w') as output:
+            for stack, count in self.stacks.items():
+                output.write(f'{stack} {count}\n')
+
+
+class CProfileRecorder:
+    def __init__(self):
+        self.profile = cProfile.Profile()
+
+    def start(self):
+        self.profile.enable()
+
+    def stop(self):
+        self.profile.disable()
+
+    def dump(self, path):
+        self.profile.dump_stats(path)
+
+
+def make_recorder():
+    if settings.PROFILER_MODE == 'cprofile':
+        return CProfileRecorder(), '.prof'
+    return StackSampler(threading.get_ident(),
+                        settings.PROFILER_INTERVAL), '.collapsed'
+
+
+def view_directory(view_name):
+    name = SAFE_NAME_RE.sub('_', view_name).strip('_') or 'unknown'
+    return os.path.join(settings.PROFILER_DIR, name)
+
+
+def rotate(directory, keep):
+    """Оставляет в каталоге только keep самых свежих профилей."""
+    entries = sorted(
+        (entry for entry in os.scandir(directory) if entry.is_file()),
+        key=lambda entry: entry.stat().st_mtime,
+    )
+    for entry in entries[:max(len(entries) - keep, 0)]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+def save(recorder, suffix, view_name):
+    directory = view_directory(view_name)
+    os.makedirs(directory, exist_ok=True)
+    name = f'{time.time():.0f}-{os.getpid()}-{uuid.uuid4().hex[:8]}{suffix}'
+    path = os.path.join(directory, name)
+    recorder.dump(path)
+    rotate(directory, settings.PROFILER_MAX_FILES)
+    return path
@@ -0,0 +1,64 @@
+import re
+import time
+from collections import Counter
+
+NUMBER_RE = re.compile(r'\b\d+\b')
+STRING_RE = re.compile(r"'(?:[^']|'')*'")
+IN_LIST_RE = re.compile(r'\(\s*(?:%s|\?)(?:\s*,\s*(?:%s|\?))*\s*\)')
+SPACE_RE = re.compile(r'\s+')
+SAVEPOINT_RE = re.compile(r'"s\d+_x\d+"')
+
+
+class QueryBudgetExceeded(Exception):
+    """Представление выполнило больше запросов, чем ему разрешено."""
+
+
+def query_budget(limit):
+    """Объявляет максимальное число SQL-запросов для представления."""
+    def decorator(view):
+        view.query_budget = limit
+        return view
+    return decorator
+
+
+def fingerprint(sql):
+    """Нормализованный SQL: литералы и списки IN заменены заглушками."""
+    sql = SAVEPOINT_RE.sub('?', sql)
+    sql = STRING_RE.sub('?', sql)
+    sql = NUMBER_RE.sub('?', sql)
+    sql = IN_LIST_RE.sub('(...)', sql)
+    return SPACE_RE.sub(' ', sql).strip()
+
+
+class QueryCollector:
+    """Обёртка connection.execute_wrapper, считающая запросы и их время.
+
+    Запросы, содержащие одну из подстрок ignore, считаются отдельно
+    в ignored и не входят в budget_count.
+    """
+
+    def __init__(self, ignore=()):
+        self.count = 0
+        self.ignored = 0
+        self.duration = 0.0
+        self.fingerprints = Counter()
+        self.ignore = tuple(ignore)
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += time.perf_counter() - start
+            self.count += 1
+            self.fingerprints[fingerprint(sql)] += 1
+            if any(pattern in sql for pattern in self.ignore):
+                self.ignored += 1
+
+    @property
+    def budget_count(self):
+        return self.count - self.ignored
+
+    def duplicates(self):
+        return {sql: count for sql, count in self.fingerprints.items()
+                if count > 1}
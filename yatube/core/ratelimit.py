@@ -0,0 +1,117 @@
+import functools
+import math
+import re
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.http import HttpResponse
+
+RATE_RE = re.compile(r'^(\d+)/(\d*)([smhd])$')
+PERIODS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+# Ключ WSGI environ, которым вызывающий код (нагрузочный тест) включает
+# или выключает лимиты для своих запросов. Заголовки HTTP попадают
+# в environ только как HTTP_*, так что клиент его не подделает.
+ENVIRON_SWITCH = 'yatube.ratelimit'
+
+
+def parse_rate(rate):
+    """'10/m' -> (10 запросов, период 60 с).
+
+    Перед единицей можно указать множитель: '5/10m' — 5 за 10 минут.
+    """
+    match = RATE_RE.match(rate)
+    if match is None:
+        raise ValueError(f'Некорректный лимит: {rate!r}')
+    count, multiplier, unit = match.groups()
+    return int(count), int(multiplier or 1) * PERIODS[unit]
+
+
+def client_key(request, key):
+    """Пользователь для key='user' (если вошёл), иначе IP-адрес."""
+    user = getattr(request, 'user', None)
+    if key == 'user' and user is not None and user.is_authenticated:
+        return f'user:{user.pk}'
+    return f'ip:{request.META.get("REMOTE_ADDR", "")}'
+
+
+def enabled(request):
+    """Включено ли ограничение для запроса: environ, затем настройка."""
+    return request.META.get(ENVIRON_SWITCH, settings.RATELIMIT_ENABLED)
+
+
+def take(bucket, limit, period):
+    """Учитывает запрос в корзине bucket.
+
+    Скользящее окно из двух счётчиков: текущий период и доля
+    предыдущего, ещё не «вытекшая» из окна. Как и token bucket, оно
+    пропускает до limit запросов подряд и дальше limit за period,
+    но обновляется только атомарными add/incr, поэтому параллельный
+    всплеск не проскакивает между чтением и записью. Отказ возвращает
+    токен. Возвращает (разрешено, через сколько секунд повторить).
+    """
+    now = time.time()
+    window, elapsed = divmod(now, period)
+    current = f'{bucket}:{int(window)}'
+    # Счётчик живёт два периода: в следующем он станет предыдущим.
+    cache.add(current, 0, timeout=2 * period + 1)
+    try:
+        used = cache.incr(current)
+    except ValueError:
+        # Ключ вытеснили между add и incr.
+        cache.add(current, 1, timeout=2 * period + 1)
+        used = 1
+    previous = cache.get(f'{bucket}:{int(window) - 1}', 0)
+    if previous * (1 - elapsed / period) + used <= limit:
+        return True, 0
+    try:
+        cache.decr(current)
+    except ValueError:
+        # Ключ вытеснили после incr: возвращать токен некуда.
+        pass
+    if used > limit or not previous:
+        return False, period - elapsed
+    # Когда доля предыдущего окна уменьшится настолько, что запрос влезет.
+    return False, period * (previous + used - limit) / previous - elapsed
+
+
+def too_many_requests(retry_after):
+    response = HttpResponse('Слишком много запросов, попробуйте позже.',
+                            status=429,
+                            content_type='text/plain; charset=utf-8')
+    response['Retry-After'] = str(max(1, math.ceil(retry_after)))
+    return response
+
+
+def rate_limit(rate, key='user', methods=('POST',)):
+    """Ограничение частоты представления: rate на пользователя или IP.
+
+    Лимит берётся из декоратора, затем из RATE_LIMITS по имени
+    представления. Считаются только запросы с методами из methods
+    (None — все). Сверх лимита — 429 с Retry-After без вызова
+    представления.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if enabled(request) and (
+                    methods is None or request.method in methods):
+                match = getattr(request, 'resolver_match', None)
+                name = match.view_name if match else view.__name__
+                limit, period = parse_rate(
+                    settings.RATE_LIMITS.get(name, rate))
+                allowed, retry_after = take(
+                    f'ratelimit:{name}:{client_key(request, key)}',
+                    limit, period)
+                if not allowed:
+                    return too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def concurrency_exempt(view):
+    """Не занимать слот ConcurrencyLimitMiddleware: long-poll
+    представления большую часть времени спят, а не работают."""
+    view.concurrency_exempt = True
+    return view
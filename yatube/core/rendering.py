@@ -0,0 +1,26 @@
+from django.conf import settings
+from django.shortcuts import render as django_render
+
+from .middleware import view_name
+
+
+def engine_for(request):
+    """Движок шаблонов для представления: jinja2 или django.
+
+    Переключатель — JINJA2_VIEWS; без установленного jinja2 всегда
+    используется DTL.
+    """
+    if settings.JINJA2_ENABLED and view_name(request) in settings.JINJA2_VIEWS:
+        return 'jinja2'
+    return 'django'
+
+
+def render(request, template_name, context=None):
+    """shortcuts.render с движком из engine_for.
+
+    Время рендеринга обоих движков попадает в компонент tpl заголовка
+    Server-Timing, выбранный движок — в request.template_engine.
+    """
+    request.template_engine = engine_for(request)
+    return django_render(request, template_name, context,
+                         using=request.template_engine)
@@ -0,0 +1,50 @@
+import os
+import sqlite3
+
+from django.conf import settings
+from django.db import connections
+
+
+def snapshot(source, target):
+    """Атомарно заменяет target согласованной копией базы source.
+
+    Копия снимается online backup API SQLite, не блокируя писателей
+    основной базы дольше одного шага, и переводится в журнал DELETE,
+    чтобы рядом с репликой не оставалось чужих -wal и -shm.
+    Открытые соединения дочитывают старый файл, новые видят снимок.
+    """
+    temporary = f'{target}.tmp'
+    if os.path.exists(temporary):
+        os.remove(temporary)
+    src = sqlite3.connect(source)
+    dst = sqlite3.connect(temporary)
+    try:
+        src.backup(dst, pages=1024)
+        dst.execute('PRAGMA journal_mode = DELETE')
+    finally:
+        dst.close()
+        src.close()
+    os.replace(temporary, target)
+
+
+def refresh_replica(sender, **kwargs):
+    """Обработчик request_started: переоткрывает реплику после снимка.
+
+    При CONN_MAX_AGE соединение держит дескриптор заменённого файла,
+    поэтому закрываем его, когда у файла реплики сменился inode.
+    Соединения у каждого потока свои, и inode запоминается на самом
+    соединении: иначе поток, первым заметивший снимок, скрыл бы его
+    от остальных.
+    """
+    alias = settings.REPLICA_ALIAS
+    if not alias:
+        return
+    try:
+        inode = os.stat(connections.databases[alias]['NAME']).st_ino
+    except OSError:
+        return
+    connection = connections[alias]
+    if connection.connection is not None and getattr(
+            connection, '_replica_inode', inode) != inode:
+        connection.close()
+    connection._replica_inode = inode
@@ -0,0 +1,56 @@
+import functools
+import threading
+
+from django.conf import settings
+
+_local = threading.local()
+
+
+def pinned():
+    """Читает ли текущий запрос с основной базы."""
+    return getattr(_local, 'pinned', False)
+
+
+def set_pinned(value):
+    _local.pinned = value
+
+
+def pin_primary(view_func):
+    """Декоратор пишущих представлений: чтения до конца запроса и ещё
+    REPLICA_STICKY_SECONDS после него идут в основную базу."""
+    @functools.wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        previous = pinned()
+        set_pinned(True)
+        request.pin_primary = True
+        try:
+            return view_func(request, *args, **kwargs)
+        finally:
+            set_pinned(previous)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """Чтения моделей из REPLICA_APPS — в реплику, остальное — в default.
+
+    Сессии, пользователи и kvstore миниатюр всегда читаются с основной
+    базы: только что созданная строка может ещё не попасть в снимок.
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get('instance')
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        if (settings.REPLICA_ALIAS and not pinned()
+                and model._meta.app_label in settings.REPLICA_APPS):
+            return settings.REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
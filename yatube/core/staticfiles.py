@@ -0,0 +1,102 @@
+import functools
+import gzip
+import mimetypes
+import os
+import posixpath
+from urllib.parse import unquote
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import (ManifestStaticFilesStorage,
+                                                staticfiles_storage)
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse
+from django.middleware.gzip import re_accepts_gzip
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Хэшированные имена и gzip-копии рядом с текстовыми файлами.
+
+    После обработки collectstatic для каждого файла с расширением из
+    STATIC_GZIP_EXTENSIONS не короче GZIP_MIN_LENGTH пишется name.gz,
+    если сжатие действительно уменьшает файл.
+    """
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        for name in set(paths) | set(self.hashed_files.values()):
+            if name.endswith(settings.STATIC_GZIP_EXTENSIONS):
+                self.compress(name)
+
+    def compress(self, name):
+        path = self.path(name)
+        with open(path, 'rb') as source:
+            data = source.read()
+        if len(data) < settings.GZIP_MIN_LENGTH:
+            return
+        compressed = gzip.compress(data, compresslevel=9, mtime=0)
+        if len(compressed) >= len(data):
+            return
+        temporary = f'{path}.gz.tmp'
+        with open(temporary, 'wb') as output:
+            output.write(compressed)
+        os.replace(temporary, f'{path}.gz')
+
+
+@functools.lru_cache(maxsize=None)
+def hashed_names():
+    """Имена с хэшем из манифеста: их содержимое никогда не меняется."""
+    return frozenset(getattr(staticfiles_storage, 'hashed_files', {})
+                     .values())
+
+
+def serve(request, name):
+    """Файл из STATIC_ROOT или None, если такого нет.
+
+    Клиенту, принимающему gzip, отдаётся готовая копия name.gz без
+    сжатия на лету. Хэшированные имена кэшируются навсегда, остальные —
+    на STATIC_MAX_AGE секунд.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return None
+    name = posixpath.normpath(unquote(name)).lstrip('/')
+    try:
+        path = safe_join(settings.STATIC_ROOT, name)
+    except SuspiciousFileOperation:
+        return None
+    if not os.path.isfile(path):
+        return None
+    content_type, _ = mimetypes.guess_type(path)
+    compressed = os.path.isfile(f'{path}.gz')
+    if compressed and re_accepts_gzip.search(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')):
+        path = f'{path}.gz'
+        encoding = 'gzip'
+    else:
+        encoding = None
+    stat = os.stat(path)
+    etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+    response = get_conditional_response(
+        request, etag=etag, last_modified=int(stat.st_mtime))
+    if response is None:
+        response = FileResponse(
+            open(path, 'rb'),
+            content_type=content_type or 'application/octet-stream',
+        )
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(stat.st_mtime)
+    response['Cache-Control'] = (
+        IMMUTABLE if name in hashed_names()
+        else f'public, max-age={settings.STATIC_MAX_AGE}'
+    )
+    if compressed:
+        patch_vary_headers(response, ('Accept-Encoding',))
+    return response
@@ -0,0 +1,172 @@
+import datetime
+import functools
+import json
+import logging
+import os
+import socket
+import time
+import uuid
+
+from django.conf import settings
+from django.db import OperationalError
+from django.utils import timezone
+from django.utils.module_loading import autodiscover_modules
+
+from .models import Task
+
+logger = logging.getLogger('core.tasks')
+
+registry = {}
+
+
+def task(func=None, *, name=None, priority=0, max_attempts=None):
+    """Регистрирует функцию как фоновую задачу.
+
+    У функции появляется delay(*args, **kwargs), который кладёт вызов
+    в таблицу Task, а при TASKS_EAGER выполняет его сразу. Аргументы
+    должны сериализоваться в JSON.
+    """
+    if func is None:
+        return functools.partial(task, name=name, priority=priority,
+                                 max_attempts=max_attempts)
+    task_name = name or f'{func.__module__}.{func.__qualname__}'
+    registry[task_name] = func
+
+    def delay(*args, **kwargs):
+        return enqueue(task_name, args, kwargs, priority=priority,
+                       max_attempts=max_attempts)
+
+    func.task_name = task_name
+    func.delay = delay
+    return func
+
+
+def enqueue(name, args=(), kwargs=None, priority=0, countdown=0,
+            max_attempts=None):
+    arguments = {'args': list(args), 'kwargs': kwargs or {}}
+    if settings.TASKS_EAGER:
+        registry[name](*arguments['args'], **arguments['kwargs'])
+        return None
+    return Task.objects.create(
+        name=name,
+        arguments=json.dumps(arguments),
+        priority=priority,
+        run_at=timezone.now() + datetime.timedelta(seconds=countdown),
+        max_attempts=max_attempts or settings.TASKS_MAX_ATTEMPTS,
+    )
+
+
+def discover():
+    """Импортирует модули tasks всех приложений, чтобы заполнить registry."""
+    autodiscover_modules('tasks')
+
+
+def worker_id():
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def claim_rows(ready, batch_size, worker=None, **values):
+    """Помечает до batch_size строк из ready меткой этой выборки.
+
+    SELECT … LIMIT выбирает кандидатов, UPDATE с условиями ready
+    помечает их меткой в locked_by (и заодно пишет values). Строку,
+    которую параллельно успел взять другой исполнитель, UPDATE
+    не тронет, поэтому по метке возвращаются только свои строки.
+    Блокировка записи держится на время одного UPDATE.
+    """
+    token = f'{worker or worker_id()}:{uuid.uuid4().hex[:8]}'
+    ids = list(ready.values_list('id', flat=True)[:batch_size])
+    if not ids:
+        return []
+    ready.filter(id__in=ids).update(
+        locked_by=token, locked_at=timezone.now(), **values)
+    return list(ready.model.objects.filter(locked_by=token))
+
+
+def claim(batch_size, worker=None):
+    """Забирает до batch_size готовых задач для исполнителя."""
+    ready = Task.objects.filter(status=Task.QUEUED, run_at__lte=timezone.now())
+    return claim_rows(ready, batch_size, worker, status=Task.RUNNING)
+
+
+def exponential_backoff(delay, attempts, limit=None):
+    """delay секунд после первой попытки, дальше вдвое больше,
+    но не больше limit."""
+    seconds = delay * 2 ** (attempts - 1)
+    if limit is not None:
+        seconds = min(seconds, limit)
+    return datetime.timedelta(seconds=seconds)
+
+
+def backoff(attempts):
+    return exponential_backoff(settings.TASKS_RETRY_DELAY, attempts)
+
+
+def run(item):
+    """Выполняет задачу; при ошибке возвращает её в очередь с задержкой."""
+    item.attempts += 1
+    try:
+        func = registry[item.name]
+        arguments = json.loads(item.arguments)
+        func(*arguments.get('args', ()), **arguments.get('kwargs', {}))
+    except Exception as error:
+        item.last_error = repr(error)
+        if item.attempts < item.max_attempts:
+            logger.warning('Задача %s #%s упала, повтор: %r',
+                           item.name, item.pk, error)
+            item.status = Task.QUEUED
+            item.run_at = timezone.now() + backoff(item.attempts)
+        else:
+            logger.exception('Задача %s #%s провалена', item.name, item.pk)
+            item.status = Task.FAILED
+    else:
+        item.status = Task.DONE
+    Task.objects.filter(pk=item.pk).update(
+        status=item.status, attempts=item.attempts, run_at=item.run_at,
+        last_error=item.last_error, locked_by='')
+    return item.status == Task.DONE
+
+
+def requeue_stale():
+    """Возвращает в очередь задачи исполнителей, умерших посреди работы."""
+    stale = timezone.now() - datetime.timedelta(
+        seconds=settings.TASKS_LOCK_TIMEOUT)
+    return Task.objects.filter(
+        status=Task.RUNNING, locked_at__lt=stale,
+    ).update(status=Task.QUEUED, locked_by='')
+
+
+def housekeeping():
+    """Возвращает в очередь зависшие задачи и удаляет старые выполненные."""
+    requeue_stale()
+    Task.objects.filter(
+        status=Task.DONE,
+        run_at__lt=timezone.now() - datetime.timedelta(
+            hours=settings.TASKS_KEEP_DONE_HOURS),
+    ).delete()
+
+
+def work(batch_size, interval, burst=False):
+    """Цикл исполнителя: берёт пачки задач, пока очередь не опустеет
+    (burst) или бесконечно. Возвращает (выполнено, неудачно)."""
+    done = failed = 0
+    housekeeping()
+    while True:
+        try:
+            items = claim(batch_size)
+        except OperationalError as error:
+            # Другой исполнитель держит запись дольше таймаута базы.
+            logger.warning('Не удалось взять задачи: %s', error)
+            time.sleep(interval)
+            continue
+        if not items:
+            if burst:
+                return done, failed
+            time.sleep(interval)
+            housekeeping()
+            continue
+        for item in items:
+            if run(item):
+                done += 1
+            else:
+                failed += 1
@@ -0,0 +1,6 @@
+from .taskqueue import task
+
+
+@task
+def noop(*args, **kwargs):
+    """Пустая задача для бенчмарка очереди."""
@@ -0,0 +1,56 @@
+import random
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.conf import settings
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from core.loadtest import Journey, WSGIClient, new_results
+from posts.models import Comment, Follow, Post
+from yatube.wsgi import application
+
+
+User = get_user_model()
+
+
+class LoadTestTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.leo = User.objects.create_user(username='leo')
+        cls.post = Post.objects.create(author=cls.leo, text='Пост')
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_journey_through_wsgi(self):
+        """Сценарий проходит через WSGI-приложение, включая POST с CSRF."""
+        client = WSGIClient(application)
+        client.login(self.user)
+        self.assertIn(settings.CSRF_COOKIE_NAME, client.cookies)
+        results = new_results()
+        Journey(client, [self.post.pk], ['leo'], random.Random(1)).run(
+            results)
+        self.assertEqual(set(results['status']), {200, 302})
+        self.assertEqual(set(results['latency']), {
+            'index', 'post_detail', 'add_comment', 'profile_follow',
+            'follow_index',
+        })
+        self.assertTrue(Comment.objects.filter(author=self.user).exists())
+        self.assertTrue(Follow.objects.filter(user=self.user,
+                                              author=self.leo).exists())
+
+    @override_settings(RATE_LIMITS={'posts:add_comment': '1/m'})
+    def test_ratelimit_switch(self):
+        """Клиент явно выключает лимиты для своих запросов."""
+        url = reverse('posts:add_comment', args=[self.post.pk])
+        limited = WSGIClient(application)
+        limited.login(self.user)
+        self.assertEqual(limited.post(url, {'text': 'Раз'}), 302)
+        self.assertEqual(limited.post(url, {'text': 'Два'}), 429)
+        unlimited = WSGIClient(application, ratelimit=False)
+        unlimited.login(self.user)
+        for _ in range(3):
+            self.assertEqual(unlimited.post(url, {'text': 'Ещё'}), 302)
@@ -0,0 +1,124 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from core.mail import claim, send_queued
+from core.models import QueuedEmail
+
+
+User = get_user_model()
+
+
+class FlakyBackend(EmailBackend):
+    """Падает на первом письме, затем отправляет как locmem."""
+    failures = 0
+    opened = 0
+    refuse = False
+
+    def open(self):
+        if FlakyBackend.refuse:
+            raise ConnectionRefusedError('SMTP не принимает соединения')
+        FlakyBackend.opened += 1
+
+    def send_messages(self, messages):
+        if FlakyBackend.failures:
+            FlakyBackend.failures -= 1
+            raise ConnectionError('SMTP недоступен')
+        return super().send_messages(messages)
+
+
+@override_settings(
+    EMAIL_BACKEND='core.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND='core.tests.test_mail.FlakyBackend',
+    EMAIL_QUEUE_RETRY_DELAY=60,
+)
+class QueuedEmailTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth',
+                                            email='auth@example.com',
+                                            password='pass-123')
+
+    def setUp(self) -> None:
+        super().setUp()
+        FlakyBackend.failures = 0
+        FlakyBackend.opened = 0
+        FlakyBackend.refuse = False
+
+    def send(self):
+        call_command('send_queued_mail', stdout=io.StringIO())
+
+    def test_password_reset_only_enqueues(self):
+        """Сброс пароля кладёт письмо в очередь, не отправляя его."""
+        Client().post(reverse('users:password_reset'),
+                      {'email': 'auth@example.com'})
+        self.assertEqual(mail.outbox, [])
+        email = QueuedEmail.objects.get()
+        self.assertEqual(email.recipients, 'auth@example.com')
+        self.send()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['auth@example.com'])
+        self.assertIsNotNone(QueuedEmail.objects.get().sent)
+
+    def test_batch_uses_one_connection(self):
+        """Пачка писем уходит через одно соединение."""
+        for i in range(3):
+            mail.send_mail(f'Тема {i}', 'Текст', None, ['a@example.com'])
+        self.send()
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(FlakyBackend.opened, 1)
+
+    def test_failed_message_retried_with_backoff(self):
+        """Неудачное письмо откладывается и уходит при следующей попытке."""
+        FlakyBackend.failures = 1
+        mail.send_mail('Тема', 'Текст', None, ['a@example.com'])
+        with self.assertLogs('core.mail', level='WARNING'):
+            self.send()
+        email = QueuedEmail.objects.get()
+        self.assertEqual(mail.outbox, [])
+        self.assertEqual(email.attempts, 1)
+        self.assertIn('SMTP', email.last_error)
+        self.assertGreater(email.next_attempt,
+                           timezone.now() + datetime.timedelta(seconds=50))
+        self.send()
+        self.assertEqual(mail.outbox, [])
+        QueuedEmail.objects.update(next_attempt=timezone.now())
+        self.send()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(QueuedEmail.objects.get().attempts, 2)
+
+    def test_refused_connection_defers_batch(self):
+        """Если соединение не открывается, вся пачка откладывается."""
+        FlakyBackend.refuse = True
+        for i in range(2):
+            mail.send_mail(f'Тема {i}', 'Текст', None, ['a@example.com'])
+        with self.assertLogs('core.mail', level='WARNING'):
+            self.assertEqual(send_queued(10), (0, 2))
+        for email in QueuedEmail.objects.all():
+            self.assertEqual(email.attempts, 1)
+            self.assertEqual(email.locked_by, '')
+            self.assertIn('SMTP', email.last_error)
+            self.assertGreater(email.next_attempt, timezone.now())
+
+    def test_batches_do_not_overlap(self):
+        """Два отправителя не берут одно письмо; письма упавшего
+        отправителя возвращаются после EMAIL_QUEUE_LOCK_TIMEOUT."""
+        for i in range(3):
+            mail.send_mail(f'Тема {i}', 'Текст', None, ['a@example.com'])
+        first = claim(2)
+        second = claim(2)
+        self.assertEqual(len(first), 2)
+        self.assertEqual(len(second), 1)
+        self.assertFalse({email.pk for email in first}
+                         & {email.pk for email in second})
+        self.assertEqual(claim(2), [])
+        QueuedEmail.objects.update(
+            locked_at=timezone.now() - datetime.timedelta(hours=1))
+        self.assertEqual(len(claim(5)), 3)
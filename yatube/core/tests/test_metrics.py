@@ -0,0 +1,60 @@
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core.metrics import Registry, aggregate, render_prometheus
+
+
+TEMP_METRICS_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(METRICS_ENABLED=True, METRICS_DIR=TEMP_METRICS_DIR)
+class MetricsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_METRICS_DIR, ignore_errors=True)
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def test_processes_aggregated(self):
+        """Снимки разных процессов суммируются."""
+        with tempfile.TemporaryDirectory() as directory:
+            with override_settings(METRICS_DIR=directory):
+                for pid in (1, 2):
+                    registry = Registry()
+                    registry.inc('hits_total', {'view': 'v'}, 2)
+                    registry.observe('latency_seconds', {'view': 'v'}, 0.02)
+                    registry.flush(force=True)
+                    os.replace(os.path.join(directory, f'{os.getpid()}.json'),
+                               os.path.join(directory, f'{pid}.json'))
+                text = render_prometheus(*aggregate(directory))
+        self.assertIn('hits_total{view="v"} 4', text)
+        self.assertIn('latency_seconds_bucket{view="v",le="0.025"} 2', text)
+        self.assertIn('latency_seconds_count{view="v"} 2', text)
+
+    def test_endpoint_reports_views_and_cache(self):
+        """Эндпоинт отдаёт задержки по представлениям и попадания в кэш."""
+        client = Client()
+        client.get(reverse('posts:index'))
+        client.get(reverse('posts:index'))
+        text = client.get(reverse('metrics')).content.decode()
+        self.assertIn(
+            'yatube_request_duration_seconds_count{view="posts:index"} 2',
+            text)
+        self.assertIn('yatube_responses_total{status="200",'
+                      'view="posts:index"} 2', text)
+        self.assertIn('yatube_cache_requests_total{cache="cache_page",'
+                      'result="hit"}', text)
+        self.assertIn('yatube_cache_requests_total{cache="cache_page",'
+                      'result="miss"}', text)
+
+    def test_endpoint_restricted(self):
+        response = Client(REMOTE_ADDR='10.0.0.1').get(reverse('metrics'))
+        self.assertEqual(response.status_code, 403)
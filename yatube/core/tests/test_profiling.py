@@ -0,0 +1,57 @@
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core.profiling import make_token
+
+
+TEMP_PROFILER_DIR = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(PROFILER_DIR=TEMP_PROFILER_DIR, PROFILER_INTERVAL=0.001)
+class ProfilerTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_PROFILER_DIR, ignore_errors=True)
+
+    def profiles(self, view_dir):
+        path = os.path.join(TEMP_PROFILER_DIR, view_dir)
+        return os.listdir(path) if os.path.isdir(path) else []
+
+    @override_settings(PROFILER_SAMPLE_RATE=1, PROFILER_MAX_FILES=2)
+    def test_sampled_requests_rotated(self):
+        """Профили пишутся в каталог представления и ротируются."""
+        for _ in range(3):
+            Client().get(reverse('about:author'))
+        files = self.profiles('about_author')
+        self.assertEqual(len(files), 2)
+        self.assertTrue(all(name.endswith('.collapsed') for name in files))
+        call_command('flamegraph', stdout=StringIO())
+        self.assertTrue(os.path.exists(
+            os.path.join(TEMP_PROFILER_DIR, 'about_author.svg')))
+
+    @override_settings(PROFILER_MODE='cprofile')
+    def test_signed_header(self):
+        """Запрос с подписанным заголовком профилируется через cProfile."""
+        Client().get(reverse('about:tech'), HTTP_X_PROFILE='подделка')
+        self.assertEqual(self.profiles('about_tech'), [])
+        response = Client().get(reverse('about:tech'),
+                                HTTP_X_PROFILE=make_token())
+        self.assertEqual(self.profiles('about_tech'),
+                         [response['X-Profile-Path']])
+        self.assertTrue(response['X-Profile-Path'].endswith('.prof'))
+
+    @override_settings(PROFILER_SAMPLE_RATE=1)
+    def test_unresolved_paths_share_directory(self):
+        """Профили несуществующих страниц складываются в один каталог."""
+        for path in ('/no/such/page/', '/another/missing/'):
+            Client().get(path)
+        self.assertEqual(len(self.profiles('unresolved')), 2)
+        self.assertFalse(os.path.exists(
+            os.path.join(TEMP_PROFILER_DIR, 'no_such_page')))
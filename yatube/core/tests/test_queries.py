@@ -0,0 +1,34 @@
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from core.queries import QueryBudgetExceeded, fingerprint
+
+
+class QueryBudgetTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.guest_client = Client()
+
+    def test_fingerprint_normalizes_literals(self):
+        """Отпечаток запроса не зависит от значений параметров."""
+        self.assertEqual(
+            fingerprint("SELECT * FROM t WHERE id = 15 AND s = 'x'"),
+            fingerprint("SELECT  *  FROM t WHERE id = 7 AND s = 'yy'"),
+        )
+        self.assertEqual(
+            fingerprint('SELECT * FROM t WHERE id IN (%s, %s, %s)'),
+            'SELECT * FROM t WHERE id IN (...)',
+        )
+
+    @override_settings(QUERY_BUDGETS={'posts:api_index': 0})
+    def test_strict_budget_raises(self):
+        """В тестах превышение бюджета представления — ошибка."""
+        with self.assertRaises(QueryBudgetExceeded):
+            self.guest_client.get(reverse('posts:api_index'))
+
+    @override_settings(QUERY_BUDGETS={'posts:api_index': 0},
+                       QUERY_BUDGET_STRICT=False)
+    def test_budget_logged(self):
+        """Вне тестов превышение бюджета только пишется в лог."""
+        with self.assertLogs('core.queries', level='WARNING') as logs:
+            self.guest_client.get(reverse('posts:api_index'))
+        self.assertIn('posts:api_index', logs.output[0])
@@ -0,0 +1,176 @@
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import (Client, RequestFactory, TestCase,
+                         override_settings)
+from django.urls import reverse
+from core.middleware import ConcurrencyLimitMiddleware
+from core.ratelimit import concurrency_exempt, parse_rate, take
+from posts.models import Comment, Post
+
+
+User = get_user_model()
+
+
+class SlidingWindowTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def take_at(self, now, limit=2, period=10):
+        with mock.patch('core.ratelimit.time.time', return_value=now):
+            return take('bucket', limit, period)
+
+    def test_parse_rate(self):
+        """Лимит задаётся как число за период в секундах."""
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('5/10s'), (5, 10))
+        with self.assertRaises(ValueError):
+            parse_rate('10 в минуту')
+
+    def test_burst_then_window_slides(self):
+        """Лимит пропускается сразу, дальше — по мере сдвига окна."""
+        self.assertEqual(self.take_at(1000), (True, 0))
+        self.assertEqual(self.take_at(1001), (True, 0))
+        allowed, retry_after = self.take_at(1002)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 8)
+        # В следующем окне половина прошлого ещё учитывается: 2 * 0.5.
+        self.assertEqual(self.take_at(1015), (True, 0))
+        allowed, retry_after = self.take_at(1015)
+        self.assertFalse(allowed)
+        self.assertAlmostEqual(retry_after, 5)
+        self.assertEqual(self.take_at(1020), (True, 0))
+
+    def test_refused_request_not_counted(self):
+        """Отказ не расходует лимит."""
+        self.take_at(1000, limit=1)
+        for _ in range(3):
+            self.assertFalse(self.take_at(1000, limit=1)[0])
+        self.assertEqual(self.take_at(1010, limit=2), (True, 0))
+
+    def test_evicted_counter(self):
+        """Вытесненный до возврата токена счётчик не роняет запрос."""
+        self.take_at(1000, limit=1)
+        with mock.patch('core.ratelimit.cache.decr',
+                        side_effect=ValueError):
+            self.assertFalse(self.take_at(1000, limit=1)[0])
+
+
+class RateLimitViewTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.other = User.objects.create_user(username='other')
+        cls.leo = User.objects.create_user(username='leo')
+        cls.post = Post.objects.create(author=cls.leo, text='Пост')
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def comment(self, client):
+        return client.post(
+            reverse('posts:add_comment', args=[self.post.pk]),
+            {'text': 'Спам'})
+
+    @override_settings(RATE_LIMITS={'posts:add_comment': '2/m'})
+    def test_comment_burst_gets_429(self):
+        """Сверх лимита комментарий не сохраняется, ответ — 429."""
+        self.assertEqual(self.comment(self.client).status_code, 302)
+        self.assertEqual(self.comment(self.client).status_code, 302)
+        response = self.comment(self.client)
+        self.assertEqual(response.status_code, 429)
+        self.assertLessEqual(1, int(response['Retry-After']))
+        self.assertLessEqual(int(response['Retry-After']), 60)
+        self.assertEqual(Comment.objects.count(), 2)
+        other = Client()
+        other.force_login(self.other)
+        self.assertEqual(self.comment(other).status_code, 302)
+
+    @override_settings(RATE_LIMITS={'posts:post_create': '1/m'})
+    def test_form_display_not_counted(self):
+        """GET формы нового поста лимит не расходует."""
+        url = reverse('posts:post_create')
+        for _ in range(3):
+            self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(self.client.post(url, {'text': 'Пост'}).status_code,
+                         302)
+        self.assertEqual(self.client.post(url, {'text': 'Ещё'}).status_code,
+                         429)
+
+    @override_settings(RATE_LIMITS={'posts:profile_follow': '1/m'})
+    def test_follow_limited_on_get(self):
+        """profile_follow ограничивается и для GET."""
+        url = reverse('posts:profile_follow', args=['leo'])
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.assertEqual(self.client.get(url).status_code, 429)
+
+    @override_settings(RATELIMIT_ENABLED=False,
+                       RATE_LIMITS={'posts:add_comment': '1/m'})
+    def test_disabled(self):
+        """RATELIMIT_ENABLED=False выключает ограничение."""
+        for _ in range(3):
+            self.assertEqual(self.comment(self.client).status_code, 302)
+
+
+@override_settings(CONCURRENCY_LIMIT=1, CONCURRENCY_WAIT=0)
+class ConcurrencyLimitTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.factory = RequestFactory()
+        self.view = lambda request: HttpResponse('<p>Лента</p>')
+        self.middleware = ConcurrencyLimitMiddleware(self.handle)
+
+    def handle(self, request):
+        return (self.middleware.process_view(request, self.view, (), {})
+                or self.view(request))
+
+    def test_stale_page_served_under_overload(self):
+        """При перегрузке аноним получает сохранённую копию страницы,
+        запись и запрос с сессией — 503."""
+        request = self.factory.get('/?page=2')
+        self.assertEqual(self.middleware(request).content,
+                         '<p>Лента</p>'.encode())
+        self.middleware.slots.acquire()
+        self.addCleanup(self.middleware.slots.release)
+        response = self.middleware(self.factory.get('/?page=2'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.content, '<p>Лента</p>'.encode())
+        self.assertIn('Stale', response['Warning'])
+        response = self.middleware(self.factory.post('/?page=2'))
+        self.assertEqual(response.status_code, 503)
+        request = self.factory.get('/?page=2')
+        request.COOKIES['sessionid'] = 'key'
+        self.assertEqual(self.middleware(request).status_code, 503)
+
+    def test_overload_without_copy(self):
+        """Без сохранённой копии при перегрузке — 503 с Retry-After."""
+        self.middleware.slots.acquire()
+        self.addCleanup(self.middleware.slots.release)
+        response = self.middleware(self.factory.get('/'))
+        self.assertEqual(response.status_code, 503)
+        self.assertIn('Retry-After', response)
+
+    def test_slot_released_after_response(self):
+        """После ответа слот освобождается."""
+        for _ in range(2):
+            response = self.middleware(self.factory.get('/'))
+            self.assertEqual(response.status_code, 200)
+
+    def test_exempt_view_takes_no_slot(self):
+        """Long-poll с @concurrency_exempt не занимает слот и проходит
+        даже при занятых слотах."""
+        def poll(request):
+            return HttpResponse('{}', content_type='application/json')
+        self.view = concurrency_exempt(poll)
+        self.middleware.slots.acquire()
+        self.addCleanup(self.middleware.slots.release)
+        self.assertEqual(self.middleware(self.factory.get('/')).status_code,
+                         200)
@@ -0,0 +1,135 @@
+import os
+import sqlite3
+import tempfile
+import threading
+from unittest import mock
+
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from core.middleware import ReplicaPinMiddleware
+from core.replica import refresh_replica, snapshot
+from core.routers import PrimaryReplicaRouter, pin_primary
+from posts.models import Post
+
+
+router = PrimaryReplicaRouter()
+
+
+def read_alias(request):
+    return HttpResponse(router.db_for_read(Post))
+
+
+@pin_primary
+def write_view(request):
+    return HttpResponse(router.db_for_read(Post))
+
+
+class FakeConnection:
+    def __init__(self):
+        self.connection = object()
+        self.closed = 0
+
+    def close(self):
+        self.connection = None
+        self.closed += 1
+
+
+class FakeConnections(threading.local):
+    """Как django.db.connections: у каждого потока свои соединения."""
+
+    def __init__(self, name):
+        self.databases = {'replica': {'NAME': name}}
+        self.replica = FakeConnection()
+
+    def __getitem__(self, alias):
+        return self.replica
+
+
+@override_settings(REPLICA_ALIAS='replica', REPLICA_STICKY_SECONDS=5)
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        self.factory = RequestFactory()
+
+    def test_reads_go_to_replica_writes_to_primary(self):
+        """Чтения постов — из реплики, запись и сессии — в default."""
+        from django.contrib.sessions.models import Session
+
+        self.assertEqual(router.db_for_read(Post), 'replica')
+        self.assertEqual(router.db_for_write(Post), 'default')
+        self.assertEqual(router.db_for_read(Session), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'posts'))
+
+    def test_write_pins_reads_to_primary(self):
+        """После пишущего представления чтения липнут к основной базе."""
+        response = ReplicaPinMiddleware(write_view)(
+            self.factory.post('/'))
+        self.assertEqual(response.content, b'default')
+        cookie = response.cookies['primary_pin']
+        self.assertEqual(cookie['max-age'], 5)
+
+        request = self.factory.get('/')
+        request.COOKIES['primary_pin'] = cookie.value
+        response = ReplicaPinMiddleware(read_alias)(request)
+        self.assertEqual(response.content, b'default')
+        self.assertNotIn('primary_pin', response.cookies)
+
+        response = ReplicaPinMiddleware(read_alias)(self.factory.get('/'))
+        self.assertEqual(response.content, b'replica')
+
+    def test_snapshot_replaces_replica(self):
+        """Снимок содержит данные основной базы и не держит WAL."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            primary = sqlite3.connect(source)
+            primary.execute('PRAGMA journal_mode = WAL')
+            primary.execute('CREATE TABLE t (x)')
+            primary.execute('INSERT INTO t VALUES (1)')
+            primary.commit()
+            snapshot(source, target)
+            primary.execute('INSERT INTO t VALUES (2)')
+            primary.commit()
+            replica = sqlite3.connect(target)
+            self.assertEqual(
+                replica.execute('SELECT count(*) FROM t').fetchone(), (1,))
+            self.assertEqual(
+                replica.execute('PRAGMA journal_mode').fetchone(),
+                ('delete',))
+            replica.close()
+            snapshot(source, target)
+            replica = sqlite3.connect(target)
+            self.assertEqual(
+                replica.execute('SELECT count(*) FROM t').fetchone(), (2,))
+            replica.close()
+            primary.close()
+
+    def test_every_thread_reopens_after_snapshot(self):
+        """Новый снимок переоткрывает реплику во всех потоках, а не только
+        в заметившем его первым."""
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            sqlite3.connect(source).close()
+            snapshot(source, target)
+            fake = FakeConnections(target)
+            closed = {}
+            with mock.patch('core.replica.connections', fake):
+                barrier = threading.Barrier(2)
+
+                def worker(name):
+                    refresh_replica(None)
+                    barrier.wait()
+                    if name == 'a':
+                        snapshot(source, target)
+                    barrier.wait()
+                    refresh_replica(None)
+                    closed[name] = fake['replica'].closed
+
+                threads = [threading.Thread(target=worker, args=[name])
+                           for name in 'ab']
+                for thread in threads:
+                    thread.start()
+                for thread in threads:
+                    thread.join()
+            self.assertEqual(closed, {'a': 1, 'b': 1})
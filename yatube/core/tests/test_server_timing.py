@@ -0,0 +1,30 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from posts.models import Post
+
+
+User = get_user_model()
+
+
+@override_settings(SERVER_TIMING=True)
+class ServerTimingTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+
+    def test_header_has_components(self):
+        """Заголовок содержит время SQL, шаблонов и всего запроса."""
+        response = Client().get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        metrics = {metric.split(';')[0].strip()
+                   for metric in response['Server-Timing'].split(',')}
+        self.assertTrue({'db', 'tpl', 'total'} <= metrics)
+
+    @override_settings(SERVER_TIMING=False)
+    def test_disabled(self):
+        response = Client().get(
+            reverse('posts:post_detail', args=[self.post.pk]))
+        self.assertFalse(response.has_header('Server-Timing'))
@@ -0,0 +1,59 @@
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase
+from django.urls import reverse
+from core.middleware import SlowQueryMiddleware
+from core.models import SlowQuery
+
+
+User = get_user_model()
+
+
+class SlowQueryTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass')
+
+    def test_slow_queries_logged_with_plan(self):
+        """Медленный запрос сохраняется с представлением и планом;
+        страница API читает посты по индексу, без полного просмотра."""
+        with self.settings(SLOW_QUERY_MS=0.0001), self.assertLogs(
+                'core.slow_queries', level='WARNING'):
+            Client().get(reverse('posts:api_index'))
+        query = SlowQuery.objects.filter(
+            view_name='posts:api_index',
+            fingerprint__contains='"posts_post"',
+        ).first()
+        self.assertIsNotNone(query)
+        self.assertIn('USING INDEX post_pub_date_id_idx', query.plan)
+        self.assertIn('posts/', query.frame)
+
+    def test_saved_after_response(self):
+        """Внутри запроса медленные запросы только копятся, сохраняются
+        они при закрытии ответа."""
+        saved = SlowQuery.objects.filter(fingerprint__contains='"auth_user"')
+
+        def view(request):
+            list(User.objects.all())
+            self.assertFalse(saved.exists())
+            return HttpResponse()
+
+        with self.settings(SLOW_QUERY_MS=0.0001), self.assertLogs(
+                'core.slow_queries', level='WARNING'):
+            response = SlowQueryMiddleware(view)(RequestFactory().get('/'))
+            self.assertFalse(saved.exists())
+            response.close()
+        self.assertTrue(saved.exists())
+
+    def test_admin_fingerprints_page(self):
+        client = Client()
+        client.force_login(self.admin)
+        with self.settings(SLOW_QUERY_MS=0.0001), self.assertLogs(
+                'core.slow_queries', level='WARNING'):
+            client.get(reverse('posts:api_index'))
+        response = client.get(
+            reverse('admin:core_slowquery_fingerprints'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'posts_post')
@@ -0,0 +1,52 @@
+import io
+import os
+import tempfile
+
+from django.core.management import call_command
+from django.db import connections
+from django.test import SimpleTestCase, override_settings
+
+
+class SQLiteProfileTests(SimpleTestCase):
+    def connect(self, path):
+        default = connections['default']
+        settings_dict = dict(default.settings_dict, NAME=path)
+        wrapper = type(default)(settings_dict, alias='sqlite_profile')
+        wrapper.ensure_connection()
+        self.addCleanup(wrapper.close)
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={'journal_mode': 'WAL',
+                                       'synchronous': 'NORMAL',
+                                       'busy_timeout': 1234})
+    def test_pragmas_applied_on_connect(self):
+        """Новое соединение получает PRAGMA из SQLITE_PRAGMAS."""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.connect(os.path.join(directory, 'db.sqlite3'))
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'wal')
+            self.assertEqual(self.pragma(wrapper, 'synchronous'), 1)
+            self.assertEqual(self.pragma(wrapper, 'busy_timeout'), 1234)
+            wrapper.close()
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_default_profile_keeps_sqlite_defaults(self):
+        """Без профиля production журнал остаётся rollback-журналом."""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = self.connect(os.path.join(directory, 'db.sqlite3'))
+            self.assertEqual(self.pragma(wrapper, 'journal_mode'), 'delete')
+            wrapper.close()
+
+    def test_bench_sqlite_reports_both_profiles(self):
+        """bench_sqlite прогоняет оба профиля и пишет отчёт."""
+        out = io.StringIO()
+        call_command('bench_sqlite', threads=2, duration=0.2, rows=100,
+                     stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('default'))
+        self.assertTrue(lines[1].startswith('production'))
@@ -0,0 +1,110 @@
+import gzip
+import os
+import shutil
+import tempfile
+
+from django.core.management import call_command
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+
+from core.middleware import GZipMiddleware
+from core.staticfiles import hashed_names
+
+STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+
+
+class CompressedStaticTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.root = tempfile.mkdtemp()
+        cls.override = override_settings(STATIC_ROOT=cls.root,
+                                         STATICFILES_STORAGE=STORAGE)
+        cls.override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        hashed_names.cache_clear()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.override.disable()
+        hashed_names.cache_clear()
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = Client()
+        self.css = next(name for name in hashed_names()
+                        if name.startswith('css/bootstrap.min.')
+                        and name.endswith('.css'))
+
+    def test_collectstatic_writes_gzip_siblings(self):
+        """Текстовые файлы получают .gz-копии, картинки — нет."""
+        path = os.path.join(self.root, self.css)
+        with open(path, 'rb') as source, gzip.open(f'{path}.gz') as copy:
+            self.assertEqual(copy.read(), source.read())
+        self.assertFalse(
+            os.path.exists(os.path.join(self.root, 'img', 'logo.png.gz')))
+
+    def test_serves_precompressed_copy(self):
+        """Клиенту с gzip отдаётся готовая копия, остальным — исходник."""
+        url = f'/static/{self.css}'
+        response = self.client.get(url, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Content-Type'], 'text/css')
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('Accept-Encoding', response['Vary'])
+        body = gzip.decompress(b''.join(response.streaming_content))
+        response = self.client.get(url)
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(b''.join(response.streaming_content), body)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_unhashed_name_short_cache(self):
+        """Файл без хэша в имени кэшируется на STATIC_MAX_AGE."""
+        response = self.client.get('/static/css/bootstrap.min.css')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('immutable', response['Cache-Control'])
+
+    def test_templates_use_hashed_names(self):
+        """Шаблоны ссылаются на хэшированные имена файлов."""
+        response = self.client.get('/about/tech/')
+        self.assertContains(response, f'/static/{self.css}')
+
+
+@override_settings(GZIP_MIN_LENGTH=100)
+class GZipMiddlewareTests(TestCase):
+    def process(self, response, encoding='gzip, deflate'):
+        request = RequestFactory().get('/',
+                                       HTTP_ACCEPT_ENCODING=encoding)
+        return GZipMiddleware(lambda request: response).process_response(
+            request, response)
+
+    def test_compresses_large_html(self):
+        """HTML длиннее порога сжимается."""
+        html = '<p>пост</p>' * 50
+        response = self.process(HttpResponse(html))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(response.content).decode(), html)
+
+    def test_skips_small_and_binary_responses(self):
+        """Короткие и двоичные ответы не сжимаются."""
+        response = self.process(HttpResponse('<p>пост</p>'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.process(HttpResponse(b'\0' * 500,
+                                             content_type='image/png'))
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_streaming_chunks_flushed(self):
+        """Каждый кусок потокового ответа уходит клиенту сразу."""
+        chunks = [b'{"new": 1}\n', b'{"new": 2}\n']
+        response = self.process(StreamingHttpResponse(
+            iter(chunks), content_type='application/json'))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        stream = response.streaming_content
+        first = next(stream)
+        decompressor = gzip.zlib.decompressobj(16 + gzip.zlib.MAX_WBITS)
+        self.assertEqual(decompressor.decompress(first), chunks[0])
+        rest = b''.join(stream)
+        self.assertEqual(decompressor.decompress(rest), chunks[1])
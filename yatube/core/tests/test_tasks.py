@@ -0,0 +1,92 @@
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core.models import Task
+from core.taskqueue import claim, run, task
+
+
+calls = []
+
+
+@task(name='tests.record')
+def record(value):
+    calls.append(value)
+
+
+@task(name='tests.broken', max_attempts=2)
+def broken():
+    raise RuntimeError('сломано')
+
+
+@override_settings(TASKS_EAGER=False, TASKS_RETRY_DELAY=60)
+class TaskQueueTests(TestCase):
+    def setUp(self) -> None:
+        super().setUp()
+        calls.clear()
+
+    def test_delay_and_run(self):
+        """delay кладёт задачу в таблицу, исполнитель её выполняет."""
+        record.delay('a')
+        self.assertEqual(calls, [])
+        items = claim(10, worker='test')
+        self.assertEqual([item.status for item in items], [Task.RUNNING])
+        self.assertTrue(run(items[0]))
+        self.assertEqual(calls, ['a'])
+        self.assertEqual(Task.objects.get().status, Task.DONE)
+
+    def test_priority_order(self):
+        """Задачи с большим приоритетом берутся первыми."""
+        Task.objects.create(name='tests.record', priority=0,
+                            arguments='{"args": ["low"]}',
+                            run_at=timezone.now())
+        Task.objects.create(name='tests.record', priority=5,
+                            arguments='{"args": ["high"]}',
+                            run_at=timezone.now())
+        first = claim(1, worker='test')
+        self.assertEqual(first[0].priority, 5)
+
+    def test_claims_are_disjoint(self):
+        """Две выборки не получают одну и ту же задачу."""
+        for value in range(5):
+            record.delay(value)
+        first = claim(3, worker='one')
+        second = claim(3, worker='two')
+        self.assertEqual(len(first), 3)
+        self.assertEqual(len(second), 2)
+        self.assertFalse({item.pk for item in first}
+                         & {item.pk for item in second})
+        self.assertEqual(claim(3, worker='three'), [])
+
+    def test_retry_then_fail(self):
+        """Упавшая задача повторяется позже, затем помечается ошибкой."""
+        broken.delay()
+        with self.assertLogs('core.tasks', level='WARNING'):
+            run(claim(1, worker='test')[0])
+        item = Task.objects.get()
+        self.assertEqual((item.status, item.attempts),
+                         (Task.QUEUED, 1))
+        self.assertIn('сломано', item.last_error)
+        self.assertGreater(item.run_at, timezone.now())
+        self.assertEqual(claim(1, worker='test'), [])
+        Task.objects.update(run_at=timezone.now())
+        with self.assertLogs('core.tasks', level='ERROR'):
+            run(claim(1, worker='test')[0])
+        self.assertEqual(Task.objects.get().status, Task.FAILED)
+
+    def test_worker_burst(self):
+        """manage.py worker --burst выполняет очередь и завершается."""
+        for value in range(3):
+            record.delay(value)
+        out = io.StringIO()
+        call_command('worker', processes=1, burst=True, stdout=out)
+        self.assertEqual(sorted(calls), [0, 1, 2])
+        self.assertIn('3', out.getvalue())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode(self):
+        """При TASKS_EAGER задача выполняется сразу."""
+        record.delay('now')
+        self.assertEqual(calls, ['now'])
+        self.assertFalse(Task.objects.exists())
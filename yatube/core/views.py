@@ -1,5 +1,9 @@
+from django.conf import settings
+from django.http import HttpResponse
 from django.shortcuts import render
 
+from . import metrics as metrics_registry
+
 
 def page_not_found(request, exception):
     return render(request, 'core/404.html', {'path': request.path}, status=404)
@@ -15,3 +19,16 @@ def permission_denied(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+def metrics(request):
+    """Метрики всех процессов в текстовом формате Prometheus."""
+    if request.META.get('REMOTE_ADDR') not in settings.METRICS_ALLOWED_IPS:
+        return permission_denied(request, None)
+    if settings.METRICS_ENABLED:
+        metrics_registry.registry.flush(force=True)
+    counters, histograms = metrics_registry.aggregate(settings.METRICS_DIR)
+    return HttpResponse(
+        metrics_registry.render_prometheus(counters, histograms),
+        content_type='text/plain; version=0.0.4; charset=utf-8',
+    )
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Post, Group
+from .models import ArchivedPost, Post, Group
 
 
 @admin.register(Post)
@@ -17,4 +17,12 @@ class PostAdmin(admin.ModelAdmin):
     empty_value_display = '-пусто-'
 
 
+@admin.register(ArchivedPost)
+class ArchivedPostAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'pub_date', 'author', 'group')
+    search_fields = ('text',)
+    list_filter = ('pub_date',)
+    empty_value_display = '-пусто-'
+
+
 admin.site.register(Group)
@@ -0,0 +1,183 @@
+from functools import wraps
+from http import HTTPStatus
+
+from django.conf import settings
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+
+from .following import follow_page, follow_stats
+from .models import (ArchivedComment, ArchivedPost, Comment, Group, Post,
+                     User)
+from .paginator import cursor_pagination
+
+# Имя поля в ответе API -> путь для values().
+POST_FIELDS = {
+    'id': 'id',
+    'text': 'text',
+    'pub_date': 'pub_date',
+    'author': 'author__username',
+    'group': 'group__slug',
+    'image': 'image',
+}
+COMMENT_FIELDS = {
+    'id': 'id',
+    'post': 'post_id',
+    'author': 'author__username',
+    'text': 'text',
+    'created': 'created',
+}
+POST_ORDERING = ('-pub_date', '-id')
+COMMENT_ORDERING = ('id',)
+
+
+def api_error(message, status):
+    return JsonResponse({'detail': message}, status=status)
+
+
+def api_login_required(view):
+    """Как login_required, но отвечает 401 вместо редиректа."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return api_error('Требуется авторизация',
+                             HTTPStatus.UNAUTHORIZED)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def requested_fields(request, available):
+    """Поля из параметра fields= (по умолчанию — все доступные)."""
+    fields = request.GET.get('fields')
+    if not fields:
+        return list(available)
+    names = [name.strip() for name in fields.split(',') if name.strip()]
+    unknown = set(names) - set(available)
+    if unknown:
+        raise ValueError(f'Неизвестные поля: {", ".join(sorted(unknown))}')
+    return names
+
+
+def project(queryset, names, available, ordering):
+    """values()-проекция нужных полей и полей сортировки, без моделей."""
+    paths = {available[name] for name in names}
+    paths.update(field.lstrip('-') for field in ordering)
+    return queryset.values(*paths)
+
+
+def serialize_post(row, names):
+    data = {}
+    for name in names:
+        value = row[POST_FIELDS[name]]
+        if name == 'image':
+            value = settings.MEDIA_URL + value if value else None
+        data[name] = value
+    return data
+
+
+def serialize_comment(row, names):
+    return {name: row[COMMENT_FIELDS[name]] for name in names}
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.POSTS_NUM))
+    except ValueError:
+        limit = settings.POSTS_NUM
+    return max(1, min(limit, settings.API_MAX_LIMIT))
+
+
+def posts_response(request, **filters):
+    """Страница постов: горячая таблица, затем архив (он старше)."""
+    try:
+        names = requested_fields(request, POST_FIELDS)
+        rows, next_cursor = cursor_pagination(
+            request,
+            [project(model.objects.filter(**filters), names, POST_FIELDS,
+                     POST_ORDERING) for model in (Post, ArchivedPost)],
+            page_limit(request),
+            POST_ORDERING,
+        )
+    except ValueError as error:
+        return api_error(str(error), HTTPStatus.BAD_REQUEST)
+    return JsonResponse({
+        'next': next_cursor,
+        'results': [serialize_post(row, names) for row in rows],
+    })
+
+
+def index(request):
+    return posts_response(request)
+
+
+def group_posts(request, slug: str):
+    group = get_object_or_404(Group, slug=slug)
+    return posts_response(request, group=group)
+
+
+def profile(request, username: str):
+    author = get_object_or_404(User, username=username)
+    return posts_response(request, author=author)
+
+
+@api_login_required
+def follow_index(request):
+    return posts_response(request, author__following__user=request.user)
+
+
+def follow_list(request, username, direction):
+    author = get_object_or_404(User.objects.select_related('follow_stats'),
+                               username=username)
+    try:
+        users, next_cursor = follow_page(request, author, direction,
+                                         page_limit(request))
+    except ValueError as error:
+        return api_error(str(error), HTTPStatus.BAD_REQUEST)
+    return JsonResponse({
+        'count': getattr(follow_stats(author), direction),
+        'next': next_cursor,
+        'results': users,
+    })
+
+
+def followers(request, username: str):
+    return follow_list(request, username, 'followers')
+
+
+def following(request, username: str):
+    return follow_list(request, username, 'following')
+
+
+def post_detail(request, post_id: int):
+    try:
+        names = requested_fields(request, POST_FIELDS)
+    except ValueError as error:
+        return api_error(str(error), HTTPStatus.BAD_REQUEST)
+    for model in (Post, ArchivedPost):
+        row = project(model.objects.filter(pk=post_id), names, POST_FIELDS,
+                      ()).first()
+        if row is not None:
+            return JsonResponse(serialize_post(row, names))
+    raise Http404('Пост не найден')
+
+
+def post_comments(request, post_id: int):
+    if Post.objects.filter(pk=post_id).exists():
+        comments = Comment.objects.filter(post_id=post_id)
+    elif ArchivedPost.objects.filter(pk=post_id).exists():
+        comments = ArchivedComment.objects.filter(post_id=post_id)
+    else:
+        raise Http404('Пост не найден')
+    try:
+        names = requested_fields(request, COMMENT_FIELDS)
+        rows, next_cursor = cursor_pagination(
+            request,
+            project(comments, names, COMMENT_FIELDS, COMMENT_ORDERING),
+            page_limit(request),
+            COMMENT_ORDERING,
+        )
+    except ValueError as error:
+        return api_error(str(error), HTTPStatus.BAD_REQUEST)
+    return JsonResponse({
+        'next': next_cursor,
+        'results': [serialize_comment(row, names) for row in rows],
+    })
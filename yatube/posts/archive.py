@@ -0,0 +1,112 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import Http404
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+ARCHIVE_VERSION_KEY = 'archive:version'
+POST_FIELDS = ('id', 'text', 'pub_date', 'author_id', 'group_id', 'image')
+COMMENT_FIELDS = ('id', 'post_id', 'author_id', 'text', 'created')
+
+
+def archive_version():
+    """Версия архива: меняется после каждой пачки archive_posts."""
+    version = cache.get(ARCHIVE_VERSION_KEY)
+    if version is None:
+        version = time.time_ns()
+        cache.set(ARCHIVE_VERSION_KEY, version, timeout=None)
+    return version
+
+
+class Feed:
+    """Лента из горячей таблицы постов и архива, горячие посты первыми.
+
+    Архив пополняется самыми старыми постами, поэтому все его строки
+    идут после горячих и срез можно собрать из двух запросов по
+    смещению. Число архивных постов кэшируется до следующей пачки
+    archive_posts, так что страницы без архива стоят как раньше.
+    """
+
+    def __init__(self, **filters):
+        self.filters = filters
+        self.hot = Post.objects.filter(**filters).select_related(
+            'author', 'group')
+        self.cold = ArchivedPost.objects.filter(**filters).select_related(
+            'author', 'group')
+        self._hot_count = None
+
+    def hot_count(self):
+        if self._hot_count is None:
+            self._hot_count = self.hot.count()
+        return self._hot_count
+
+    def cold_count(self):
+        scope = ','.join(f'{name}={getattr(value, "pk", value)}'
+                         for name, value in sorted(self.filters.items()))
+        # Список авторов ленты подписок может быть длинным.
+        digest = hashlib.md5(scope.encode()).hexdigest()
+        key = f'archive:count:{archive_version()}:{digest}'
+        count = cache.get(key)
+        if count is None:
+            count = self.cold.count()
+            cache.set(key, count, timeout=None)
+        return count
+
+    def count(self):
+        return self.hot_count() + self.cold_count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        hot_count = self.hot_count()
+        rows = []
+        if start < hot_count:
+            rows.extend(self.hot[start:min(stop, hot_count)])
+        if stop > hot_count:
+            rows.extend(self.cold[max(start - hot_count, 0):
+                                  stop - hot_count])
+        return rows
+
+
+def get_post(post_id):
+    """Пост и его комментарии: из горячей таблицы, иначе из архива."""
+    for model, comments in ((Post, Comment), (ArchivedPost, ArchivedComment)):
+        post = model.objects.select_related('author', 'group').filter(
+            pk=post_id).first()
+        if post is not None:
+            return post, comments.objects.filter(
+                post=post).select_related('author')
+    raise Http404('Пост не найден')
+
+
+def archive_batch(cutoff, batch_size):
+    """Переносит в архив до batch_size самых старых постов до cutoff.
+
+    Пачка — одна короткая транзакция: писатели ждут не дольше её.
+    Возвращает число перенесённых постов.
+    """
+    with transaction.atomic():
+        ids = list(Post.objects.filter(pub_date__lt=cutoff).order_by(
+            'pub_date', 'id').values_list('id', flat=True)[:batch_size])
+        if not ids:
+            return 0
+        ArchivedPost.objects.bulk_create(
+            ArchivedPost(**row) for row in
+            Post.objects.filter(pk__in=ids).values(*POST_FIELDS))
+        ArchivedComment.objects.bulk_create(
+            ArchivedComment(**row) for row in
+            Comment.objects.filter(post_id__in=ids).values(*COMMENT_FIELDS))
+        # Ленты сбрасываются один раз на пачку. Импорт здесь: signals
+        # через feeds сам импортирует этот модуль.
+        from .signals import batched_feed_invalidation
+        with batched_feed_invalidation():
+            Post.objects.filter(pk__in=ids).delete()
+    cache.set(ARCHIVE_VERSION_KEY, time.time_ns(), timeout=None)
+    return len(ids)
@@ -0,0 +1,87 @@
+import json
+import zlib
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+from .models import ArchivedComment, ArchivedPost, Comment, Post
+
+POST_FIELDS = (
+    'id', 'text', 'pub_date', 'author__username', 'group__slug', 'image',
+)
+COMMENT_FIELDS = ('id', 'post_id', 'author__username', 'text', 'created')
+
+# Размер сжатого куска, после которого он отдаётся клиенту.
+GZIP_FLUSH_SIZE = 64 * 1024
+
+
+def export_querysets(author=None, group=None):
+    """Посты и комментарии для выгрузки пользователя, группы или сайта.
+
+    Каждый вид — пара querysets: архив (самые старые строки), затем
+    горячая таблица.
+    """
+    posts = [ArchivedPost.objects.all(), Post.objects.all()]
+    comments = [ArchivedComment.objects.all(), Comment.objects.all()]
+    if author is not None:
+        posts = [queryset.filter(author=author) for queryset in posts]
+        comments = [queryset.filter(author=author) for queryset in comments]
+    if group is not None:
+        posts = [queryset.filter(group=group) for queryset in posts]
+        comments = [queryset.filter(post__group=group)
+                    for queryset in comments]
+    return posts, comments
+
+
+def keyset_values(queryset, fields, batch_size):
+    """Обходит queryset пачками по возрастанию pk без OFFSET.
+
+    Каждая пачка читается через iterator(), поэтому в памяти одновременно
+    находится не больше batch_size строк.
+    """
+    last_pk = 0
+    while True:
+        batch = queryset.filter(pk__gt=last_pk).order_by('pk').values(
+            *fields)[:batch_size]
+        count = 0
+        for row in batch.iterator(chunk_size=batch_size):
+            count += 1
+            last_pk = row['id']
+            yield row
+        if count < batch_size:
+            return
+
+
+def iter_ndjson(author=None, group=None, batch_size=None):
+    """Строки NDJSON: сначала посты, затем комментарии."""
+    batch_size = batch_size or settings.EXPORT_BATCH_SIZE
+    posts, comments = export_querysets(author, group)
+    sources = (
+        ('post', posts, POST_FIELDS),
+        ('comment', comments, COMMENT_FIELDS),
+    )
+    for kind, querysets, fields in sources:
+        for queryset in querysets:
+            for row in keyset_values(queryset, fields, batch_size):
+                row['type'] = kind
+                line = json.dumps(row, cls=DjangoJSONEncoder,
+                                  ensure_ascii=False)
+                yield line.encode() + b'\n'
+
+
+def gzip_stream(chunks):
+    """Сжимает поток байтов в формат gzip, отдавая его по кускам."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    buffer = []
+    size = 0
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            buffer.append(data)
+            size += len(data)
+        if size >= GZIP_FLUSH_SIZE:
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+    buffer.append(compressor.flush())
+    yield b''.join(buffer)
@@ -0,0 +1,161 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.feedgenerator import Atom1Feed
+from django.utils.http import http_date, quote_etag
+
+from . import archive
+from .models import Group, User
+
+FEED_FORMATS = ('rss', 'atom')
+
+
+def feed_cache_key(feed_format, scope):
+    return f'feed:{feed_format}:{scope}'
+
+
+def feed_scope(prefix, value=None):
+    """Область ленты: prefix и хэш username или slug из URL.
+
+    Значение из URL в ключ не попадает как есть: memcached не примет
+    ключ с не-ASCII символами или длиннее 250 байт.
+    """
+    if value is None:
+        return prefix
+    digest = hashlib.md5(str(value).encode()).hexdigest()
+    return f'{prefix}:{digest}'
+
+
+def feed_cache_keys(scope):
+    return [feed_cache_key(feed_format, scope)
+            for feed_format in FEED_FORMATS]
+
+
+class LatestPostsFeed(Feed):
+    title = 'Yatube: последние записи'
+    description = 'Новые записи всех авторов'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def items(self):
+        return archive.Feed()[:settings.FEED_ITEMS]
+
+    def item_title(self, item):
+        return str(item)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=[item.pk])
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+
+class GroupPostsFeed(LatestPostsFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def filters(self, obj):
+        return {'group': obj}
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def description(self, obj):
+        return obj.description
+
+    def link(self, obj):
+        return reverse('posts:group_list', args=[obj.slug])
+
+    def items(self, obj):
+        return archive.Feed(**self.filters(obj))[:settings.FEED_ITEMS]
+
+
+class AuthorPostsFeed(LatestPostsFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def filters(self, obj):
+        return {'author': obj}
+
+    def title(self, obj):
+        return f'Yatube: записи {obj.username}'
+
+    def description(self, obj):
+        return f'Новые записи пользователя {obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=[obj.username])
+
+    def items(self, obj):
+        return archive.Feed(**self.filters(obj))[:settings.FEED_ITEMS]
+
+
+class LatestPostsAtomFeed(LatestPostsFeed):
+    feed_type = Atom1Feed
+    subtitle = LatestPostsFeed.description
+
+
+class GroupPostsAtomFeed(GroupPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return obj.description
+
+
+class AuthorPostsAtomFeed(AuthorPostsFeed):
+    feed_type = Atom1Feed
+
+    def subtitle(self, obj):
+        return self.description(obj)
+
+
+def cached_feed(feed_class, feed_format, scope_kwarg=None, prefix='index'):
+    """Отдаёт ленту из кэша с поддержкой условного GET.
+
+    Тело ленты рендерится один раз и лежит в кэше, пока в её области
+    (весь сайт, группа или автор) не появится новая запись — кэш
+    сбрасывают сигналы в posts.signals. Повторный опрос с If-None-Match
+    получает 304 без обращения к базе.
+    """
+    feed = feed_class()
+
+    def view(request, **kwargs):
+        scope = feed_scope(prefix, kwargs.get(scope_kwarg))
+        key = feed_cache_key(feed_format, scope)
+        entry = cache.get(key)
+        if entry is None:
+            response = feed(request, **kwargs)
+            entry = {
+                'body': response.content,
+                'content_type': response['Content-Type'],
+                'etag': quote_etag(hashlib.md5(response.content).hexdigest()),
+                'last_modified': int(time.time()),
+            }
+            cache.set(key, entry, settings.FEED_CACHE_TIMEOUT)
+        response = get_conditional_response(
+            request,
+            etag=entry['etag'],
+            last_modified=entry['last_modified'],
+        )
+        if response is None:
+            response = HttpResponse(entry['body'],
+                                    content_type=entry['content_type'])
+        response['ETag'] = entry['etag']
+        response['Last-Modified'] = http_date(entry['last_modified'])
+        return response
+
+    return view
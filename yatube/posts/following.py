@@ -0,0 +1,114 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import Follow, FollowStats, Suggestion, User
+from .paginator import cursor_pagination
+
+# Имя поля в списке подписок -> путь от Follow к пользователю.
+USER_FIELDS = ('username', 'first_name', 'last_name')
+FOLLOW_ORDERING = ('-id',)
+
+
+def following_key(user_id):
+    return f'following:{user_id}'
+
+
+def followed_ids(user_id):
+    """id авторов, на которых подписан пользователь.
+
+    Хранится в кэше FOLLOWING_CACHE_TIMEOUT секунд и сбрасывается
+    сигналами Follow, поэтому проверки подписки и лента подписок
+    обходятся без JOIN по Follow. Заполняется с основной базы: реплика
+    сразу после сброса может ещё не видеть новую подписку.
+    """
+    key = following_key(user_id)
+    ids = cache.get(key)
+    if ids is None:
+        ids = frozenset(Follow.objects.using('default').filter(
+            user_id=user_id).values_list('author_id', flat=True))
+        cache.set(key, ids, settings.FOLLOWING_CACHE_TIMEOUT)
+    return ids
+
+
+def reset_following(user_id):
+    cache.delete(following_key(user_id))
+
+
+def change_follow_stats(user_id, author_id, delta):
+    """Сдвигает счётчики подписок и подписчиков на delta."""
+    for pk, field in ((user_id, 'following'), (author_id, 'followers')):
+        # Разошедшийся с Follow счётчик не уходит ниже нуля: иначе CHECK
+        # у PositiveIntegerField сломал бы отписку.
+        updated = FollowStats.objects.filter(pk=pk).update(
+            **{field: Greatest(F(field) + delta, 0)})
+        if not updated and delta > 0:
+            # Строки нет у пользователей, созданных в обход сигнала.
+            # При уменьшении её не создаём: так бывает при каскадном
+            # удалении самого пользователя.
+            FollowStats.objects.get_or_create(pk=pk, defaults={
+                'followers': Follow.objects.filter(author_id=pk).count(),
+                'following': Follow.objects.filter(user_id=pk).count(),
+            })
+
+
+def rebuild_follow_stats():
+    """Пересчитывает счётчики всех пользователей, например после
+    bulk_create подписок в обход сигналов. Замена идёт одной транзакцией:
+    читатели не видят пустую таблицу, а сбой её не оставит."""
+    users = User.objects.annotate(
+        followers_count=Count('following', distinct=True),
+        following_count=Count('follower', distinct=True),
+    ).values_list('id', 'followers_count', 'following_count')
+    with transaction.atomic():
+        FollowStats.objects.all().delete()
+        FollowStats.objects.bulk_create(
+            FollowStats(user_id=user_id, followers=followers,
+                        following=following)
+            for user_id, followers, following in users.iterator()
+        )
+
+
+def follow_stats(user):
+    """Счётчики пользователя; user лучше загрузить с select_related."""
+    try:
+        return user.follow_stats
+    except FollowStats.DoesNotExist:
+        return FollowStats(user=user)
+
+
+def follow_page(request, user, direction, per_page):
+    """Страница подписчиков (followers) или подписок (following) user.
+
+    Keyset по id Follow идёт по покрывающему индексу, пользователи
+    подтягиваются JOIN'ом в том же запросе.
+    """
+    if direction == 'followers':
+        queryset, related = Follow.objects.filter(author=user), 'user'
+    else:
+        queryset, related = Follow.objects.filter(user=user), 'author'
+    rows, next_cursor = cursor_pagination(
+        request,
+        queryset.values('id', *(f'{related}__{name}'
+                                for name in USER_FIELDS)),
+        per_page,
+        FOLLOW_ORDERING,
+    )
+    users = [{name: row[f'{related}__{name}'] for name in USER_FIELDS}
+             for row in rows]
+    return users, next_cursor
+
+
+def suggestions(user, limit):
+    """Рекомендованные авторы одним запросом по индексу (user, rank).
+
+    Берём с запасом и отбрасываем тех, на кого пользователь подписался
+    после последнего пересчёта.
+    """
+    followed = followed_ids(user.pk)
+    rows = Suggestion.objects.filter(user=user).select_related(
+        'author')[:limit * 2]
+    return [row.author for row in rows
+            if row.author_id not in followed][:limit]
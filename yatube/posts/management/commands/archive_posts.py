@@ -0,0 +1,47 @@
+import datetime
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import OperationalError
+from django.utils import timezone
+
+from posts.archive import archive_batch
+
+
+class Command(BaseCommand):
+    help = ('Переносит посты старше --days дней с комментариями в архив '
+            'короткими транзакциями, не блокируя писателей надолго')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int,
+                            default=settings.ARCHIVE_AFTER_DAYS)
+        parser.add_argument('--batch-size', type=int,
+                            default=settings.ARCHIVE_BATCH_SIZE)
+        parser.add_argument('--pause', type=float,
+                            default=settings.ARCHIVE_PAUSE,
+                            help='Пауза между пачками, с')
+        parser.add_argument('--retries', type=int, default=5,
+                            help='Повторы пачки при занятой базе')
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - datetime.timedelta(days=options['days'])
+        total = 0
+        failures = 0
+        while True:
+            try:
+                moved = archive_batch(cutoff, options['batch_size'])
+            except OperationalError as error:
+                # База занята писателем: уступаем и повторяем пачку.
+                failures += 1
+                if failures > options['retries']:
+                    raise
+                self.stderr.write(f'Пачка отложена: {error}')
+                time.sleep(options['pause'] * 2 ** failures)
+                continue
+            failures = 0
+            if not moved:
+                break
+            total += moved
+            time.sleep(options['pause'])
+        self.stdout.write(f'В архив перенесено постов: {total}')
@@ -0,0 +1,119 @@
+import json
+import platform
+import subprocess
+import time
+
+import django
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client
+from django.urls import reverse
+
+from core.queries import QueryCollector
+from core.stats import summarize
+from posts.models import Comment, Follow, Group, Post, User
+
+
+def git_revision():
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'], stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Command(BaseCommand):
+    help = ('Замеряет p50/p95/p99 задержки и число SQL-запросов '
+            'представлений через тестовый Client и пишет результат в JSON')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=50)
+        parser.add_argument('--warmup', type=int, default=3)
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кэш перед каждым запросом')
+        parser.add_argument('--output', help='Файл для результатов JSON')
+
+    def targets(self):
+        group = Group.objects.annotate(
+            num=Count('posts')).order_by('-num').first()
+        author = User.objects.annotate(
+            num=Count('posts')).order_by('-num').first()
+        post = Post.objects.annotate(
+            num=Count('comments')).order_by('-num').first()
+        reader = User.objects.annotate(
+            num=Count('follower')).order_by('-num').first()
+        if not (group and author and post and reader):
+            raise CommandError('База пуста: сначала выполните seed_bench')
+        anonymous = Client()
+        authorized = Client()
+        authorized.force_login(reader)
+        return [
+            ('posts:index', anonymous, reverse('posts:index')),
+            ('posts:index?page=2', anonymous,
+             reverse('posts:index') + '?page=2'),
+            ('posts:group_list', anonymous,
+             reverse('posts:group_list', args=[group.slug])),
+            ('posts:profile', anonymous,
+             reverse('posts:profile', args=[author.username])),
+            ('posts:post_detail', anonymous,
+             reverse('posts:post_detail', args=[post.pk])),
+            ('posts:follow_index', authorized,
+             reverse('posts:follow_index')),
+            ('posts:api_index', anonymous, reverse('posts:api_index')),
+        ]
+
+    def measure(self, client, url, options):
+        for _ in range(options['warmup']):
+            client.get(url)
+        timings = []
+        queries = []
+        for _ in range(options['iterations']):
+            if options['cold']:
+                cache.clear()
+            collector = QueryCollector(settings.QUERY_BUDGET_IGNORE)
+            with connection.execute_wrapper(collector):
+                start = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - start) * 1000)
+            queries.append(collector.budget_count)
+        return dict(
+            summarize(timings),
+            status=response.status_code,
+            queries=max(queries),
+        )
+
+    def handle(self, *args, **options):
+        results = {}
+        for name, client, url in self.targets():
+            results[name] = self.measure(client, url, options)
+            row = results[name]
+            self.stdout.write(
+                f'{name:24} p50={row["p50_ms"]:8.2f} '
+                f'p95={row["p95_ms"]:8.2f} p99={row["p99_ms"]:8.2f} мс '
+                f'запросов={row["queries"]}'
+            )
+        report = {
+            'meta': {
+                'revision': git_revision(),
+                'timestamp': time.time(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'options': {key: options[key] for key in (
+                    'iterations', 'warmup', 'cold')},
+                'rows': {
+                    'users': User.objects.count(),
+                    'posts': Post.objects.count(),
+                    'comments': Comment.objects.count(),
+                    'follows': Follow.objects.count(),
+                },
+            },
+            'views': results,
+        }
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+            self.stdout.write(f'Результаты сохранены в {options["output"]}')
@@ -0,0 +1,55 @@
+import json
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.paginator import Paginator
+from django.core.serializers.json import DjangoJSONEncoder
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+
+from posts.api import POST_FIELDS, POST_ORDERING, project, serialize_post
+from posts.archive import Feed
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает скорость JSON-сериализации ленты через values() '
+            'с рендерингом HTML-шаблона index')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--per-page', type=int,
+                            default=settings.POSTS_NUM)
+
+    def measure(self, func, iterations):
+        size = len(func())
+        start = time.perf_counter()
+        for _ in range(iterations):
+            func()
+        elapsed = time.perf_counter() - start
+        return elapsed / iterations, size
+
+    def handle(self, *args, **options):
+        per_page = options['per_page']
+        request = RequestFactory().get('/')
+        names = list(POST_FIELDS)
+
+        def render_json():
+            rows = project(Post.objects.all(), names, POST_FIELDS,
+                           POST_ORDERING).order_by(*POST_ORDERING)
+            data = [serialize_post(row, names) for row in rows[:per_page]]
+            return json.dumps({'results': data}, cls=DjangoJSONEncoder)
+
+        def render_html():
+            # Queryset тот же, что у index.
+            page_obj = Paginator(Feed(), per_page).get_page(1)
+            return render_to_string('posts/index.html',
+                                    {'page_obj': page_obj}, request)
+
+        for name, func in (('json', render_json), ('html', render_html)):
+            seconds, size = self.measure(func, options['iterations'])
+            self.stdout.write(
+                f'{name}: {seconds * 1000:.2f} мс/страница, '
+                f'{per_page / seconds:.0f} постов/с, {size} байт'
+            )
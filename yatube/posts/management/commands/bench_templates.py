@@ -0,0 +1,59 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.models import AnonymousUser
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import Paginator
+from django.template.loader import render_to_string
+from django.test import RequestFactory
+from django.urls import resolve
+
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает время рендеринга шаблонов ленты в DTL и Jinja2 '
+            'на одной и той же странице постов')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=200)
+        parser.add_argument('--per-page', type=int,
+                            default=settings.POSTS_NUM)
+
+    def handle(self, *args, **options):
+        if not settings.JINJA2_ENABLED:
+            raise CommandError('Пакет jinja2 не установлен')
+        posts = Post.objects.select_related('author', 'group')
+        # Страница вычисляется один раз: меряется только шаблон.
+        page_obj = Paginator(posts, options['per_page']).get_page(1)
+        page_obj.object_list = list(page_obj.object_list)
+        post = page_obj[0] if page_obj.object_list else None
+        if post is None:
+            raise CommandError('База пуста: сначала выполните seed_bench')
+        pages = {
+            'posts/index.html': {},
+            'posts/group_list.html': {'group': post.group},
+            'posts/profile.html': {'author': post.author, 'stats': None,
+                                   'suggestions': []},
+        }
+        request = RequestFactory().get('/')
+        request.resolver_match = resolve('/')
+        request.user = AnonymousUser()
+        for template_name, context in pages.items():
+            context = dict(context, page_obj=page_obj)
+            results = {}
+            for engine in ('django', 'jinja2'):
+                render_to_string(template_name, context, request,
+                                 using=engine)
+                start = time.perf_counter()
+                for _ in range(options['iterations']):
+                    render_to_string(template_name, context, request,
+                                     using=engine)
+                results[engine] = ((time.perf_counter() - start)
+                                   / options['iterations'])
+            self.stdout.write(
+                f'{template_name:24} '
+                f'django={results["django"] * 1000:.2f} мс '
+                f'jinja2={results["jinja2"] * 1000:.2f} мс '
+                f'x{results["django"] / results["jinja2"]:.1f}'
+            )
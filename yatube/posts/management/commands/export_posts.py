@@ -0,0 +1,40 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.export import gzip_stream, iter_ndjson
+from posts.models import Group, User
+
+
+class Command(BaseCommand):
+    help = 'Выгружает посты и комментарии в gzip NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument(
+            '--output', default='-',
+            help='Путь к файлу .ndjson.gz, "-" — stdout'
+        )
+        parser.add_argument('--batch-size', type=int)
+
+    def handle(self, *args, **options):
+        try:
+            author = (User.objects.get(username=options['author'])
+                      if options['author'] else None)
+            group = (Group.objects.get(slug=options['group'])
+                     if options['group'] else None)
+        except (User.DoesNotExist, Group.DoesNotExist) as error:
+            raise CommandError(error)
+        chunks = gzip_stream(
+            iter_ndjson(author, group, options['batch_size'])
+        )
+        if options['output'] == '-':
+            for chunk in chunks:
+                sys.stdout.buffer.write(chunk)
+            sys.stdout.buffer.flush()
+            return
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+        self.stdout.write(f'Выгрузка сохранена в {options["output"]}')
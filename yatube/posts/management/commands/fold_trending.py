@@ -0,0 +1,27 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from posts.models import TrendingGroup, TrendingPost
+from posts.trending import fold
+
+
+class Command(BaseCommand):
+    help = ('Сворачивает накопленные события в затухающий рейтинг '
+            'популярных постов и групп; с --loop повторяет каждые '
+            'TRENDING_FOLD_INTERVAL секунд')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true')
+        parser.add_argument('--interval', type=float,
+                            default=settings.TRENDING_FOLD_INTERVAL)
+
+    def handle(self, *args, **options):
+        while True:
+            posts = fold(TrendingPost)
+            groups = fold(TrendingGroup)
+            self.stdout.write(f'Свёрнуто: постов {posts}, групп {groups}')
+            if not options['loop']:
+                return
+            time.sleep(options['interval'])
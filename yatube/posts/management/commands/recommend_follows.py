@@ -0,0 +1,42 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Suggestion
+from posts.recommend import load_graph, recommend_all
+
+
+class Command(BaseCommand):
+    help = ('Пересчитывает рекомендации «на кого подписаться» по графу '
+            'подписок и перезаписывает таблицу Suggestion')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=10,
+                            help='Рекомендаций на пользователя')
+        parser.add_argument('--neighbourhood', type=int, default=50,
+                            help='Сколько похожих пользователей учитывать')
+        parser.add_argument('--workers', type=int,
+                            default=os.cpu_count() or 1)
+
+    def handle(self, *args, **options):
+        start = time.monotonic()
+        graph = load_graph()
+        loaded = time.monotonic()
+        rows = recommend_all(graph, options['top'],
+                             options['neighbourhood'], options['workers'])
+        computed = time.monotonic()
+        with transaction.atomic():
+            Suggestion.objects.all().delete()
+            Suggestion.objects.bulk_create(
+                Suggestion(user_id=user_id, author_id=author_id,
+                           score=score, rank=rank)
+                for user_id, author_id, score, rank in rows
+            )
+        self.stdout.write(
+            f'Вершин: {len(graph.ids)}, рёбер: {len(graph.out_targets)}, '
+            f'рекомендаций: {len(rows)}. Загрузка '
+            f'{loaded - start:.2f} с, расчёт {computed - loaded:.2f} с, '
+            f'запись {time.monotonic() - computed:.2f} с'
+        )
@@ -0,0 +1,166 @@
+import io
+import random
+from contextlib import contextmanager
+
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from faker import Faker
+from mixer.backend.django import mixer
+from PIL import Image
+
+from posts.following import rebuild_follow_stats
+from posts.models import Comment, Follow, Group, Post, User
+
+BENCH_PASSWORD = 'bench-password'
+
+
+@contextmanager
+def explicit_dates(model, field_name):
+    """Позволяет bulk_create сохранить заданную дату auto_now_add-поля."""
+    field = model._meta.get_field(field_name)
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def power_law_weights(count, exponent):
+    return [1 / (rank + 1) ** exponent for rank in range(count)]
+
+
+class Command(BaseCommand):
+    help = ('Заполняет базу синтетическими данными для бенчмарков: '
+            'пользователи, группы, посты с картинками, комментарии и '
+            'граф подписок со степенным распределением')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=500)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--comments', type=int, default=30000)
+        parser.add_argument('--follows-per-user', type=float, default=15)
+        parser.add_argument('--image-ratio', type=float, default=0.2)
+        parser.add_argument('--images', type=int, default=20,
+                            help='Число различных файлов картинок')
+        parser.add_argument('--days', type=int, default=365,
+                            help='Глубина истории постов в днях')
+        parser.add_argument('--exponent', type=float, default=1.1,
+                            help='Показатель степенного распределения')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options['seed'])
+        Faker.seed(options['seed'])
+        self.fake = Faker('ru_RU')
+        self.options = options
+        with transaction.atomic():
+            users = self.create_users()
+            groups = self.create_groups()
+            posts = self.create_posts(users, groups)
+            self.create_comments(users, posts)
+            self.create_follows(users)
+            rebuild_follow_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f'Создано: {len(users)} пользователей, {len(groups)} групп, '
+            f'{len(posts)} постов. Пароль пользователей: {BENCH_PASSWORD}'
+        ))
+
+    def create_users(self):
+        password = make_password(BENCH_PASSWORD)
+        offset = User.objects.count()
+        User.objects.bulk_create([User(
+            username=f'bench_{offset + i}',
+            first_name=self.fake.first_name(),
+            last_name=self.fake.last_name(),
+            password=password,
+        ) for i in range(self.options['users'])])
+        return list(User.objects.filter(
+            username__startswith='bench_').values_list('id', flat=True))
+
+    def create_groups(self):
+        offset = Group.objects.count()
+        groups = [mixer.blend(
+            Group,
+            title=self.fake.catch_phrase()[:200],
+            slug=f'bench-{offset + i}',
+            description=self.fake.paragraph(),
+        ) for i in range(self.options['groups'])]
+        return [group.id for group in groups]
+
+    def create_images(self):
+        names = []
+        for i in range(self.options['images']):
+            color = tuple(self.random.randrange(256) for _ in range(3))
+            buffer = io.BytesIO()
+            Image.new('RGB', (960, 640), color).save(buffer, 'JPEG')
+            names.append(default_storage.save(
+                f'posts/bench_{i}.jpg', ContentFile(buffer.getvalue())))
+        return names
+
+    def create_posts(self, users, groups):
+        images = self.create_images() if self.options['images'] else []
+        author_weights = power_law_weights(len(users), self.options[
+            'exponent'])
+        authors = self.random.choices(users, author_weights,
+                                      k=self.options['posts'])
+        now = timezone.now()
+        span = self.options['days'] * 86400
+        dates = sorted(
+            now - timezone.timedelta(seconds=self.random.uniform(0, span))
+            for _ in range(self.options['posts'])
+        )
+        posts = []
+        for author_id, pub_date in zip(authors, dates):
+            with_image = images and (
+                self.random.random() < self.options['image_ratio'])
+            posts.append(Post(
+                text=self.fake.text(max_nb_chars=600),
+                author_id=author_id,
+                group_id=(self.random.choice(groups)
+                          if groups and self.random.random() < 0.7
+                          else None),
+                image=self.random.choice(images) if with_image else '',
+                pub_date=pub_date,
+            ))
+        with explicit_dates(Post, 'pub_date'):
+            Post.objects.bulk_create(posts)
+        return list(Post.objects.filter(
+            author_id__in=users).values_list('id', 'pub_date'))
+
+    def create_comments(self, users, posts):
+        if not posts:
+            return
+        weights = power_law_weights(len(posts), self.options['exponent'])
+        shuffled = posts[:]
+        self.random.shuffle(shuffled)
+        targets = self.random.choices(shuffled, weights,
+                                      k=self.options['comments'])
+        comments = [Comment(
+            post_id=post_id,
+            author_id=self.random.choice(users),
+            text=self.fake.sentence(),
+            created=pub_date + timezone.timedelta(
+                minutes=self.random.randint(1, 60 * 24)),
+        ) for post_id, pub_date in targets]
+        with explicit_dates(Comment, 'created'):
+            Comment.objects.bulk_create(comments)
+
+    def create_follows(self, users):
+        weights = power_law_weights(len(users), self.options['exponent'])
+        follows = []
+        for user_id in users:
+            count = min(
+                int(self.random.expovariate(
+                    1 / self.options['follows_per_user'])),
+                len(users) - 1,
+            )
+            authors = set(self.random.choices(users, weights, k=count))
+            authors.discard(user_id)
+            follows.extend(Follow(user_id=user_id, author_id=author_id)
+                           for author_id in authors)
+        Follow.objects.bulk_create(follows, ignore_conflicts=True)
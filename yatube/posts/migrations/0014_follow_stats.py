@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:02
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+from django.db.models import Count
+
+
+def fill_follow_stats(apps, schema_editor):
+    User = apps.get_model(*settings.AUTH_USER_MODEL.split('.'))
+    FollowStats = apps.get_model('posts', 'FollowStats')
+    users = User.objects.annotate(
+        followers_count=Count('following', distinct=True),
+        following_count=Count('follower', distinct=True),
+    ).values_list('id', 'followers_count', 'following_count')
+    FollowStats.objects.bulk_create(
+        FollowStats(user_id=user_id, followers=followers,
+                    following=following)
+        for user_id, followers, following in users.iterator()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0013_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FollowStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='follow_stats', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='Пользователь')),
+                ('followers', models.PositiveIntegerField(default=0, verbose_name='Подписчики')),
+                ('following', models.PositiveIntegerField(default=0, verbose_name='Подписки')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['author', 'id', 'user'], name='follow_author_id_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='follow',
+            index=models.Index(fields=['user', 'id', 'author'], name='follow_user_id_author_idx'),
+        ),
+        migrations.RunPython(fill_follow_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-19 09:06
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_suggestion'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingGroup',
+            fields=[
+                ('score', models.FloatField(default=0, verbose_name='Рейтинг')),
+                ('pending', models.FloatField(default=0, verbose_name='Накоплено с прошлой свёртки')),
+                ('folded_at', models.DateTimeField(blank=True, null=True, verbose_name='Свёрнут')),
+                ('group', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Group', verbose_name='Группа')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='TrendingPost',
+            fields=[
+                ('score', models.FloatField(default=0, verbose_name='Рейтинг')),
+                ('pending', models.FloatField(default=0, verbose_name='Накоплено с прошлой свёртки')),
+                ('folded_at', models.DateTimeField(blank=True, null=True, verbose_name='Свёрнут')),
+                ('post', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='trending', serialize=False, to='posts.Post', verbose_name='Пост')),
+            ],
+            options={
+                'ordering': ['-score'],
+                'abstract': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='trendingpost',
+            index=models.Index(fields=['-score'], name='trending_post_score_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trendinggroup',
+            index=models.Index(fields=['-score'], name='trending_group_score_idx'),
+        ),
+    ]
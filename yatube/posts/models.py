@@ -56,8 +56,20 @@ class Post(models.Model):
     def __str__(self):
         return self.text[:15]
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        post = super().from_db(db, field_names, values)
+        # Группа на момент загрузки: по ней pre_save сбрасывает ленту
+        # старой группы без повторного чтения поста.
+        if 'group_id' in post.__dict__:
+            post._loaded_group_id = post.group_id
+        return post
+
     class Meta:
         ordering = ['-pub_date']
+        # Keyset-пагинация API идёт по (-pub_date, -id).
+        indexes = [models.Index(fields=['-pub_date', '-id'],
+                                name='post_pub_date_id_idx')]
         verbose_name = 'Пост'
         verbose_name_plural = 'Посты'
 
@@ -108,3 +120,152 @@ class Follow(models.Model):
 
     class Meta:
         unique_together = ('user', 'author',)
+        # Покрывающие индексы для keyset-пагинации списков подписок.
+        indexes = [
+            models.Index(fields=['author', 'id', 'user'],
+                         name='follow_author_id_user_idx'),
+            models.Index(fields=['user', 'id', 'author'],
+                         name='follow_user_id_author_idx'),
+        ]
+
+
+class FollowStats(models.Model):
+    """Денормализованные счётчики подписок, обновляются сигналами Follow."""
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='follow_stats',
+        verbose_name='Пользователь'
+    )
+    followers = models.PositiveIntegerField(default=0,
+                                            verbose_name='Подписчики')
+    following = models.PositiveIntegerField(default=0,
+                                            verbose_name='Подписки')
+
+
+class ArchivedPost(models.Model):
+    """Пост старше ARCHIVE_AFTER_DAYS, перенесённый командой archive_posts.
+
+    id совпадает с id исходного поста, поэтому ссылки остаются прежними.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField(verbose_name='Текст поста')
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts',
+        verbose_name='Автор'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts',
+        verbose_name='Группа'
+    )
+    image = models.ImageField(
+        verbose_name='Картинка',
+        upload_to='posts/',
+        blank=True
+    )
+
+    def __str__(self):
+        return self.text[:15]
+
+    class Meta:
+        ordering = ['-pub_date']
+        indexes = [models.Index(fields=['-pub_date', '-id'])]
+        verbose_name = 'Архивный пост'
+        verbose_name_plural = 'Архивные посты'
+
+
+class ArchivedComment(models.Model):
+    id = models.IntegerField(primary_key=True)
+    post = models.ForeignKey(
+        ArchivedPost,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_comments',
+        verbose_name='Автор'
+    )
+    text = models.TextField(verbose_name='Текст комментария')
+    created = models.DateTimeField(verbose_name='Дата комментария')
+
+    def __str__(self) -> str:
+        return self.text
+
+
+class Suggestion(models.Model):
+    """Рекомендация «на кого подписаться», пересчитывается командой
+    recommend_follows."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='suggestions',
+        verbose_name='Пользователь'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор'
+    )
+    score = models.FloatField(verbose_name='Оценка')
+    rank = models.PositiveSmallIntegerField(verbose_name='Место')
+
+    class Meta:
+        unique_together = ('user', 'rank')
+        ordering = ['rank']
+
+
+class TrendingScore(models.Model):
+    """Затухающий рейтинг активности.
+
+    События копятся в pending, команда fold_trending периодически
+    умножает score на коэффициент затухания и прибавляет pending.
+    """
+    score = models.FloatField(default=0, verbose_name='Рейтинг')
+    pending = models.FloatField(default=0,
+                                verbose_name='Накоплено с прошлой свёртки')
+    folded_at = models.DateTimeField(null=True, blank=True,
+                                     verbose_name='Свёрнут')
+
+    class Meta:
+        abstract = True
+        ordering = ['-score']
+
+
+class TrendingPost(TrendingScore):
+    post = models.OneToOneField(
+        Post,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Пост'
+    )
+
+    class Meta(TrendingScore.Meta):
+        indexes = [models.Index(fields=['-score'],
+                                name='trending_post_score_idx')]
+
+
+class TrendingGroup(TrendingScore):
+    group = models.OneToOneField(
+        Group,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='trending',
+        verbose_name='Группа'
+    )
+
+    class Meta(TrendingScore.Meta):
+        indexes = [models.Index(fields=['-score'],
+                                name='trending_group_score_idx')]
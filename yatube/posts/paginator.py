@@ -1,7 +1,100 @@
+import base64
+import binascii
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db.models import Q
 
 
 def pagination(request, post_list, posts_per_page):
     paginator = Paginator(post_list, posts_per_page)
     page_number = request.GET.get('page')
     return paginator.get_page(page_number)
+
+
+def encode_cursor(values):
+    # DjangoJSONEncoder обрезает микросекунды, а курсору нужна точность.
+    values = [value.isoformat() if isinstance(value, datetime.datetime)
+              else value for value in values]
+    data = json.dumps(values).encode()
+    return base64.urlsafe_b64encode(data).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Значения ключа из курсора или None, если курсор испорчен."""
+    try:
+        data = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        values = json.loads(data)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return None
+    return values if isinstance(values, list) else None
+
+
+def keyset_filter(ordering, values):
+    """Условие «строго после values» для сортировки ordering.
+
+    Последнее поле сортировки должно быть уникальным (обычно id).
+    """
+    condition = Q()
+    for index, field in enumerate(ordering):
+        name = field.lstrip('-')
+        lookup = 'lt' if field.startswith('-') else 'gt'
+        step = Q(**{f'{name}__{lookup}': values[index]})
+        for previous, value in zip(ordering[:index], values):
+            step &= Q(**{previous.lstrip('-'): value})
+        condition |= step
+    return condition
+
+
+def cursor_values(model, ordering, values):
+    """Значения курсора, приведённые к типам полей ordering.
+
+    Курсор приходит от клиента: значение не того типа превращается
+    в ValueError, а не в ошибку базы посреди запроса.
+    """
+    if len(values) != len(ordering):
+        raise ValueError('Некорректный курсор')
+    try:
+        return [model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(ordering, values)]
+    except (TypeError, ValidationError):
+        raise ValueError('Некорректный курсор')
+
+
+def cursor_pagination(request, querysets, per_page, ordering):
+    """Keyset-пагинация по курсору из GET-параметра cursor.
+
+    querysets — queryset или список querysets, строки которых идут друг
+    за другом в порядке ordering (горячая таблица, затем архив): если
+    в первом строк на страницу не хватило, она добирается из следующего.
+    Querysets должны отдавать словари (values()), содержащие поля
+    ordering. Возвращает строки страницы и курсор следующей страницы.
+    """
+    if not isinstance(querysets, (list, tuple)):
+        querysets = [querysets]
+    condition = None
+    cursor = request.GET.get('cursor')
+    if cursor:
+        values = decode_cursor(cursor)
+        if values is None:
+            raise ValueError('Некорректный курсор')
+        values = cursor_values(querysets[0].model, ordering, values)
+        condition = keyset_filter(ordering, values)
+    rows = []
+    for queryset in querysets:
+        queryset = queryset.order_by(*ordering)
+        if condition is not None:
+            queryset = queryset.filter(condition)
+        rows.extend(queryset[:per_page + 1 - len(rows)])
+        if len(rows) > per_page:
+            break
+    next_cursor = None
+    if len(rows) > per_page:
+        rows = rows[:per_page]
+        last = rows[-1]
+        next_cursor = encode_cursor(
+            [last[field.lstrip('-')] for field in ordering]
+        )
+    return rows, next_cursor
@@ -0,0 +1,107 @@
+import heapq
+import math
+import multiprocessing
+from array import array
+from collections import Counter, namedtuple
+
+from .models import Follow
+
+Graph = namedtuple('Graph', 'ids out_offsets out_targets in_offsets '
+                            'in_targets')
+
+# Граф, унаследованный дочерними процессами при fork без копирования.
+_graph = None
+
+
+def csr(pairs, size):
+    """CSR-смежность: соседи вершины i — targets[offsets[i]:offsets[i+1]].
+
+    pairs — пары (вершина, сосед), отсортированные по вершине.
+    """
+    offsets = array('l', [0]) * (size + 1)
+    targets = array('l')
+    for source, target in pairs:
+        offsets[source + 1] += 1
+        targets.append(target)
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+    return offsets, targets
+
+
+def load_graph():
+    """Загружает подписки в компактные целочисленные массивы.
+
+    Вершины — плотные индексы пользователей; ids переводит их обратно
+    в id. Хранятся обе стороны: подписки (out) и подписчики (in).
+    """
+    edges = list(Follow.objects.values_list('user_id', 'author_id'))
+    ids = array('l', sorted({node for edge in edges for node in edge}))
+    index = {user_id: i for i, user_id in enumerate(ids)}
+    edges = [(index[user], index[author]) for user, author in edges]
+    edges.sort()
+    out_offsets, out_targets = csr(edges, len(ids))
+    edges.sort(key=lambda edge: (edge[1], edge[0]))
+    in_offsets, in_targets = csr(((author, user) for user, author in edges),
+                                 len(ids))
+    return Graph(ids, out_offsets, out_targets, in_offsets, in_targets)
+
+
+def neighbours(offsets, targets, node):
+    return targets[offsets[node]:offsets[node + 1]]
+
+
+def recommend(graph, node, top, neighbourhood):
+    """Top-K авторов для вершины node по совместным подпискам.
+
+    Похожие пользователи — те, кто подписан на тех же авторов; вклад
+    общего автора тем меньше, чем он популярнее. Кандидаты — подписки
+    neighbourhood самых похожих пользователей, кроме уже имеющихся.
+    """
+    followed = neighbours(graph.out_offsets, graph.out_targets, node)
+    if not len(followed):
+        return []
+    similar = Counter()
+    for author in followed:
+        fans = neighbours(graph.in_offsets, graph.in_targets, author)
+        weight = 1 / math.log(2 + len(fans))
+        for fan in fans:
+            similar[fan] += weight
+    similar.pop(node, None)
+    scores = Counter()
+    for fan, weight in similar.most_common(neighbourhood):
+        for author in neighbours(graph.out_offsets, graph.out_targets, fan):
+            scores[author] += weight
+    for author in followed:
+        scores.pop(author, None)
+    scores.pop(node, None)
+    return heapq.nlargest(top, scores.items(), key=lambda item: item[1])
+
+
+def recommend_chunk(args):
+    """Рекомендации для диапазона вершин; выполняется в дочернем процессе."""
+    start, stop, top, neighbourhood = args
+    rows = []
+    for node in range(start, stop):
+        for rank, (author, score) in enumerate(
+                recommend(_graph, node, top, neighbourhood)):
+            rows.append((_graph.ids[node], _graph.ids[author], score, rank))
+    return rows
+
+
+def recommend_all(graph, top, neighbourhood, workers, chunk_size=256):
+    """Рекомендации для всех вершин графа в workers процессах.
+
+    Возвращает строки (user_id, author_id, score, rank).
+    """
+    global _graph
+    _graph = graph
+    size = len(graph.ids)
+    jobs = [(start, min(start + chunk_size, size), top, neighbourhood)
+            for start in range(0, size, chunk_size)]
+    if workers <= 1:
+        chunks = map(recommend_chunk, jobs)
+        return [row for chunk in chunks for row in chunk]
+    context = multiprocessing.get_context('fork')
+    with context.Pool(workers) as pool:
+        return [row for chunk in pool.imap_unordered(recommend_chunk, jobs)
+                for row in chunk]
@@ -0,0 +1,126 @@
+import threading
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .feeds import feed_cache_keys, feed_scope
+from .following import change_follow_stats, reset_following
+from .models import Follow, FollowStats, Group, Post, User
+from .watermarks import bump_author
+
+_local = threading.local()
+
+
+def post_scopes(posts):
+    """Области лент, в которые попадают посты.
+
+    Ключи строятся по author_id и group_id: username и slug берутся
+    из уже загруженных связей, недостающие читаются одним запросом
+    на всю пачку, а не загрузкой автора и группы каждого поста.
+    """
+    usernames, slugs = {}, {}
+    for post in posts:
+        if Post.author.is_cached(post):
+            usernames[post.author_id] = post.author.username
+        if post.group_id and Post.group.is_cached(post):
+            slugs[post.group_id] = post.group.slug
+    authors = {post.author_id for post in posts} - usernames.keys()
+    if authors:
+        usernames.update(User.objects.filter(pk__in=authors).values_list(
+            'pk', 'username'))
+    groups = {post.group_id for post in posts if post.group_id} - slugs.keys()
+    if groups:
+        slugs.update(Group.objects.filter(pk__in=groups).values_list(
+            'pk', 'slug'))
+    # Автора или группы уже может не быть: они удаляются каскадно
+    # вместе с постом.
+    scopes = {'index'}
+    for post in posts:
+        if post.author_id in usernames:
+            scopes.add(feed_scope('profile', usernames[post.author_id]))
+        if post.group_id in slugs:
+            scopes.add(feed_scope('group', slugs[post.group_id]))
+    return scopes
+
+
+def reset_feeds(posts):
+    keys = []
+    for scope in sorted(post_scopes(posts)):
+        keys.extend(feed_cache_keys(scope))
+    cache.delete_many(keys)
+
+
+@contextmanager
+def batched_feed_invalidation():
+    """Сбрасывает ленты изменённых внутри блока постов один раз в конце,
+    например при удалении пачки постов."""
+    if getattr(_local, 'pending', None) is not None:
+        yield
+        return
+    _local.pending = []
+    try:
+        yield
+    finally:
+        pending, _local.pending = _local.pending, None
+        if pending:
+            reset_feeds(pending)
+
+
+@receiver(pre_save, sender=Post)
+def invalidate_old_group_feed(sender, instance, **kwargs):
+    """При переносе поста в другую группу сбрасывает ленту старой группы."""
+    if instance.pk is None:
+        return
+    try:
+        old_group_id = instance._loaded_group_id
+    except AttributeError:
+        # Пост собран вручную, а не загружен из базы.
+        old_group_id = Post.objects.filter(pk=instance.pk).values_list(
+            'group_id', flat=True).first()
+    if old_group_id and old_group_id != instance.group_id:
+        slug = Group.objects.filter(pk=old_group_id).values_list(
+            'slug', flat=True).first()
+        cache.delete_many(feed_cache_keys(feed_scope('group', slug)))
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_feeds(sender, instance, **kwargs):
+    if kwargs.get('signal') is post_save:
+        instance._loaded_group_id = instance.group_id
+    pending = getattr(_local, 'pending', None)
+    if pending is not None:
+        pending.append(instance)
+    else:
+        reset_feeds([instance])
+
+
+@receiver(post_save, sender=Post)
+def bump_follow_watermarks(sender, instance, created, **kwargs):
+    if created:
+        bump_author(instance)
+
+
+@receiver(post_save, sender=Follow)
+@receiver(post_delete, sender=Follow)
+def reset_following_cache(sender, instance, **kwargs):
+    reset_following(instance.user_id)
+
+
+@receiver(post_save, sender=Follow)
+def count_follow(sender, instance, created, **kwargs):
+    if created:
+        change_follow_stats(instance.user_id, instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Follow)
+def count_unfollow(sender, instance, **kwargs):
+    change_follow_stats(instance.user_id, instance.author_id, -1)
+
+
+@receiver(post_save, sender=User)
+def create_follow_stats(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        FollowStats.objects.get_or_create(user=instance)
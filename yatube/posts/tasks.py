@@ -0,0 +1,16 @@
+from django.conf import settings
+from sorl.thumbnail import get_thumbnail
+
+from core.taskqueue import task
+
+from .models import Post
+
+
+@task(priority=10)
+def warm_thumbnails(post_id):
+    """Заранее строит миниатюры поста, чтобы их не рисовал первый запрос."""
+    post = Post.objects.filter(pk=post_id).only('image').first()
+    if post is None or not post.image:
+        return
+    for geometry, options in settings.POST_THUMBNAILS:
+        get_thumbnail(post.image, geometry, **options)
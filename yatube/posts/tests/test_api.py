@@ -0,0 +1,111 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.models import Post, Group, Comment, Follow
+from posts.paginator import encode_cursor
+
+
+User = get_user_model()
+
+
+class ApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.leo = User.objects.create_user(username='leo')
+        Follow.objects.create(user=cls.user, author=cls.leo)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([Post(
+            author=cls.leo,
+            text=f'Тестовый пост {i}',
+            group=cls.group,
+        ) for i in range(15)])
+        cls.post = Post.objects.create(author=cls.user, text='Пост')
+        Comment.objects.bulk_create([Comment(
+            post=cls.post,
+            author=cls.leo,
+            text=f'Тестовый комментарий {i}'
+        ) for i in range(3)])
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.guest_client = Client()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def collect(self, client, url):
+        """Проходит все страницы по курсору и возвращает их результаты."""
+        results = []
+        cursor = None
+        while True:
+            params = {'limit': 4}
+            if cursor:
+                params['cursor'] = cursor
+            data = client.get(url, params).json()
+            results.extend(data['results'])
+            cursor = data['next']
+            if cursor is None:
+                return results
+
+    def test_cursor_pagination_returns_every_post_once(self):
+        """Курсорная пагинация отдаёт посты без пропусков и повторов."""
+        results = self.collect(self.guest_client, reverse('posts:api_index'))
+        expected = list(Post.objects.values_list('id', flat=True))
+        self.assertEqual([post['id'] for post in results], expected)
+
+    def test_sparse_fields(self):
+        """Параметр fields ограничивает набор полей."""
+        response = self.guest_client.get(
+            reverse('posts:api_group_posts', args=[self.group.slug]),
+            {'fields': 'id,author'}
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        for post in response.json()['results']:
+            self.assertEqual(set(post), {'id', 'author'})
+            self.assertEqual(post['author'], 'leo')
+        response = self.guest_client.get(reverse('posts:api_index'),
+                                         {'fields': 'password'})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_bad_cursor(self):
+        """Испорченный курсор или значения не того типа — 400."""
+        cursors = ('испорчен', encode_cursor(['abc', 1]),
+                   encode_cursor([[1], 1]), encode_cursor([5, {}]),
+                   encode_cursor([None, 1]))
+        for cursor in cursors:
+            with self.subTest(cursor=cursor):
+                response = self.guest_client.get(
+                    reverse('posts:api_index'), {'cursor': cursor})
+                self.assertEqual(response.status_code,
+                                 HTTPStatus.BAD_REQUEST)
+        response = self.guest_client.get(
+            reverse('posts:api_post_comments', args=[self.post.pk]),
+            {'cursor': encode_cursor(['abc', 1])})
+        self.assertEqual(response.status_code, HTTPStatus.BAD_REQUEST)
+
+    def test_follow_feed(self):
+        """Лента подписок требует авторизации."""
+        url = reverse('posts:api_follow_index')
+        response = self.guest_client.get(url)
+        self.assertEqual(response.status_code, HTTPStatus.UNAUTHORIZED)
+        results = self.collect(self.authorized_client, url)
+        self.assertEqual(len(results), 15)
+
+    def test_post_detail_and_comments(self):
+        response = self.guest_client.get(
+            reverse('posts:api_post_detail', args=[self.post.id]))
+        self.assertEqual(response.json()['text'], self.post.text)
+        results = self.collect(
+            self.guest_client,
+            reverse('posts:api_post_comments', args=[self.post.id])
+        )
+        self.assertEqual([comment['text'] for comment in results], [
+            f'Тестовый комментарий {i}' for i in range(3)
+        ])
@@ -0,0 +1,144 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from posts.archive import Feed
+from posts.export import iter_ndjson
+from posts.models import ArchivedComment, ArchivedPost, Comment, Group, Post
+
+
+User = get_user_model()
+
+
+@override_settings(POSTS_NUM=2, ARCHIVE_PAUSE=0)
+class ArchiveTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        now = timezone.now()
+        cls.posts = []
+        for days in (1, 2, 100, 200, 300):
+            post = Post.objects.create(author=cls.user, group=cls.group,
+                                       text=f'Пост {days}')
+            Post.objects.filter(pk=post.pk).update(
+                pub_date=now - datetime.timedelta(days=days))
+            cls.posts.append(post)
+        cls.old = cls.posts[2]
+        Comment.objects.create(post=cls.old, author=cls.user,
+                               text='Старый комментарий')
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def archive(self):
+        call_command('archive_posts', days=30, batch_size=2,
+                     stdout=io.StringIO())
+
+    def test_old_posts_moved_with_comments(self):
+        """Старые посты и их комментарии переезжают в архив с теми же id."""
+        self.archive()
+        self.assertEqual(Post.objects.count(), 2)
+        self.assertEqual(
+            set(ArchivedPost.objects.values_list('id', flat=True)),
+            {post.pk for post in self.posts[2:]})
+        self.assertFalse(Comment.objects.exists())
+        self.assertEqual(
+            ArchivedComment.objects.get().post_id, self.old.pk)
+
+    def test_batch_resolves_feed_scopes_once(self):
+        """Удаление пачки читает авторов и группы одним запросом."""
+        with CaptureQueriesContext(connection) as queries:
+            self.archive()
+        lookups = [query['sql'] for query in queries
+                   if query['sql'].startswith('SELECT')
+                   and ('FROM "auth_user"' in query['sql']
+                        or 'FROM "posts_group"' in query['sql'])]
+        self.assertEqual(len(lookups), 4)  # две пачки
+
+    def test_feed_reads_hot_then_cold(self):
+        """Лента отдаёт посты в прежнем порядке через обе таблицы."""
+        expected = [post.pk for post in self.posts]
+        self.archive()
+        feed = Feed(group=self.group)
+        self.assertEqual(feed.count(), 5)
+        self.assertEqual([post.pk for post in feed[0:5]], expected)
+        self.assertEqual([post.pk for post in feed[1:4]], expected[1:4])
+        pages = []
+        for page in (1, 2, 3):
+            response = self.client.get(reverse('posts:index'),
+                                       {'page': page})
+            pages.extend(post.pk for post in response.context['page_obj'])
+        self.assertEqual(pages, expected)
+
+    def test_cold_count_cached_until_next_batch(self):
+        """Число архивных постов читается из кэша до новой пачки."""
+        self.archive()
+        Feed().count()
+        with self.assertNumQueries(1):
+            self.assertEqual(Feed().count(), 5)
+        Post.objects.filter(pk=self.posts[1].pk).update(
+            pub_date=timezone.now() - datetime.timedelta(days=50))
+        self.archive()
+        with self.assertNumQueries(2):
+            self.assertEqual(Feed().count(), 5)
+
+    def test_archived_post_detail(self):
+        """Архивный пост открывается по старому адресу без формы."""
+        self.archive()
+        response = self.client.get(
+            reverse('posts:post_detail', args=[self.old.pk]))
+        self.assertEqual(response.context['post'].text, self.old.text)
+        self.assertTrue(response.context['archived'])
+        self.assertEqual(response.context['author_posts'], 5)
+        self.assertContains(response, 'Старый комментарий')
+        self.assertNotContains(response, 'Добавить комментарий')
+
+    def test_api_reads_archive(self):
+        """API листает горячие посты, затем архивные, и отдаёт архивный
+        пост с комментариями."""
+        expected = [post.pk for post in self.posts]
+        self.archive()
+        ids = []
+        cursor = None
+        while True:
+            params = {'limit': 2, 'fields': 'id'}
+            if cursor:
+                params['cursor'] = cursor
+            data = self.client.get(reverse('posts:api_index'), params).json()
+            ids.extend(row['id'] for row in data['results'])
+            cursor = data['next']
+            if not cursor:
+                break
+        self.assertEqual(ids, expected)
+        response = self.client.get(
+            reverse('posts:api_post_detail', args=[self.old.pk]))
+        self.assertEqual(response.json()['text'], self.old.text)
+        response = self.client.get(
+            reverse('posts:api_post_comments', args=[self.old.pk]))
+        self.assertEqual([row['text'] for row in response.json()['results']],
+                         ['Старый комментарий'])
+        response = self.client.get(
+            reverse('posts:api_post_comments', args=[10 ** 6]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_feed_and_export_read_archive(self):
+        """RSS и выгрузка включают архивные посты и комментарии."""
+        self.archive()
+        response = self.client.get(reverse('posts:feed_rss'))
+        self.assertContains(response, self.old.text)
+        export = b''.join(iter_ndjson(author=self.user))
+        self.assertIn(self.old.text.encode(), export)
+        self.assertIn('Старый комментарий'.encode(), export)
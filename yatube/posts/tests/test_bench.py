@@ -0,0 +1,38 @@
+import json
+import os
+import shutil
+import tempfile
+from io import StringIO
+
+from django.conf import settings
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from posts.models import Post, Follow, Comment
+
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class BenchCommandsTests(TestCase):
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def test_seed_and_bench(self):
+        """seed_bench создаёт данные, bench пишет отчёт в JSON."""
+        call_command('seed_bench', users=10, groups=2, posts=30,
+                     comments=40, images=1, image_ratio=0.5,
+                     follows_per_user=3, stdout=StringIO())
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(Comment.objects.count(), 40)
+        self.assertTrue(Follow.objects.exists())
+        self.assertTrue(Post.objects.exclude(image='').exists())
+        output = os.path.join(TEMP_MEDIA_ROOT, 'bench.json')
+        call_command('bench', iterations=2, warmup=0, output=output,
+                     stdout=StringIO())
+        with open(output) as report:
+            views = json.load(report)['views']
+        self.assertEqual(views['posts:index']['status'], 200)
+        self.assertIn('p99_ms', views['posts:follow_index'])
@@ -0,0 +1,70 @@
+import gzip
+import json
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.export import iter_ndjson
+from posts.models import Post, Group, Comment
+
+
+User = get_user_model()
+
+
+class ExportTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.leo = User.objects.create_user(username='leo')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create([Post(
+            author=cls.user,
+            text=f'Тестовый пост {i}',
+            group=cls.group,
+        ) for i in range(7)])
+        cls.post = Post.objects.create(author=cls.leo, text='Пост Львяша')
+        Comment.objects.create(post=cls.post, author=cls.user, text='Комм')
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def read_export(self, response):
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        data = gzip.decompress(b''.join(response.streaming_content))
+        return [json.loads(line) for line in data.splitlines()]
+
+    def test_keyset_batches_cover_all_rows(self):
+        """Пачки по keyset отдают каждую строку ровно один раз."""
+        rows = [json.loads(line) for line in iter_ndjson(batch_size=3)]
+        post_ids = [row['id'] for row in rows if row['type'] == 'post']
+        self.assertEqual(post_ids, sorted(
+            Post.objects.values_list('id', flat=True)))
+        self.assertEqual(len(rows), Post.objects.count() + 1)
+
+    def test_user_exports_own_posts(self):
+        """Пользователь выгружает свои посты и комментарии."""
+        rows = self.read_export(
+            self.authorized_client.get(reverse('posts:export')))
+        self.assertEqual(len(rows), 8)
+        self.assertTrue(all(row['author__username'] == 'auth'
+                            for row in rows))
+
+    def test_user_cannot_export_foreign_scope(self):
+        """Чужие записи и группы выгружает только персонал."""
+        response = self.authorized_client.get(
+            reverse('posts:export') + '?author=leo')
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+        rows = self.read_export(self.staff_client.get(
+            reverse('posts:export') + f'?group={self.group.slug}'))
+        self.assertEqual(len(rows), 7)
@@ -0,0 +1,102 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.feeds import feed_cache_key, feed_scope
+from posts.models import Post, Group
+
+
+User = get_user_model()
+
+
+class FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.guest_client = Client()
+        cache.clear()
+
+    def test_feeds_available(self):
+        """Ленты RSS и Atom доступны для всех областей."""
+        urls = (
+            reverse('posts:feed_rss'),
+            reverse('posts:feed_atom'),
+            reverse('posts:group_feed_rss', args=[self.group.slug]),
+            reverse('posts:group_feed_atom', args=[self.group.slug]),
+            reverse('posts:profile_feed_rss', args=[self.user.username]),
+            reverse('posts:profile_feed_atom', args=[self.user.username]),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertIn(self.post.text.encode(), response.content)
+        response = self.guest_client.get(
+            reverse('posts:group_feed_rss', args=['no-such-group']))
+        self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
+
+    def test_conditional_get_without_queries(self):
+        """Повторный опрос с ETag отвечает 304 без запросов к базе."""
+        url = reverse('posts:group_feed_rss', args=[self.group.slug])
+        etag = self.guest_client.get(url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_new_post_invalidates_feed(self):
+        """Новый пост в области сбрасывает закэшированную ленту."""
+        url = reverse('posts:profile_feed_atom', args=[self.user.username])
+        etag = self.guest_client.get(url)['ETag']
+        Post.objects.create(author=self.user, text='Свежий пост')
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertIn('Свежий пост'.encode(), response.content)
+
+    def test_cache_key_safe_for_memcached(self):
+        """Кириллический username не попадает в ключ кэша ленты."""
+        author = User.objects.create_user(username='лев_толстой')
+        url = reverse('posts:profile_feed_rss', args=[author.username])
+        etag = self.guest_client.get(url)['ETag']
+        key = feed_cache_key('rss', feed_scope('profile', author.username))
+        self.assertTrue(key.isascii())
+        self.assertIsNotNone(cache.get(key))
+        Post.objects.create(author=author, text='Новая глава')
+        self.assertIsNone(cache.get(key))
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertIn('Новая глава'.encode(), response.content)
+
+    def test_group_change_invalidates_old_group(self):
+        """Перенос загруженного поста в другую группу сбрасывает ленту
+        старой группы без повторного чтения поста."""
+        other = Group.objects.create(title='Другая', slug='other',
+                                     description='Описание')
+        url = reverse('posts:group_feed_rss', args=[self.group.slug])
+        etag = self.guest_client.get(url)['ETag']
+        post = Post.objects.get(pk=self.post.pk)
+        post.group = other
+        with CaptureQueriesContext(connection) as queries:
+            post.save()
+        self.assertFalse([query for query in queries
+                          if query['sql'].startswith('SELECT')
+                          and '"posts_post"' in query['sql']])
+        response = self.guest_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertNotIn(self.post.text.encode(), response.content)
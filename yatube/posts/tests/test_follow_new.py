@@ -0,0 +1,84 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from posts.models import Post, Follow
+from posts.watermarks import author_hwm_key, bump_author
+
+
+User = get_user_model()
+
+
+@override_settings(FOLLOW_POLL_TIMEOUT=0.2, FOLLOW_POLL_INTERVAL=0.05)
+class FollowNewTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.leo = User.objects.create_user(username='leo')
+        Follow.objects.create(user=cls.user, author=cls.leo)
+        cls.post = Post.objects.create(author=cls.leo, text='Пост Львяша')
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+        self.url = reverse('posts:follow_new')
+        cache.clear()
+
+    def test_initial_cursor(self):
+        """Без курсора возвращается текущая отметка ленты."""
+        data = self.authorized_client.get(self.url).json()
+        self.assertEqual(data, {'count': 0, 'cursor': self.post.pk})
+
+    def test_no_post_queries_when_nothing_changed(self):
+        """Пока новых постов нет, таблица постов не читается."""
+        self.authorized_client.get(self.url)
+        with self.assertNumQueries(0):
+            data = self.authorized_client.get(
+                self.url, {'since': self.post.pk}).json()
+        self.assertEqual(data['count'], 0)
+
+    def test_new_post_counted(self):
+        """Новый пост автора из подписок попадает в счётчик."""
+        self.authorized_client.get(self.url)
+        new_post = Post.objects.create(author=self.leo, text='Новый пост')
+        Post.objects.create(author=self.user, text='Свой пост')
+        data = self.authorized_client.get(
+            self.url, {'since': self.post.pk}).json()
+        self.assertEqual(data, {'count': 1, 'cursor': new_post.pk})
+
+    def test_lost_bump_recovered_after_timeout(self):
+        """Пост, отметка которого не дошла до кэша, виден после истечения
+        срока отметки."""
+        self.authorized_client.get(self.url)
+        Post.objects.bulk_create([Post(author=self.leo, text='Мимо сигнала')])
+        data = self.authorized_client.get(
+            self.url, {'since': self.post.pk, 'timeout': 0}).json()
+        self.assertEqual(data['count'], 0)
+        cache.delete(author_hwm_key(self.leo.pk))  # срок истёк
+        data = self.authorized_client.get(
+            self.url, {'since': self.post.pk, 'timeout': 0}).json()
+        self.assertEqual(data['count'], 1)
+
+    def test_older_post_does_not_lower_watermark(self):
+        """Запоздавшая отметка более старого поста не опускает её."""
+        newer = Post.objects.create(author=self.leo, text='Новее')
+        bump_author(self.post)
+        self.assertEqual(cache.get(author_hwm_key(self.leo.pk)), newer.pk)
+
+    def test_followed_author_seen_after_follow(self):
+        """После подписки в отметке учитываются посты нового автора."""
+        other = User.objects.create_user(username='other')
+        self.authorized_client.get(self.url)
+        post = Post.objects.create(author=other, text='Пост другого')
+        Follow.objects.create(user=self.user, author=other)
+        data = self.authorized_client.get(
+            self.url, {'since': self.post.pk, 'timeout': 0}).json()
+        self.assertEqual(data, {'count': 1, 'cursor': post.pk})
+
+    def test_guest_redirected(self):
+        response = Client().get(self.url)
+        self.assertEqual(response.status_code, HTTPStatus.FOUND)
@@ -0,0 +1,148 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from posts.following import followed_ids, following_key
+from posts.paginator import encode_cursor
+from posts.models import Follow, FollowStats, Post
+
+
+User = get_user_model()
+
+
+class FollowingCacheTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.leo = User.objects.create_user(username='leo')
+        cls.post = Post.objects.create(author=cls.leo, text='Пост Львяша')
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def follow_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        return response, [query['sql'] for query in queries
+                          if '"posts_follow"' in query['sql']]
+
+    def test_followed_ids_cached(self):
+        """Повторное чтение подписок не обращается к базе."""
+        self.assertEqual(followed_ids(self.user.pk), frozenset())
+        with self.assertNumQueries(0):
+            followed_ids(self.user.pk)
+
+    def test_stale_cache_does_not_block_follow(self):
+        """Устаревший кэш подписок не мешает подписаться."""
+        Follow.objects.create(user=self.user, author=self.leo)
+        followed_ids(self.user.pk)
+        Follow.objects.all().delete()
+        cache.set(following_key(self.user.pk), frozenset({self.leo.pk}))
+        self.client.get(reverse('posts:profile_follow', args=['leo']))
+        self.assertTrue(Follow.objects.filter(user=self.user,
+                                              author=self.leo).exists())
+
+    def test_follow_and_unfollow_reset_cache(self):
+        """Подписка и отписка сбрасывают кэш подписок."""
+        followed_ids(self.user.pk)
+        self.client.get(reverse('posts:profile_follow', args=['leo']))
+        self.assertEqual(followed_ids(self.user.pk), {self.leo.pk})
+        self.client.get(reverse('posts:profile_unfollow', args=['leo']))
+        self.assertEqual(followed_ids(self.user.pk), frozenset())
+
+    def test_views_skip_follow_table_with_warm_cache(self):
+        """profile и follow_index не читают Follow, повторная подписка
+        не создаёт дубля."""
+        Follow.objects.create(user=self.user, author=self.leo)
+        followed_ids(self.user.pk)
+        response, queries = self.follow_queries(
+            reverse('posts:profile', args=['leo']))
+        self.assertTrue(response.context['following'])
+        self.assertEqual(queries, [])
+        response, queries = self.follow_queries(reverse('posts:follow_index'))
+        self.assertEqual(list(response.context['page_obj']), [self.post])
+        self.assertEqual(queries, [])
+        _, queries = self.follow_queries(
+            reverse('posts:profile_follow', args=['leo']))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(Follow.objects.count(), 1)
+
+
+@override_settings(FOLLOWS_NUM=2)
+class FollowListTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.leo = User.objects.create_user(username='leo')
+        cls.fans = [User.objects.create_user(username=f'fan{i}')
+                    for i in range(3)]
+        for fan in cls.fans:
+            Follow.objects.create(user=fan, author=cls.leo)
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+
+    def test_counters_follow_signals(self):
+        """Счётчики меняются при подписке и отписке."""
+        stats = FollowStats.objects.get(user=self.leo)
+        self.assertEqual((stats.followers, stats.following), (3, 0))
+        self.assertEqual(
+            FollowStats.objects.get(user=self.fans[0]).following, 1)
+        Follow.objects.filter(user=self.fans[0]).delete()
+        self.assertEqual(FollowStats.objects.get(user=self.leo).followers, 2)
+        self.assertEqual(
+            FollowStats.objects.get(user=self.fans[0]).following, 0)
+
+    def test_unfollow_with_drifted_counter(self):
+        """Отписка не падает, если счётчик уже обнулился."""
+        FollowStats.objects.filter(user=self.leo).update(followers=0)
+        Follow.objects.filter(user=self.fans[0]).delete()
+        self.assertEqual(FollowStats.objects.get(user=self.leo).followers, 0)
+
+    def test_followers_page_keyset(self):
+        """Страницы подписчиков идут от новых к старым по курсору."""
+        url = reverse('posts:followers', args=['leo'])
+        with self.assertNumQueries(2):
+            response = self.client.get(url)
+        self.assertEqual(response.context['stats'].followers, 3)
+        self.assertEqual([user['username'] for user in
+                          response.context['users']], ['fan2', 'fan1'])
+        response = self.client.get(
+            url, {'cursor': response.context['next_cursor']})
+        self.assertEqual([user['username'] for user in
+                          response.context['users']], ['fan0'])
+        self.assertIsNone(response.context['next_cursor'])
+        for cursor in ('bad', encode_cursor(['abc']), encode_cursor([[1]])):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(
+                    self.client.get(url, {'cursor': cursor}).status_code,
+                    400)
+
+    def test_following_api(self):
+        """JSON-список подписок с числом из счётчика."""
+        data = self.client.get(
+            reverse('posts:api_following', args=['fan1'])).json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(data['results'], [
+            {'username': 'leo', 'first_name': '', 'last_name': ''}])
+        self.assertIsNone(data['next'])
+
+    def test_followers_query_uses_covering_index(self):
+        """Выборка подписчиков идёт по покрывающему индексу."""
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(reverse('posts:api_followers', args=['leo']))
+        sql = next(query['sql'] for query in queries
+                   if 'FROM "posts_follow"' in query['sql'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            plan = ' '.join(str(row[-1]) for row in cursor.fetchall())
+        self.assertIn('follow_author_id_user_idx', plan)
+        self.assertNotIn('TEMP B-TREE', plan)
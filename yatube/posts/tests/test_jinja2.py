@@ -0,0 +1,92 @@
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.template import engines
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import resolve, reverse
+from django.utils import timezone
+from core.rendering import engine_for
+from posts.models import Group, Post
+
+
+User = get_user_model()
+HREF = re.compile(r'href="([^"]*)"')
+
+
+class EngineSwitchTests(TestCase):
+    def request(self, url):
+        request = RequestFactory().get(url)
+        request.resolver_match = resolve(url)
+        return request
+
+    @override_settings(JINJA2_ENABLED=True, JINJA2_VIEWS=('posts:index',))
+    def test_views_from_setting_use_jinja2(self):
+        """JINJA2_VIEWS переключает на Jinja2 только перечисленные
+        представления."""
+        self.assertEqual(engine_for(self.request('/')), 'jinja2')
+        self.assertEqual(
+            engine_for(self.request(reverse('posts:profile', args=['leo']))),
+            'django')
+
+    @override_settings(JINJA2_ENABLED=False, JINJA2_VIEWS=('posts:index',))
+    def test_without_jinja2_falls_back_to_dtl(self):
+        """Без установленного jinja2 всегда используется DTL."""
+        self.assertEqual(engine_for(self.request('/')), 'django')
+
+
+class Jinja2FeedTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.leo = User.objects.create_user(username='leo', first_name='Лев')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+        for number in range(12):
+            Post.objects.create(author=cls.leo, group=cls.group,
+                                text=f'Пост <{number}>')
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def render_with(self, engine, url):
+        views = ('posts:index', 'posts:group_list', 'posts:profile',
+                 'posts:follow_index') if engine == 'jinja2' else ()
+        with override_settings(JINJA2_VIEWS=views):
+            cache.clear()
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.wsgi_request.template_engine, engine)
+        return response.content.decode()
+
+    def test_feed_pages_match_dtl(self):
+        """Страницы ленты на Jinja2 содержат те же посты и ссылки."""
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=['group']),
+            reverse('posts:profile', args=['leo']) + '?page=2',
+            reverse('posts:follow_index'),
+        ]
+        for url in urls:
+            with self.subTest(url=url):
+                dtl = self.render_with('django', url)
+                jinja = self.render_with('jinja2', url)
+                self.assertEqual(HREF.findall(jinja), HREF.findall(dtl))
+                self.assertEqual(jinja.count('<article>'),
+                                 dtl.count('<article>'))
+                self.assertNotIn('<1>', jinja)
+                # user и year приходят из контекстных процессоров.
+                self.assertIn('Пользователь: auth', jinja)
+                self.assertIn(f'© {timezone.now().year}', jinja)
+
+    def test_addclass_filter(self):
+        """Фильтр addclass добавляет класс виджету поля формы."""
+        from posts.forms import PostForm
+        template = engines['jinja2'].from_string(
+            "{{ form.text|addclass('form-control') }}")
+        self.assertIn('class="form-control"',
+                      template.render({'form': PostForm()}))
@@ -0,0 +1,71 @@
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, Client
+from django.urls import reverse
+from posts.models import Follow, Suggestion
+from posts.recommend import load_graph, neighbours, recommend_all
+
+
+User = get_user_model()
+
+
+class RecommendTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        names = ('auth', 'ann', 'bob', 'leo', 'max', 'zoe')
+        cls.users = {name: User.objects.create_user(username=name)
+                     for name in names}
+        # auth и ann читают leo; ann ещё читает max и zoe, bob — только zoe.
+        for user, author in (('auth', 'leo'), ('ann', 'leo'),
+                             ('ann', 'max'), ('ann', 'zoe'),
+                             ('bob', 'zoe')):
+            Follow.objects.create(user=cls.users[user],
+                                  author=cls.users[author])
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+
+    def pk(self, name):
+        return self.users[name].pk
+
+    def test_graph_arrays(self):
+        """Подписки и подписчики лежат в CSR-массивах."""
+        graph = load_graph()
+        node = list(graph.ids).index(self.pk('ann'))
+        self.assertEqual(
+            sorted(graph.ids[i] for i in neighbours(
+                graph.out_offsets, graph.out_targets, node)),
+            sorted([self.pk('leo'), self.pk('max'), self.pk('zoe')]))
+        node = list(graph.ids).index(self.pk('zoe'))
+        self.assertEqual(
+            sorted(graph.ids[i] for i in neighbours(
+                graph.in_offsets, graph.in_targets, node)),
+            sorted([self.pk('ann'), self.pk('bob')]))
+
+    def test_co_follow_recommendations(self):
+        """Рекомендуются подписки похожих пользователей, кроме своих."""
+        rows = recommend_all(load_graph(), top=5, neighbourhood=10,
+                             workers=1)
+        suggested = {author: rank for user, author, score, rank in rows
+                     if user == self.pk('auth')}
+        self.assertEqual(set(suggested), {self.pk('max'), self.pk('zoe')})
+        self.assertEqual(sorted(suggested.values()), [0, 1])
+
+    def test_command_writes_suggestions_for_pages(self):
+        """Команда пишет таблицу, профиль читает её без уже читаемых."""
+        call_command('recommend_follows', workers=2, stdout=io.StringIO())
+        self.assertEqual(
+            Suggestion.objects.filter(user=self.users['auth']).count(), 2)
+        Follow.objects.create(user=self.users['auth'],
+                              author=self.users['max'])
+        client = Client()
+        client.force_login(self.users['auth'])
+        response = client.get(reverse('posts:follow_index'))
+        self.assertEqual(response.context['suggestions'],
+                         [self.users['zoe']])
+        self.assertContains(response, 'Кого почитать')
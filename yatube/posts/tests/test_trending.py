@@ -0,0 +1,74 @@
+import datetime
+import io
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from posts.models import Group, Post, TrendingGroup, TrendingPost
+from posts.trending import fold
+
+
+User = get_user_model()
+
+
+@override_settings(TRENDING_HALF_LIFE_HOURS=1, TRENDING_POST_WEIGHT=3,
+                   TRENDING_COMMENT_WEIGHT=1)
+class TrendingTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(title='Группа', slug='group',
+                                         description='Описание')
+
+    def setUp(self) -> None:
+        super().setUp()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_post(self, text):
+        self.client.post(reverse('posts:post_create'),
+                         {'text': text, 'group': self.group.pk})
+        return Post.objects.get(text=text)
+
+    def comment(self, post, times=1):
+        for _ in range(times):
+            self.client.post(reverse('posts:add_comment', args=[post.pk]),
+                             {'text': 'Комментарий'})
+
+    def test_events_buffered_until_fold(self):
+        """События копятся в pending и попадают в рейтинг при свёртке."""
+        post = self.create_post('Новый пост')
+        self.comment(post, 2)
+        self.assertEqual(TrendingPost.objects.get(pk=post.pk).pending, 5)
+        self.assertEqual(TrendingGroup.objects.get(pk=self.group.pk).pending,
+                         5)
+        call_command('fold_trending', stdout=io.StringIO())
+        trending = TrendingPost.objects.get(pk=post.pk)
+        self.assertEqual((trending.score, trending.pending), (5, 0))
+
+    def test_scores_decay(self):
+        """За период полураспада рейтинг уменьшается вдвое."""
+        post = self.create_post('Пост')
+        now = timezone.now()
+        fold(TrendingPost, now)
+        fold(TrendingPost, now + datetime.timedelta(hours=1))
+        self.assertAlmostEqual(TrendingPost.objects.get(pk=post.pk).score,
+                               1.5)
+
+    def test_trending_page_single_ranked_query(self):
+        """Популярные посты идут по рейтингу одним запросом на список."""
+        quiet = self.create_post('Тихий пост')
+        loud = self.create_post('Громкий пост')
+        self.comment(loud, 3)
+        self.comment(quiet)
+        fold(TrendingPost)
+        fold(TrendingGroup)
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('posts:trending'))
+        self.assertEqual([item.post for item in response.context['posts']],
+                         [loud, quiet])
+        self.assertEqual([item.group for item in response.context['groups']],
+                         [self.group])
@@ -0,0 +1,70 @@
+from django.conf import settings
+from django.db import connections, router
+from django.db.models import F, Max
+from django.utils import timezone
+
+from .models import TrendingGroup, TrendingPost
+
+
+def bump(model, pk, weight):
+    """Прибавляет weight к накопленному счётчику одним upsert-запросом.
+
+    ON CONFLICT понимают и SQLite (3.24+), и PostgreSQL; в ORM Django 2.2
+    upsert нет.
+    """
+    connection = connections[router.db_for_write(model)]
+    table = connection.ops.quote_name(model._meta.db_table)
+    column = connection.ops.quote_name(model._meta.pk.column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'INSERT INTO {table} ({column}, score, pending) '
+            f'VALUES (%s, 0, %s) ON CONFLICT ({column}) '
+            f'DO UPDATE SET pending = pending + excluded.pending',
+            [pk, weight],
+        )
+
+
+def record_post(post):
+    """Новый пост: стартовый вес самому посту и активность группе."""
+    TrendingPost.objects.create(pk=post.pk,
+                                pending=settings.TRENDING_POST_WEIGHT)
+    if post.group_id:
+        bump(TrendingGroup, post.group_id, settings.TRENDING_POST_WEIGHT)
+
+
+def record_comment(post):
+    bump(TrendingPost, post.pk, settings.TRENDING_COMMENT_WEIGHT)
+    if post.group_id:
+        bump(TrendingGroup, post.group_id, settings.TRENDING_COMMENT_WEIGHT)
+
+
+def decay_factor(elapsed):
+    """Во сколько раз затухает рейтинг за elapsed секунд."""
+    return 0.5 ** (elapsed / (settings.TRENDING_HALF_LIFE_HOURS * 3600))
+
+
+def fold(model, now=None):
+    """Сворачивает накопленные события в рейтинг одним UPDATE.
+
+    Все строки сворачиваются вместе, поэтому коэффициент затухания
+    общий и порядок по score совпадает с порядком по затухшему рейтингу.
+    Почти нулевые строки без новых событий удаляются.
+    """
+    now = now or timezone.now()
+    last = model.objects.aggregate(last=Max('folded_at'))['last']
+    factor = decay_factor((now - last).total_seconds()) if last else 1
+    updated = model.objects.update(
+        score=F('score') * factor + F('pending'), pending=0, folded_at=now)
+    model.objects.filter(score__lt=settings.TRENDING_MIN_SCORE,
+                         pending=0).delete()
+    return updated
+
+
+def trending_posts(limit):
+    return TrendingPost.objects.select_related(
+        'post__author', 'post__group').order_by('-score')[:limit]
+
+
+def trending_groups(limit):
+    return TrendingGroup.objects.select_related('group').order_by(
+        '-score')[:limit]
@@ -1,5 +1,5 @@
 from django.urls import path
-from . import views
+from . import api, feeds, views
 
 app_name = 'posts'
 urlpatterns = [
@@ -14,7 +14,9 @@ urlpatterns = [
         views.add_comment,
         name='add_comment'
     ),
+    path('trending/', views.trending, name='trending'),
     path('follow/', views.follow_index, name='follow_index'),
+    path('follow/new/', views.follow_new, name='follow_new'),
     path(
         'profile/<str:username>/follow/',
         views.profile_follow,
@@ -25,4 +27,81 @@ urlpatterns = [
         views.profile_unfollow,
         name='profile_unfollow'
     ),
+    path(
+        'profile/<str:username>/followers/',
+        views.followers,
+        name='followers'
+    ),
+    path(
+        'profile/<str:username>/following/',
+        views.following,
+        name='following'
+    ),
+    path('export/', views.export, name='export'),
+    path(
+        'feed/rss/',
+        feeds.cached_feed(feeds.LatestPostsFeed, 'rss'),
+        name='feed_rss'
+    ),
+    path(
+        'feed/atom/',
+        feeds.cached_feed(feeds.LatestPostsAtomFeed, 'atom'),
+        name='feed_atom'
+    ),
+    path(
+        'group/<slug:slug>/rss/',
+        feeds.cached_feed(feeds.GroupPostsFeed, 'rss', 'slug', 'group'),
+        name='group_feed_rss'
+    ),
+    path(
+        'group/<slug:slug>/atom/',
+        feeds.cached_feed(feeds.GroupPostsAtomFeed, 'atom', 'slug', 'group'),
+        name='group_feed_atom'
+    ),
+    path(
+        'profile/<str:username>/rss/',
+        feeds.cached_feed(
+            feeds.AuthorPostsFeed, 'rss', 'username', 'profile'
+        ),
+        name='profile_feed_rss'
+    ),
+    path(
+        'profile/<str:username>/atom/',
+        feeds.cached_feed(
+            feeds.AuthorPostsAtomFeed, 'atom', 'username', 'profile'
+        ),
+        name='profile_feed_atom'
+    ),
+    path('api/v1/posts/', api.index, name='api_index'),
+    path(
+        'api/v1/groups/<slug:slug>/posts/',
+        api.group_posts,
+        name='api_group_posts'
+    ),
+    path(
+        'api/v1/profile/<str:username>/posts/',
+        api.profile,
+        name='api_profile'
+    ),
+    path(
+        'api/v1/profile/<str:username>/followers/',
+        api.followers,
+        name='api_followers'
+    ),
+    path(
+        'api/v1/profile/<str:username>/following/',
+        api.following,
+        name='api_following'
+    ),
+    path('api/v1/follow/', api.follow_index, name='api_follow_index'),
+    path(
+        'api/v1/posts/<int:post_id>/',
+        api.post_detail,
+        name='api_post_detail'
+    ),
+    path(
+        'api/v1/posts/<int:post_id>/comments/',
+        api.post_comments,
+        name='api_post_comments'
+    ),
 ]
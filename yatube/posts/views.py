@@ -1,56 +1,105 @@
+from django.core.exceptions import PermissionDenied
+from django.http import (HttpResponseBadRequest, JsonResponse,
+                         StreamingHttpResponse)
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views.decorators.cache import cache_page
 from django.contrib.auth.decorators import login_required
 from django.conf import settings
-from .models import Follow, Post, Group, User, Comment
+from core.queries import query_budget
+from core.ratelimit import concurrency_exempt, rate_limit
+from core.rendering import render as render_feed
+from core.routers import pin_primary
+from .archive import Feed, get_post
+from .following import (follow_page, follow_stats, followed_ids,
+                        suggestions)
+from .models import ArchivedPost, Follow, Post, Group, User
 from .forms import PostForm, CommentForm
+from .export import gzip_stream, iter_ndjson
 from .paginator import pagination
+from .tasks import warm_thumbnails
+from .trending import (record_comment, record_post, trending_groups,
+                       trending_posts)
+from .watermarks import wait_for_posts
 
 
+@query_budget(5)
 @cache_page(20, key_prefix='index_page')
 def index(request):
-    post_list = Post.objects.all()
-    page_obj = pagination(request, post_list, settings.POSTS_NUM)
-    return render(request, 'posts/index.html', {'page_obj': page_obj})
+    page_obj = pagination(request, Feed(), settings.POSTS_NUM)
+    return render_feed(request, 'posts/index.html', {'page_obj': page_obj})
 
 
+@query_budget(6)
 def group_posts(request, slug: str):
     group = get_object_or_404(Group, slug=slug)
-    post_list = Post.objects.filter(group=group)
-    page_obj = pagination(request, post_list, settings.POSTS_NUM)
-    return render(request, 'posts/group_list.html', {'group': group,
-                                                     'page_obj': page_obj})
+    page_obj = pagination(request, Feed(group=group), settings.POSTS_NUM)
+    return render_feed(request, 'posts/group_list.html',
+                       {'group': group, 'page_obj': page_obj})
 
 
+@query_budget(8)
 def profile(request, username: str):
     user = request.user
-    author = User.objects.get(username=username)
-    post_list = Post.objects.filter(author=author)
-    following = user.is_authenticated and Follow.objects.filter(
-        user=user,
-        author=author).exists()
-    page_obj = pagination(request, post_list, settings.POSTS_NUM)
+    author = User.objects.select_related('follow_stats').get(
+        username=username)
+    following = user.is_authenticated and author.pk in followed_ids(user.pk)
+    page_obj = pagination(request, Feed(author=author), settings.POSTS_NUM)
     context = {
         'author': author,
         'page_obj': page_obj,
         'following': following,
+        'stats': follow_stats(author),
+        'suggestions': (suggestions(user, settings.SUGGESTIONS_NUM)
+                        if user.is_authenticated else []),
     }
-    return render(request, 'posts/profile.html', context)
+    return render_feed(request, 'posts/profile.html', context)
+
+
+def follow_list(request, username, direction):
+    author = get_object_or_404(User.objects.select_related('follow_stats'),
+                               username=username)
+    try:
+        users, next_cursor = follow_page(request, author, direction,
+                                         settings.FOLLOWS_NUM)
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    context = {
+        'author': author,
+        'stats': follow_stats(author),
+        'users': users,
+        'next_cursor': next_cursor,
+        'direction': direction,
+    }
+    return render(request, 'posts/follow_list.html', context)
+
 
+@query_budget(4)
+def followers(request, username: str):
+    return follow_list(request, username, 'followers')
 
+
+@query_budget(4)
+def following(request, username: str):
+    return follow_list(request, username, 'following')
+
+
+@query_budget(7)
 def post_detail(request, post_id: int):
-    post = Post.objects.get(pk=post_id)
-    form = CommentForm()
-    comments = Comment.objects.filter(post=post)
+    post, comments = get_post(post_id)
     context = {
         'post': post,
         'comments': comments,
-        'form': form
+        'form': CommentForm(),
+        'archived': isinstance(post, ArchivedPost),
+        'author_posts': Feed(author=post.author).count(),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
+@query_budget(8)
 @login_required
+@rate_limit('5/m')
+@pin_primary
 def post_create(request):
     if request.method == 'POST':
         form = PostForm(
@@ -60,14 +109,19 @@ def post_create(request):
         if form.is_valid():
             user = request.user
             form.instance.author = user
-            form.save()
+            post = form.save()
+            record_post(post)
+            if post.image:
+                warm_thumbnails.delay(post.pk)
             return redirect(f'/profile/{user.username}/')
         return render(request, 'posts/create_post.html', {'form': form})
     form = PostForm()
     return render(request, 'posts/create_post.html', {'form': form})
 
 
+@query_budget(9)
 @login_required
+@pin_primary
 def post_edit(request, post_id: int):
     post = get_object_or_404(Post, pk=post_id)
     if post.author != request.user:
@@ -79,7 +133,9 @@ def post_edit(request, post_id: int):
         instance=post
     )
     if form.is_valid():
-        form.save()
+        post = form.save()
+        if 'image' in form.changed_data and post.image:
+            warm_thumbnails.delay(post.pk)
         return redirect('posts:post_detail', post_id=post_id)
     context = {
         'post': post,
@@ -89,7 +145,10 @@ def post_edit(request, post_id: int):
     return render(request, 'posts/create_post.html', context)
 
 
+@query_budget(6)
 @login_required
+@rate_limit('10/m')
+@pin_primary
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
     form = CommentForm(request.POST or None)
@@ -98,33 +157,103 @@ def add_comment(request, post_id):
         comment.author = request.user
         comment.post = post
         comment.save()
+        record_comment(post)
     return redirect('posts:post_detail', post_id=post_id)
 
 
+@query_budget(4)
+def trending(request):
+    context = {
+        'posts': trending_posts(settings.TRENDING_NUM),
+        'groups': trending_groups(settings.TRENDING_NUM),
+    }
+    return render(request, 'posts/trending.html', context)
+
+
+@query_budget(7)
 @login_required
 def follow_index(request):
-    post_list = Post.objects.filter(author__following__user=request.user)
-    page_obj = pagination(request, post_list, settings.POSTS_NUM)
+    authors = sorted(followed_ids(request.user.pk))
+    page_obj = pagination(request, Feed(author_id__in=authors),
+                          settings.POSTS_NUM)
     context = {
         'page_obj': page_obj,
+        'suggestions': suggestions(request.user, settings.SUGGESTIONS_NUM),
     }
-    return render(request, 'posts/follow.html', context)
+    return render_feed(request, 'posts/follow.html', context)
 
 
+@concurrency_exempt
 @login_required
+def follow_new(request):
+    """Число новых постов в ленте подписок после курсора since.
+
+    Если новых постов нет, запрос ждёт их до timeout секунд, опрашивая
+    отметку в кэше, а не таблицу постов.
+    """
+    try:
+        since = int(request.GET.get('since', 0))
+        timeout = float(request.GET.get('timeout',
+                                        settings.FOLLOW_POLL_TIMEOUT))
+    except ValueError:
+        return JsonResponse({'detail': 'Некорректные параметры'}, status=400)
+    timeout = max(0, min(timeout, settings.FOLLOW_POLL_TIMEOUT))
+    if not since:
+        timeout = 0
+    hwm = wait_for_posts(request.user.pk, since, timeout,
+                         settings.FOLLOW_POLL_INTERVAL)
+    count = 0
+    if since and hwm > since:
+        count = Post.objects.filter(author__following__user=request.user,
+                                    pk__gt=since).count()
+    return JsonResponse({'count': count, 'cursor': max(hwm, since)})
+
+
+@query_budget(7)
+@login_required
+@rate_limit('30/m', methods=None)
+@pin_primary
 def profile_follow(request, username):
     user = request.user
     author = User.objects.get(username=username)
-    if user != author and Follow.objects.filter(user=user,
-                                                author=author).count() == 0:
-        Follow.objects.create(user=user, author=author)
+    if user != author:
+        Follow.objects.get_or_create(user=user, author=author)
     return redirect(f'/profile/{author.username}/')
 
 
+@query_budget(7)
 @login_required
+@pin_primary
 def profile_unfollow(request, username):
     user = request.user
     author = User.objects.get(username=username)
     if user != author:
         Follow.objects.filter(user=user, author=author).delete()
     return redirect(f'/profile/{author.username}/')
+
+
+@login_required
+def export(request):
+    """Выгрузка постов и комментариев в gzip NDJSON.
+
+    Обычный пользователь выгружает только свои записи, персонал — записи
+    любого автора, группы или всего сайта.
+    """
+    user = request.user
+    username = request.GET.get('author')
+    slug = request.GET.get('group')
+    if not user.is_staff:
+        if slug or (username and username != user.username):
+            raise PermissionDenied
+        username = user.username
+    author = get_object_or_404(User, username=username) if username else None
+    group = get_object_or_404(Group, slug=slug) if slug else None
+    scope = '-'.join(filter(None, (username, slug))) or 'all'
+    response = StreamingHttpResponse(
+        gzip_stream(iter_ndjson(author, group)),
+        content_type='application/gzip',
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="yatube-{scope}.ndjson.gz"'
+    )
+    return response
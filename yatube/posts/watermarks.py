@@ -0,0 +1,80 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Max
+
+from .following import followed_ids
+from .models import Post
+
+# Сколько раз пытаться взять блокировку отметки автора, по 10 мс.
+LOCK_ATTEMPTS = 20
+
+
+def author_hwm_key(author_id):
+    return f'author:hwm:{author_id}'
+
+
+def bump_author(post):
+    """Поднимает отметку последнего поста автора до post.pk.
+
+    Отметка одна на автора, а не на каждого подписчика, поэтому запись
+    не зависит от числа подписчиков. Сравнение и запись идут под
+    блокировкой через cache.add, так что более медленное сохранение
+    не опустит отметку, поднятую более новым постом. Не дождавшись
+    блокировки, отметку удаляем: её пересчитают из базы при чтении.
+    """
+    key = author_hwm_key(post.author_id)
+    lock = f'{key}:lock'
+    for _ in range(LOCK_ATTEMPTS):
+        if cache.add(lock, True, timeout=1):
+            try:
+                if cache.get(key, 0) < post.pk:
+                    cache.set(key, post.pk, settings.FOLLOW_HWM_TIMEOUT)
+            finally:
+                cache.delete(lock)
+            return
+        time.sleep(0.01)
+    cache.delete(key)
+
+
+def follow_high_water_mark(user_id):
+    """id последнего поста в ленте подписок пользователя.
+
+    Максимум отметок авторов из подписок. Отметки берутся из кэша;
+    к таблице постов обращаемся одним запросом только за авторами
+    с холодным кэшем. Прочитанное из базы кладётся через cache.add:
+    снимок, сделанный до коммита нового поста, не затрёт его отметку.
+    Кэш должен быть общим для воркеров (см. проверку core.W001), а срок
+    FOLLOW_HWM_TIMEOUT ограничивает отставание, если отметка потерялась.
+    """
+    authors = followed_ids(user_id)
+    if not authors:
+        return 0
+    keys = {author_hwm_key(author_id): author_id for author_id in authors}
+    marks = cache.get_many(keys)
+    missing = [keys[key] for key in keys if key not in marks]
+    if missing:
+        found = dict.fromkeys(missing, 0)
+        found.update(
+            Post.objects.filter(author_id__in=missing).order_by().values(
+                'author_id').annotate(hwm=Max('id')).values_list(
+                'author_id', 'hwm'))
+        for author_id, hwm in found.items():
+            cache.add(author_hwm_key(author_id), hwm,
+                      settings.FOLLOW_HWM_TIMEOUT)
+            marks[author_hwm_key(author_id)] = hwm
+    return max(marks.values())
+
+
+def wait_for_posts(user_id, since, timeout, interval):
+    """Ждёт до timeout секунд, пока отметка не станет больше since.
+
+    Истёкшая во время ожидания отметка перечитывается из базы.
+    """
+    hwm = follow_high_water_mark(user_id)
+    deadline = time.monotonic() + timeout
+    while hwm <= since and time.monotonic() < deadline:
+        time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+        hwm = follow_high_water_mark(user_id)
+    return hwm
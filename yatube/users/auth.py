@@ -0,0 +1,50 @@
+from django.conf import settings
+from django.contrib import auth
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.utils.crypto import constant_time_compare
+
+
+def user_cache_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def get_cached_user(request):
+    """Как django.contrib.auth.get_user, но пользователь берётся из кэша.
+
+    Проверки сессии те же и выполняются на каждом чтении: бэкенд
+    из AUTHENTICATION_BACKENDS, допуск бэкенда (is_active) и хэш пароля
+    в сессии, поэтому смена пароля или блокировка разлогинивают другие
+    сессии и с закэшированным пользователем. Копию сбрасывают сигналы
+    User, так что кэш должен быть общим для воркеров (проверка
+    core.W001); иначе изменение видно остальным лишь через
+    USER_CACHE_TIMEOUT.
+    """
+    try:
+        user_id = auth._get_user_session_key(request)
+        backend_path = request.session[auth.BACKEND_SESSION_KEY]
+    except KeyError:
+        return AnonymousUser()
+    if backend_path not in settings.AUTHENTICATION_BACKENDS:
+        return AnonymousUser()
+    key = user_cache_key(user_id)
+    user = cache.get(key)
+    if user is None:
+        user = auth.get_user(request)
+        if user.is_authenticated:
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user
+    backend = auth.load_backend(backend_path)
+    # ModelBackend.get_user отказывает неактивным, повторяем это для копии.
+    allowed = getattr(backend, 'user_can_authenticate', lambda user: True)
+    session_hash = request.session.get(auth.HASH_SESSION_KEY)
+    if not (allowed(user) and session_hash and constant_time_compare(
+            session_hash, user.get_session_auth_hash())):
+        request.session.flush()
+        return AnonymousUser()
+    user.backend = backend_path
+    return user
+
+
+def forget_user(user_id):
+    cache.delete(user_cache_key(user_id))
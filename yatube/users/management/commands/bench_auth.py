@@ -0,0 +1,89 @@
+import json
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.db.models import Count
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from core.queries import QueryCollector
+from posts.models import User
+
+DEFAULT_AUTH = 'django.contrib.auth.middleware.AuthenticationMiddleware'
+CACHED_AUTH = 'users.middleware.CachedAuthenticationMiddleware'
+# Название -> (SESSION_ENGINE, middleware аутентификации).
+STRATEGIES = {
+    'db': ('django.contrib.sessions.backends.db', DEFAULT_AUTH),
+    'cached_db': ('django.contrib.sessions.backends.cached_db',
+                  DEFAULT_AUTH),
+    'cached_db+user': ('django.contrib.sessions.backends.cached_db',
+                       CACHED_AUTH),
+    'signed_cookies+user': (
+        'django.contrib.sessions.backends.signed_cookies', CACHED_AUTH),
+}
+
+
+def middleware_with(auth_middleware):
+    return [auth_middleware if name in (DEFAULT_AUTH, CACHED_AUTH) else name
+            for name in settings.MIDDLEWARE]
+
+
+class Command(BaseCommand):
+    help = ('Сравнивает число SQL-запросов на запрос авторизованного '
+            'пользователя для разных бэкендов сессий и аутентификации')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=20,
+                            help='Запросов на каждую страницу')
+        parser.add_argument('--output', help='Файл для результатов JSON')
+
+    def handle(self, *args, **options):
+        reader = User.objects.annotate(
+            num=Count('follower')).order_by('-num').first()
+        if reader is None:
+            raise CommandError('База пуста: сначала выполните seed_bench')
+        urls = [
+            reverse('posts:follow_index'),
+            reverse('posts:profile', args=[reader.username]),
+            reverse('posts:trending'),
+        ]
+        report = {}
+        for name, (engine, auth_middleware) in STRATEGIES.items():
+            with override_settings(SESSION_ENGINE=engine,
+                                   MIDDLEWARE=middleware_with(
+                                       auth_middleware)):
+                report[name] = self.measure(reader, urls,
+                                            options['requests'])
+            row = report[name]
+            self.stdout.write(
+                f'{name:20} запросов/запрос={row["queries"]:6.2f} '
+                f'django_session={row["session"]:5.2f} '
+                f'auth_user={row["auth_user"]:5.2f}'
+            )
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                json.dump(report, output, indent=2, ensure_ascii=False)
+
+    def measure(self, reader, urls, requests):
+        client = Client()
+        client.force_login(reader)
+        for url in urls:
+            client.get(url)
+        collector = QueryCollector(settings.QUERY_BUDGET_IGNORE)
+        with connection.execute_wrapper(collector):
+            for _ in range(requests):
+                for url in urls:
+                    client.get(url)
+        total = requests * len(urls)
+        by_table = {'session': 0, 'auth_user': 0}
+        for sql, count in collector.fingerprints.items():
+            if 'FROM "django_session"' in sql:
+                by_table['session'] += count
+            elif sql.startswith('SELECT') and 'FROM "auth_user"' in sql:
+                by_table['auth_user'] += count
+        return {
+            'queries': round(collector.budget_count / total, 2),
+            'session': round(by_table['session'] / total, 2),
+            'auth_user': round(by_table['auth_user'] / total, 2),
+        }
@@ -0,0 +1,68 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from users.auth import user_cache_key
+
+
+User = get_user_model()
+
+
+class CachedAuthTests(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth',
+                                            password='old-pass-123')
+
+    def setUp(self) -> None:
+        super().setUp()
+        cache.clear()
+        self.client = Client()
+        self.client.login(username='auth', password='old-pass-123')
+
+    def test_no_session_or_user_queries(self):
+        """Повторный запрос не читает django_session и auth_user."""
+        url = reverse('posts:follow_index')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.context['user'], self.user)
+        tables = [query['sql'] for query in queries
+                  if '"django_session"' in query['sql']
+                  or 'FROM "auth_user"' in query['sql']]
+        self.assertEqual(tables, [])
+
+    def test_password_change_invalidates_cached_user(self):
+        """Смена пароля разлогинивает другие сессии, но не текущую."""
+        other = Client()
+        other.login(username='auth', password='old-pass-123')
+        url = reverse('posts:follow_index')
+        other.get(url)
+        self.client.post(reverse('users:password_change'), {
+            'old_password': 'old-pass-123',
+            'new_password1': 'new-pass-456',
+            'new_password2': 'new-pass-456',
+        })
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(other.get(url).status_code, 302)
+
+    def test_inactive_cached_user_logged_out(self):
+        """Заблокированный пользователь из кэша не проходит проверку."""
+        url = reverse('posts:follow_index')
+        self.client.get(url)
+        user = cache.get(user_cache_key(self.user.pk))
+        user.is_active = False
+        cache.set(user_cache_key(self.user.pk), user)
+        self.assertEqual(self.client.get(url).status_code, 302)
+
+    def test_user_changes_visible(self):
+        """Сохранение пользователя сбрасывает его копию в кэше."""
+        url = reverse('posts:follow_index')
+        self.client.get(url)
+        self.user.first_name = 'Лев'
+        self.user.save()
+        response = self.client.get(url)
+        self.assertEqual(response.context['user'].first_name, 'Лев')
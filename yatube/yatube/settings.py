@@ -1,4 +1,6 @@
+import importlib.util
 import os
+import sys
 
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -9,6 +11,76 @@ SECRET_KEY = 'l3!vh&^gk&m-h9h(rwpvy$ygz*9r=#uw7)9$uu3galz!h_(=7r'
 
 POSTS_NUM: int = int(os.environ.get('POSTS_NUM', 10))
 
+API_MAX_LIMIT: int = int(os.environ.get('API_MAX_LIMIT', 100))
+
+# Пользователей на странице подписчиков и подписок.
+FOLLOWS_NUM: int = int(os.environ.get('FOLLOWS_NUM', 20))
+# Рекомендаций «на кого подписаться» на страницах профиля и подписок.
+SUGGESTIONS_NUM: int = int(os.environ.get('SUGGESTIONS_NUM', 5))
+
+EXPORT_BATCH_SIZE: int = int(os.environ.get('EXPORT_BATCH_SIZE', 500))
+
+# Максимальное ожидание и шаг опроса для follow/new/, в секундах.
+FOLLOW_POLL_TIMEOUT: float = float(os.environ.get('FOLLOW_POLL_TIMEOUT', 25))
+FOLLOW_POLL_INTERVAL: float = float(
+    os.environ.get('FOLLOW_POLL_INTERVAL', 0.5)
+)
+# Срок жизни отметки последнего поста ленты подписок в кэше, в секундах.
+# Отметку поднимают сигналы новых постов; по истечении срока она заново
+# читается из базы, так что потерянное обновление теряется ненадолго.
+FOLLOW_HWM_TIMEOUT: int = int(os.environ.get('FOLLOW_HWM_TIMEOUT', 300))
+
+# Срок жизни множества подписок в кэше; обычно его сбрасывают сигналы
+# Follow, срок ограничивает расхождение, если сброс потерялся.
+FOLLOWING_CACHE_TIMEOUT: int = int(
+    os.environ.get('FOLLOWING_CACHE_TIMEOUT', 3600)
+)
+
+FEED_ITEMS: int = int(os.environ.get('FEED_ITEMS', 20))
+# Страховочный срок жизни ленты в кэше; обычно её сбрасывает новый пост.
+FEED_CACHE_TIMEOUT: int = int(os.environ.get('FEED_CACHE_TIMEOUT', 86400))
+
+# Посты старше ARCHIVE_AFTER_DAYS команда archive_posts переносит в архив
+# пачками по ARCHIVE_BATCH_SIZE с паузой ARCHIVE_PAUSE секунд.
+ARCHIVE_AFTER_DAYS: int = int(os.environ.get('ARCHIVE_AFTER_DAYS', 365))
+ARCHIVE_BATCH_SIZE: int = int(os.environ.get('ARCHIVE_BATCH_SIZE', 200))
+ARCHIVE_PAUSE: float = float(os.environ.get('ARCHIVE_PAUSE', 0.05))
+
+# Популярное: вес событий, период полураспада рейтинга, размер списков.
+TRENDING_POST_WEIGHT: float = float(
+    os.environ.get('TRENDING_POST_WEIGHT', 3)
+)
+TRENDING_COMMENT_WEIGHT: float = float(
+    os.environ.get('TRENDING_COMMENT_WEIGHT', 1)
+)
+TRENDING_HALF_LIFE_HOURS: float = float(
+    os.environ.get('TRENDING_HALF_LIFE_HOURS', 6)
+)
+TRENDING_MIN_SCORE: float = 0.01
+TRENDING_FOLD_INTERVAL: float = float(
+    os.environ.get('TRENDING_FOLD_INTERVAL', 60)
+)
+TRENDING_NUM: int = int(os.environ.get('TRENDING_NUM', 10))
+
+# Фоновые задачи core.taskqueue. При TASKS_EAGER задачи выполняются сразу.
+TASKS_EAGER = os.environ.get('TASKS_EAGER', '') == '1'
+TASKS_MAX_ATTEMPTS: int = int(os.environ.get('TASKS_MAX_ATTEMPTS', 3))
+# Задержка перед повтором, с; удваивается с каждой попыткой.
+TASKS_RETRY_DELAY: float = float(os.environ.get('TASKS_RETRY_DELAY', 10))
+# Через сколько секунд задача умершего исполнителя вернётся в очередь.
+TASKS_LOCK_TIMEOUT: int = int(os.environ.get('TASKS_LOCK_TIMEOUT', 600))
+TASKS_KEEP_DONE_HOURS: int = int(os.environ.get('TASKS_KEEP_DONE_HOURS', 24))
+TASKS_WORKER_PROCESSES: int = int(
+    os.environ.get('TASKS_WORKER_PROCESSES', 2)
+)
+TASKS_BATCH_SIZE: int = int(os.environ.get('TASKS_BATCH_SIZE', 20))
+TASKS_POLL_INTERVAL: float = float(os.environ.get('TASKS_POLL_INTERVAL', 1))
+
+# Миниатюры из шаблонов постов, которые строит задача warm_thumbnails.
+POST_THUMBNAILS = (
+    ('960x339', {'crop': 'center', 'upscale': True}),
+)
+
 DEBUG = True
 
 ALLOWED_HOSTS = [
@@ -23,6 +95,7 @@ INSTALLED_APPS = [
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
+    'about.apps.AboutConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -34,10 +107,19 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.SlowQueryMiddleware',
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.GZipMiddleware',
+    'core.middleware.ConcurrencyLimitMiddleware',
+    'core.middleware.ProfilerMiddleware',
+    'core.middleware.ServerTimingMiddleware',
+    'core.middleware.QueryCountMiddleware',
+    'core.middleware.ReplicaPinMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'users.middleware.CachedAuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -62,16 +144,84 @@ TEMPLATES = [
     },
 ]
 
+# Шаблоны ленты, портированные на Jinja2. Бэкенд подключается, только
+# если пакет jinja2 установлен; представления из JINJA2_VIEWS (имена
+# вида posts:index, через запятую) рендерятся им, остальные — DTL.
+JINJA2_DIR = os.path.join(BASE_DIR, 'jinja2_templates')
+JINJA2_ENABLED = importlib.util.find_spec('jinja2') is not None
+JINJA2_VIEWS = tuple(
+    name for name in os.environ.get('JINJA2_VIEWS', '').split(',') if name
+)
+
+if JINJA2_ENABLED:
+    TEMPLATES.append({
+        'NAME': 'jinja2',
+        'BACKEND': 'django.template.backends.jinja2.Jinja2',
+        'DIRS': [JINJA2_DIR],
+        'APP_DIRS': False,
+        'OPTIONS': {
+            'environment': 'core.jinja2.environment',
+            'context_processors': TEMPLATES[0]['OPTIONS']['context_processors'],
+        },
+    })
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
 
+# Профиль базы: default — настройки SQLite по умолчанию,
+# production — WAL, постоянные соединения и PRAGMA из SQLITE_PRAGMAS.
+DB_PROFILE = os.environ.get('DB_PROFILE', 'default')
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Сколько секунд ждать снятия блокировки вместо «database is locked».
+        'OPTIONS': {'timeout': int(os.environ.get('DB_TIMEOUT', 20))},
     }
 }
 
+SQLITE_PRODUCTION_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -64 * 1024,
+    'temp_store': 'MEMORY',
+    'busy_timeout': 20000,
+}
+# PRAGMA для каждого нового соединения; см. core.db.configure_sqlite.
+SQLITE_PRAGMAS: dict = {}
+
+# Реплика для чтений — снимок основной базы, который обновляет команда
+# snapshot_replica. Включается переменной DB_REPLICA=1.
+REPLICA_ENABLED = os.environ.get('DB_REPLICA', '') == '1'
+REPLICA_ALIAS = 'replica' if REPLICA_ENABLED else None
+# Приложения, чтения которых уходят в реплику; сессии и пользователи
+# всегда читаются с основной базы.
+REPLICA_APPS = ('posts',)
+# Сколько секунд после записи пользователь читает с основной базы.
+REPLICA_STICKY_SECONDS = int(os.environ.get('REPLICA_STICKY_SECONDS', 5))
+REPLICA_PIN_COOKIE = 'primary_pin'
+REPLICA_SNAPSHOT_INTERVAL = float(
+    os.environ.get('REPLICA_SNAPSHOT_INTERVAL', 2)
+)
+
+if REPLICA_ENABLED:
+    DATABASES[REPLICA_ALIAS] = dict(
+        DATABASES['default'],
+        NAME=os.environ.get(
+            'DB_REPLICA_NAME', os.path.join(BASE_DIR, 'db.replica.sqlite3')
+        ),
+        TEST={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+
+if DB_PROFILE == 'production':
+    for database in DATABASES.values():
+        database['CONN_MAX_AGE'] = int(os.environ.get('CONN_MAX_AGE', 600))
+    SQLITE_PRAGMAS = SQLITE_PRODUCTION_PRAGMAS
+
 
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -107,11 +257,69 @@ STATIC_URL = '/static/'
 
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
+# Каталог collectstatic; если он собран, статику отдаёт
+# core.middleware.StaticFilesMiddleware с учётом Accept-Encoding.
+STATIC_ROOT = os.environ.get(
+    'STATIC_ROOT', os.path.join(BASE_DIR, 'staticfiles')
+)
+# STATIC_MANIFEST=1 при деплое: хэшированные имена и gzip-копии.
+# Без собранного манифеста {% static %} с DEBUG=False падает, поэтому
+# по умолчанию выключено.
+if os.environ.get('STATIC_MANIFEST', '') == '1':
+    STATICFILES_STORAGE = (
+        'core.staticfiles.CompressedManifestStaticFilesStorage'
+    )
+STATIC_GZIP_EXTENSIONS = ('.css', '.js', '.svg', '.ico', '.txt', '.json',
+                          '.map', '.xml', '.html')
+# Срок кэширования статики без хэша в имени; хэшированная — на год.
+STATIC_MAX_AGE: int = int(os.environ.get('STATIC_MAX_AGE', 3600))
+
+# Ответы короче GZIP_MIN_LENGTH байт не сжимаются: заголовок gzip и
+# CPU не окупаются.
+GZIP_MIN_LENGTH: int = int(os.environ.get('GZIP_MIN_LENGTH', 1024))
+GZIP_CONTENT_TYPES = ('text/', 'application/json', 'application/javascript',
+                      'application/xml', 'application/rss+xml',
+                      'application/atom+xml', 'image/svg+xml')
+
+# Анонимные версии статических страниц, которые команда prerender
+# рендерит при деплое; отдаются запросам без сессии.
+PRERENDER_DIR = os.environ.get(
+    'PRERENDER_DIR', os.path.join(BASE_DIR, 'prerendered')
+)
+PRERENDER_PAGES = ('about:author', 'about:tech')
+PRERENDER_MAX_AGE: int = int(os.environ.get('PRERENDER_MAX_AGE', 86400))
+
+# Сессии в кэше с записью в базу: чтение сессии не ходит в django_session.
+# Для сессий без сервера подойдёт django.contrib.sessions.backends.signed_cookies.
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.cached_db'
+)
+# Сколько секунд пользователь живёт в кэше CachedAuthenticationMiddleware.
+USER_CACHE_TIMEOUT: int = int(os.environ.get('USER_CACHE_TIMEOUT', 300))
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 # LOGOUT_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь QueuedEmail, а отправляет их команда
+# send_queued_mail через EMAIL_DELIVERY_BACKEND.
+EMAIL_BACKEND = os.environ.get('EMAIL_BACKEND', 'core.mail.QueuedEmailBackend')
+EMAIL_DELIVERY_BACKEND = os.environ.get(
+    'EMAIL_DELIVERY_BACKEND', 'django.core.mail.backends.filebased.EmailBackend'
+)
+EMAIL_QUEUE_BATCH_SIZE: int = int(os.environ.get('EMAIL_QUEUE_BATCH_SIZE', 50))
+EMAIL_QUEUE_MAX_ATTEMPTS: int = int(
+    os.environ.get('EMAIL_QUEUE_MAX_ATTEMPTS', 6)
+)
+# Задержка перед второй попыткой, с; дальше удваивается.
+EMAIL_QUEUE_RETRY_DELAY: float = float(
+    os.environ.get('EMAIL_QUEUE_RETRY_DELAY', 30)
+)
+EMAIL_QUEUE_INTERVAL: float = float(os.environ.get('EMAIL_QUEUE_INTERVAL', 5))
+# Через сколько секунд письма упавшего отправителя снова можно взять.
+EMAIL_QUEUE_LOCK_TIMEOUT: int = int(
+    os.environ.get('EMAIL_QUEUE_LOCK_TIMEOUT', 600)
+)
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
@@ -119,8 +327,82 @@ CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+TESTING = sys.argv[1:2] == ['test'] or 'pytest' in sys.modules
+
+# Бюджет SQL-запросов на представление; см. core.middleware.
+QUERY_BUDGET: int = int(os.environ.get('QUERY_BUDGET', 20))
+QUERY_BUDGETS: dict = {}
+# Заполнение хранилища sorl-thumbnail при холодном кэше и управление
+# транзакциями в бюджет не входят.
+QUERY_BUDGET_IGNORE = ('"thumbnail_kvstore"', 'SAVEPOINT', 'BEGIN')
+QUERY_BUDGET_STRICT = TESTING
+
+# Ограничение частоты пишущих представлений; см. core.ratelimit.
+# RATE_LIMITS переопределяет лимит декоратора по имени представления,
+# например {'posts:add_comment': '20/m'}.
+RATELIMIT_ENABLED = os.environ.get('RATELIMIT_ENABLED', '1') == '1'
+RATE_LIMITS: dict = {}
+
+# Одновременных запросов на процесс, 0 — без ограничения; сверх лимита
+# запрос ждёт CONCURRENCY_WAIT секунд, затем получает устаревшую копию
+# страницы или 503. См. core.middleware.ConcurrencyLimitMiddleware.
+CONCURRENCY_LIMIT: int = int(os.environ.get('CONCURRENCY_LIMIT', 32))
+CONCURRENCY_WAIT: float = float(os.environ.get('CONCURRENCY_WAIT', 0.5))
+CONCURRENCY_STALE_TIMEOUT: int = int(
+    os.environ.get('CONCURRENCY_STALE_TIMEOUT', 3600)
+)
+# Как часто обновлять сохранённую копию страницы, с.
+CONCURRENCY_STALE_REFRESH: int = int(
+    os.environ.get('CONCURRENCY_STALE_REFRESH', 10)
+)
+
+# Заголовок Server-Timing; см. core.middleware.ServerTimingMiddleware.
+SERVER_TIMING = os.environ.get('SERVER_TIMING', '1' if DEBUG else '') == '1'
+
+# Выборочное профилирование; см. core.middleware.ProfilerMiddleware.
+PROFILER_SAMPLE_RATE: float = float(
+    os.environ.get('PROFILER_SAMPLE_RATE', 0)
+)
+# Заголовок с токеном из manage.py profile_token; пусто — отключено.
+PROFILER_HEADER = os.environ.get('PROFILER_HEADER', 'HTTP_X_PROFILE')
+PROFILER_TOKEN_MAX_AGE: int = int(
+    os.environ.get('PROFILER_TOKEN_MAX_AGE', 3600)
+)
+# sample — сэмплирование стека, cprofile — детерминированный cProfile.
+PROFILER_MODE = os.environ.get('PROFILER_MODE', 'sample')
+PROFILER_INTERVAL: float = float(os.environ.get('PROFILER_INTERVAL', 0.005))
+PROFILER_DIR = os.environ.get(
+    'PROFILER_DIR', os.path.join(BASE_DIR, 'profiles')
+)
+PROFILER_MAX_FILES: int = int(os.environ.get('PROFILER_MAX_FILES', 200))
+
+# Метрики процессов для /metrics/; см. core.metrics.
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '') == '1'
+METRICS_DIR = os.environ.get(
+    'METRICS_DIR', os.path.join(BASE_DIR, 'metrics')
+)
+METRICS_FLUSH_INTERVAL: float = float(
+    os.environ.get('METRICS_FLUSH_INTERVAL', 5)
+)
+METRICS_LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10,
+)
+METRICS_ALLOWED_IPS = ['127.0.0.1', '::1']
+
+# Порог журнала медленных запросов в мс, 0 — отключено; см. core.db.
+SLOW_QUERY_MS: float = float(os.environ.get('SLOW_QUERY_MS', 100))
+
+# По умолчанию кэш живёт в памяти процесса. Лимиты частоты, множества
+# подписок, водяные знаки ленты и кэш пользователей должны быть общими
+# для всех воркеров: в многопроцессном деплое задайте CACHE_BACKEND
+# с атомарным incr, например
+# django.core.cache.backends.memcached.MemcachedCache и CACHE_LOCATION.
+# Проверка core.W001 напоминает об этом в профиле production.
 CACHES = {
     'default': {
-        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache'
+        ),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
     }
 }